@@ -5,20 +5,43 @@ import json
 import requests
 import concurrent.futures
 import threading
-from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple, Set
+from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Any, Tuple, Set, Callable
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlunparse, urljoin
 import time
 import logging
 import hashlib
+import heapq
+import bisect
+from array import array
+import math
+import random
+from statistics import NormalDist
+import itertools
+import copy
+from collections import deque, Counter
+import argparse
+import shutil
+import signal
 import csv
 from difflib import SequenceMatcher
 import socket
+import ipaddress
+import sqlite3
+import select
+import errno
+import weakref
+import http.cookiejar
 import urllib3
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Отключаем предупреждения SSL
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -40,7 +63,7 @@ from PyQt6.QtWidgets import (
     QInputDialog, QToolButton, QStyle, QTextEdit, QCheckBox,
     QRadioButton, QProgressBar, QProgressDialog, QFrame,
     QPlainTextEdit, QSpacerItem, QSizePolicy, QSlider,
-    QSpinBox, QDoubleSpinBox, QButtonGroup
+    QSpinBox, QDoubleSpinBox, QButtonGroup, QDockWidget
 )
 from PyQt6.QtCore import (
     Qt, QTimer, QSettings, QSize, QPoint,
@@ -109,6 +132,9 @@ class LinkSource:
         self.description: str = ""
         self.link_cache: Dict[str, List[str]] = {}
         self.last_cache_update: Optional[datetime] = None
+        self.etag: str = ""
+        self.last_modified: str = ""
+        self.last_refresh_stats: Dict[str, int] = {}
     
     def copy(self) -> 'LinkSource':
         source = LinkSource()
@@ -126,6 +152,9 @@ class LinkSource:
         source.description = self.description
         source.link_cache = self.link_cache.copy()
         source.last_cache_update = self.last_cache_update
+        source.etag = self.etag
+        source.last_modified = self.last_modified
+        source.last_refresh_stats = self.last_refresh_stats.copy()
         return source
     
     def to_dict(self) -> Dict[str, Any]:
@@ -143,7 +172,10 @@ class LinkSource:
             'tags': self.tags,
             'description': self.description,
             'link_cache': self.link_cache,
-            'last_cache_update': self.last_cache_update.isoformat() if self.last_cache_update else None
+            'last_cache_update': self.last_cache_update.isoformat() if self.last_cache_update else None,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'last_refresh_stats': self.last_refresh_stats
         }
     
     @classmethod
@@ -161,6 +193,9 @@ class LinkSource:
         source.tags = data.get('tags', [])
         source.description = data.get('description', '')
         source.link_cache = data.get('link_cache', {})
+        source.etag = data.get('etag', '')
+        source.last_modified = data.get('last_modified', '')
+        source.last_refresh_stats = data.get('last_refresh_stats', {})
         
         last_updated = data.get('last_updated')
         if last_updated:
@@ -194,14 +229,22 @@ class ChannelData:
         self.has_url: bool = True
         self.url_status: Optional[bool] = None
         self.url_check_time: Optional[datetime] = None
+        self.url_check_key: Optional[str] = None
         self.link_source: str = ""
         self.link_quality: LinkQuality = LinkQuality.UNKNOWN
         self.link_response_time: Optional[float] = None
+        self.link_score: Optional[float] = None
+        self.hls_variant_count: Optional[int] = None
+        self.hls_declared_bandwidth: Optional[int] = None
+        self.hls_time_to_first_segment: Optional[float] = None
+        self.hls_segment_bitrate: Optional[float] = None
+        self.final_url: Optional[str] = None
+        self.redirect_hops: int = 0
         self.alternative_urls: List[str] = []
         self.url_history: List[Dict[str, Any]] = []
         self.last_link_replacement: Optional[datetime] = None
         self.created_date: datetime = datetime.now()
-        self.modified_date: datetime = datetime.now()
+        self.modified_date: datetime = self.created_date
     
     def copy(self) -> 'ChannelData':
         channel = ChannelData()
@@ -217,9 +260,17 @@ class ChannelData:
         channel.has_url = self.has_url
         channel.url_status = self.url_status
         channel.url_check_time = self.url_check_time
+        channel.url_check_key = self.url_check_key
         channel.link_source = self.link_source
         channel.link_quality = self.link_quality
         channel.link_response_time = self.link_response_time
+        channel.link_score = self.link_score
+        channel.hls_variant_count = self.hls_variant_count
+        channel.hls_declared_bandwidth = self.hls_declared_bandwidth
+        channel.hls_time_to_first_segment = self.hls_time_to_first_segment
+        channel.hls_segment_bitrate = self.hls_segment_bitrate
+        channel.final_url = self.final_url
+        channel.redirect_hops = self.redirect_hops
         channel.alternative_urls = self.alternative_urls.copy()
         channel.url_history = self.url_history.copy()
         channel.last_link_replacement = self.last_link_replacement
@@ -320,6 +371,45 @@ class ChannelData:
             self.url_history = self.url_history[-10:]
         self.modified_date = datetime.now()
     
+    def get_last_url_change_time(self) -> Optional[datetime]:
+        for entry in reversed(self.url_history):
+            if entry.get('new_url', '') != self.url:
+                continue
+            try:
+                return datetime.fromisoformat(entry.get('timestamp', ''))
+            except (ValueError, TypeError):
+                return None
+        return None
+    
+    def needs_url_check(self, stale_after_hours: float) -> bool:
+        if self.url_check_time is None:
+            return True
+        
+        # Проверка относится к ссылке и заголовкам, с которыми её делали; правка названия,
+        # группы или логотипа повода для новой проверки не даёт
+        if self.url_check_key is not None:
+            if self.url_check_key != self.get_check_key():
+                return True
+        else:
+            url_changed = self.get_last_url_change_time()
+            if url_changed and url_changed > self.url_check_time:
+                return True
+        
+        if stale_after_hours > 0:
+            return datetime.now() - self.url_check_time > timedelta(hours=stale_after_hours)
+        
+        return False
+    
+    def get_request_headers(self) -> Dict[str, str]:
+        headers = dict(self.extra_headers)
+        if self.user_agent:
+            headers['User-Agent'] = self.user_agent
+        return headers
+    
+    def get_check_key(self) -> str:
+        """Ключ проверки: одинаковые ссылки с разными заголовками проверяются отдельно"""
+        return URLUtils.check_key((self.url or "").strip(), self.get_request_headers())
+    
     def get_quality_color(self) -> QColor:
         if self.link_quality == LinkQuality.UNKNOWN:
             return QColor("gray")
@@ -352,6 +442,37 @@ class ChannelData:
         else:
             return "? Неизвестно"
     
+    def apply_check_result(self, result: Dict[str, Any], check_time: datetime):
+        self.url_status = result.get('success')
+        self.url_check_time = check_time
+        self.url_check_key = self.get_check_key()
+        self.link_response_time = result.get('response_time')
+        self.link_quality = result.get('quality', LinkQuality.UNKNOWN)
+        self.link_score = result.get('score')
+        self.final_url = result.get('final_url')
+        self.redirect_hops = result.get('redirect_hops') or 0
+        self.set_hls_probe(result.get('hls'))
+    
+    def set_hls_probe(self, probe: Optional[Dict[str, Any]]):
+        probe = probe or {}
+        self.hls_variant_count = probe.get('variant_count')
+        self.hls_declared_bandwidth = probe.get('declared_bandwidth')
+        self.hls_time_to_first_segment = probe.get('time_to_first_segment')
+        self.hls_segment_bitrate = probe.get('segment_bitrate')
+    
+    def get_hls_probe(self) -> Optional[Dict[str, Any]]:
+        if self.hls_segment_bitrate is None:
+            return None
+        return {
+            'variant_count': self.hls_variant_count,
+            'declared_bandwidth': self.hls_declared_bandwidth,
+            'time_to_first_segment': self.hls_time_to_first_segment,
+            'segment_bitrate': self.hls_segment_bitrate
+        }
+    
+    def get_hls_bandwidth_ratio(self) -> Optional[float]:
+        return URLUtils.hls_bandwidth_ratio(self.get_hls_probe())
+    
     def get_status_tooltip(self) -> str:
         tooltip = f"Канал: {self.name}\nГруппа: {self.group}\n"
         
@@ -373,6 +494,21 @@ class ChannelData:
         if self.link_response_time is not None:
             tooltip += f"\nВремя ответа: {self.link_response_time:.2f} сек"
         
+        if self.link_score is not None:
+            tooltip += f"\nОценка ссылки: {self.link_score:.1f}"
+        
+        if self.redirect_hops and self.final_url and self.url_status is not None:
+            tooltip += f"\nПеренаправлений: {self.redirect_hops}, конечный адрес: {self.final_url}"
+        
+        if self.hls_segment_bitrate is not None:
+            tooltip += (f"\nHLS: вариантов {self.hls_variant_count or 1}, "
+                        f"первый сегмент за {self.hls_time_to_first_segment:.2f} сек, "
+                        f"{self.hls_segment_bitrate / 1000000:.1f} Мбит/с")
+            ratio = self.get_hls_bandwidth_ratio()
+            if ratio is not None:
+                tooltip += (f" (заявлено {self.hls_declared_bandwidth / 1000000:.1f} Мбит/с, "
+                            f"запас ×{ratio:.1f})")
+        
         if self.link_quality != LinkQuality.UNKNOWN:
             tooltip += f"\nСтатус: {self.get_quality_text()}"
         
@@ -402,9 +538,12 @@ class ChannelData:
             'has_url': self.has_url,
             'url_status': self.url_status,
             'url_check_time': self.url_check_time.isoformat() if self.url_check_time else None,
+            'url_check_key': self.url_check_key,
             'link_source': self.link_source,
             'link_quality': self.link_quality.value,
             'link_response_time': self.link_response_time,
+            'link_score': self.link_score,
+            'hls': self.get_hls_probe(),
             'alternative_urls': self.alternative_urls,
             'url_history': self.url_history,
             'last_link_replacement': self.last_link_replacement.isoformat() if self.last_link_replacement else None,
@@ -426,6 +565,7 @@ class ChannelData:
         channel.extra_headers = data.get('extra_headers', {})
         channel.has_url = data.get('has_url', True)
         channel.url_status = data.get('url_status')
+        channel.url_check_key = data.get('url_check_key')
         channel.link_source = data.get('link_source', '')
         
         check_time = data.get('url_check_time')
@@ -442,6 +582,8 @@ class ChannelData:
             channel.link_quality = LinkQuality.UNKNOWN
         
         channel.link_response_time = data.get('link_response_time')
+        channel.link_score = data.get('link_score')
+        channel.set_hls_probe(data.get('hls'))
         channel.alternative_urls = data.get('alternative_urls', [])
         channel.url_history = data.get('url_history', [])
         
@@ -493,6 +635,130 @@ class ChannelData:
         return sum(scores) / len(scores) if scores else 0.0
 
 
+class NameSimilarityScorer:
+    """Пакетное сравнение строк по числу общих символов для поиска дубликатов в плейлисте.
+    
+    Строки переводятся в векторы частот символов. С NumPy блок запросов сравнивается
+    со всеми строками одной операцией над массивами, без NumPy — тем же расчётом в цикле.
+    Поиск по источникам считает те же доли по своему индексу (ChannelNameSearchIndex).
+    """
+    
+    BLOCK_ELEMENTS = 1 << 22
+    
+    def __init__(self, names: List[str]):
+        self.names = [(name or "").lower() for name in names]
+        counters = [Counter(name) for name in self.names]
+        self.vocabulary: Dict[str, int] = {}
+        for counter in counters:
+            for char in counter:
+                self.vocabulary.setdefault(char, len(self.vocabulary))
+        
+        if np is None:
+            self.counts = counters
+            self.lengths = [len(name) for name in self.names]
+        else:
+            self.counts = np.zeros((len(self.names), len(self.vocabulary)), dtype=np.uint16)
+            for row, counter in enumerate(counters):
+                for char, count in counter.items():
+                    self.counts[row, self.vocabulary[char]] = count
+            self.lengths = np.array([len(name) for name in self.names], dtype=np.int64)
+    
+    def _rows(self, rows) -> range:
+        return range(len(self.names)) if rows is None else range(len(self.names))[rows]
+    
+    def common_counts(self, queries: List[str], rows: Optional[slice] = None):
+        """Число общих символов (с учётом повторов) каждого запроса с каждой строкой из rows"""
+        queries = [(query or "").lower() for query in queries]
+        
+        if np is None:
+            return [
+                [sum(min(count, self.counts[row].get(char, 0)) for char, count in Counter(query).items())
+                 for row in self._rows(rows)]
+                for query in queries
+            ]
+        
+        matrix = self.counts if rows is None else self.counts[rows]
+        query_counts = np.zeros((len(queries), len(self.vocabulary)), dtype=np.uint16)
+        for row, query in enumerate(queries):
+            for char, count in Counter(query).items():
+                column = self.vocabulary.get(char)
+                if column is not None:
+                    query_counts[row, column] = count
+        
+        result = np.zeros((len(queries), len(matrix)), dtype=np.int64)
+        used = np.flatnonzero(query_counts.any(axis=0))
+        if not len(used) or not len(matrix):
+            return result
+        
+        # Сравниваем только по символам, которые есть в запросах, и блоками, чтобы ограничить память
+        block = max(1, self.BLOCK_ELEMENTS // (len(matrix) * len(used)))
+        for start in range(0, len(queries), block):
+            block_counts = query_counts[start:start + block]
+            columns = np.flatnonzero(block_counts.any(axis=0))
+            if len(columns):
+                result[start:start + block] = np.minimum(
+                    block_counts[:, None, columns], matrix[None, :, columns]
+                ).sum(axis=2)
+        return result
+    
+    def _ratios(self, queries: List[str], rows: Optional[slice], combine: Callable):
+        common = self.common_counts(queries, rows)
+        query_lengths = [len(query or "") for query in queries]
+        
+        if np is None:
+            lengths = [self.lengths[row] for row in self._rows(rows)]
+            return [combine(row_common, query_length, lengths)
+                    for row_common, query_length in zip(common, query_lengths)]
+        
+        lengths = self.lengths if rows is None else self.lengths[rows]
+        return combine(common, np.array(query_lengths, dtype=np.int64)[:, None], lengths[None, :])
+    
+    def quick_ratio(self, queries: List[str], rows: Optional[slice] = None):
+        """Верхняя оценка SequenceMatcher.ratio() для каждой пары"""
+        def combine(common, query_length, lengths):
+            if np is None:
+                return [2.0 * c / (query_length + length) if query_length + length else 1.0
+                        for c, length in zip(common, lengths)]
+            total = query_length + lengths
+            return np.where(total > 0, 2.0 * common / np.maximum(total, 1), 1.0)
+        
+        return self._ratios(queries, rows, combine)
+
+
+class ChannelNameNormalizer:
+    """Приводит название канала к ключу поиска: регистр, пробелы, знаки и суффиксы качества"""
+    
+    DEFAULT_QUALITY_SUFFIXES = ("hd", "fhd", "uhd", "sd", "hq", "4k", "8k",
+                                "orig", "original", "+1", "+2", "+3", "+4")
+    
+    TOKEN_PATTERN = re.compile(r'\+\d+|[^\W_]+')
+    
+    def __init__(self, quality_suffixes: Optional[List[str]] = None):
+        if quality_suffixes is None:
+            quality_suffixes = self.DEFAULT_QUALITY_SUFFIXES
+        self.quality_suffixes = self.parse_suffixes(quality_suffixes)
+        self.key = tuple(sorted(self.quality_suffixes))
+    
+    @classmethod
+    def parse_suffixes(cls, suffixes: List[str]) -> frozenset:
+        return frozenset(
+            token for suffix in suffixes
+            for token in cls.TOKEN_PATTERN.findall(str(suffix).casefold())
+        )
+    
+    def tokens(self, name: str) -> List[str]:
+        tokens = self.TOKEN_PATTERN.findall((name or "").casefold().replace('ё', 'е'))
+        
+        # Суффиксы качества убираем только с конца: «HD Life» остаётся каналом «hd life»
+        end = len(tokens)
+        while end > 0 and tokens[end - 1] in self.quality_suffixes:
+            end -= 1
+        return tokens[:end] if end else tokens
+    
+    def normalize(self, name: str) -> str:
+        return " ".join(self.tokens(name))
+
+
 class LinkReplacementSettings:
     
     def __init__(self):
@@ -520,6 +786,19 @@ class LinkReplacementSettings:
         self.prioritize_whitelisted: bool = True
         self.blacklist_priority: int = -10
         self.whitelist_priority: int = 10
+        self.use_check_cache: bool = True
+        self.check_cache_ttl_hours: int = 24
+        self.incremental_stale_hours: int = 72
+        self.hls_deep_probe: bool = False
+        self.protocol_timeouts: Dict[str, float] = {'rtmp': 5, 'rtsp': 5, 'udp': 3, 'tcp': 3}
+        self.adaptive_timeouts: bool = True
+        self.adaptive_timeout_min: float = 1.0
+        self.adaptive_timeout_max: float = 15.0
+        self.global_max_workers: int = 20
+        self.global_bandwidth_kbps: int = 0
+        self.redirect_cache_ttl_minutes: int = 10
+        self.name_quality_suffixes: List[str] = list(ChannelNameNormalizer.DEFAULT_QUALITY_SUFFIXES)
+        self._name_normalizer: Optional[ChannelNameNormalizer] = None
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -546,7 +825,19 @@ class LinkReplacementSettings:
             'whitelisted_domains': self.whitelisted_domains,
             'prioritize_whitelisted': self.prioritize_whitelisted,
             'blacklist_priority': self.blacklist_priority,
-            'whitelist_priority': self.whitelist_priority
+            'whitelist_priority': self.whitelist_priority,
+            'use_check_cache': self.use_check_cache,
+            'check_cache_ttl_hours': self.check_cache_ttl_hours,
+            'incremental_stale_hours': self.incremental_stale_hours,
+            'hls_deep_probe': self.hls_deep_probe,
+            'protocol_timeouts': self.protocol_timeouts,
+            'adaptive_timeouts': self.adaptive_timeouts,
+            'adaptive_timeout_min': self.adaptive_timeout_min,
+            'adaptive_timeout_max': self.adaptive_timeout_max,
+            'global_max_workers': self.global_max_workers,
+            'global_bandwidth_kbps': self.global_bandwidth_kbps,
+            'redirect_cache_ttl_minutes': self.redirect_cache_ttl_minutes,
+            'name_quality_suffixes': self.name_quality_suffixes
         }
     
     @classmethod
@@ -579,8 +870,96 @@ class LinkReplacementSettings:
         settings.blacklist_priority = data.get('blacklist_priority', -10)
         settings.whitelist_priority = data.get('whitelist_priority', 10)
         
+        settings.use_check_cache = data.get('use_check_cache', True)
+        settings.check_cache_ttl_hours = data.get('check_cache_ttl_hours', 24)
+        settings.incremental_stale_hours = data.get('incremental_stale_hours', 72)
+        settings.hls_deep_probe = data.get('hls_deep_probe', False)
+        settings.protocol_timeouts.update(data.get('protocol_timeouts', {}))
+        settings.adaptive_timeouts = data.get('adaptive_timeouts', True)
+        settings.adaptive_timeout_min = data.get('adaptive_timeout_min', 1.0)
+        settings.adaptive_timeout_max = data.get('adaptive_timeout_max', 15.0)
+        settings.global_max_workers = data.get('global_max_workers', 20)
+        settings.global_bandwidth_kbps = data.get('global_bandwidth_kbps', 0)
+        settings.redirect_cache_ttl_minutes = data.get('redirect_cache_ttl_minutes', 10)
+        settings.name_quality_suffixes = data.get(
+            'name_quality_suffixes', list(ChannelNameNormalizer.DEFAULT_QUALITY_SUFFIXES))
+        
         return settings
     
+    def load_ip_filters(self, settings: QSettings):
+        for key, attr in [("blacklist_ips", 'blacklisted_ips'),
+                          ("blacklist_domains", 'blacklisted_domains'),
+                          ("whitelist_ips", 'whitelisted_ips'),
+                          ("whitelist_domains", 'whitelisted_domains')]:
+            value = settings.value(key, [])
+            setattr(self, attr, value if isinstance(value, list) else [])
+    
+    def load_check_settings(self, settings: QSettings):
+        self.use_check_cache = settings.value(
+            "use_check_cache", self.use_check_cache, type=bool)
+        self.check_cache_ttl_hours = settings.value(
+            "check_cache_ttl_hours", self.check_cache_ttl_hours, type=int)
+        self.incremental_stale_hours = settings.value(
+            "incremental_stale_hours", self.incremental_stale_hours, type=int)
+        self.hls_deep_probe = settings.value(
+            "hls_deep_probe", self.hls_deep_probe, type=bool)
+        for protocol, timeout in self.protocol_timeouts.items():
+            self.protocol_timeouts[protocol] = settings.value(
+                f"protocol_timeout_{protocol}", timeout, type=float)
+        self.adaptive_timeouts = settings.value(
+            "adaptive_timeouts", self.adaptive_timeouts, type=bool)
+        self.adaptive_timeout_min = settings.value(
+            "adaptive_timeout_min", self.adaptive_timeout_min, type=float)
+        self.adaptive_timeout_max = settings.value(
+            "adaptive_timeout_max", self.adaptive_timeout_max, type=float)
+        self.global_max_workers = settings.value(
+            "global_max_workers", self.global_max_workers, type=int)
+        self.global_bandwidth_kbps = settings.value(
+            "global_bandwidth_kbps", self.global_bandwidth_kbps, type=int)
+        self.redirect_cache_ttl_minutes = settings.value(
+            "redirect_cache_ttl_minutes", self.redirect_cache_ttl_minutes, type=int)
+    
+    def save_check_settings(self, settings: QSettings):
+        settings.setValue("use_check_cache", self.use_check_cache)
+        settings.setValue("check_cache_ttl_hours", self.check_cache_ttl_hours)
+        settings.setValue("incremental_stale_hours", self.incremental_stale_hours)
+        settings.setValue("hls_deep_probe", self.hls_deep_probe)
+        for protocol, timeout in self.protocol_timeouts.items():
+            settings.setValue(f"protocol_timeout_{protocol}", timeout)
+        settings.setValue("adaptive_timeouts", self.adaptive_timeouts)
+        settings.setValue("adaptive_timeout_min", self.adaptive_timeout_min)
+        settings.setValue("adaptive_timeout_max", self.adaptive_timeout_max)
+        settings.setValue("global_max_workers", self.global_max_workers)
+        settings.setValue("global_bandwidth_kbps", self.global_bandwidth_kbps)
+        settings.setValue("redirect_cache_ttl_minutes", self.redirect_cache_ttl_minutes)
+    
+    def get_checker_options(self, host_latency: Optional['HostLatencyTracker'] = None,
+                            redirect_cache: Optional['RedirectCache'] = None) -> Dict[str, Any]:
+        """Параметры URLCheckerWorker из настроек проверки"""
+        return {
+            'redirect_cache': redirect_cache,
+            'timeout': self.check_timeout,
+            'max_workers': self.max_workers,
+            'deep_probe_hls': self.hls_deep_probe,
+            'protocol_timeouts': self.protocol_timeouts,
+            'host_latency': host_latency,
+            'timeout_bounds': ((self.adaptive_timeout_min, self.adaptive_timeout_max)
+                               if self.adaptive_timeouts else None)
+        }
+    
+    def get_name_normalizer(self) -> 'ChannelNameNormalizer':
+        normalizer = self._name_normalizer
+        if normalizer is None or normalizer.quality_suffixes != ChannelNameNormalizer.parse_suffixes(
+                self.name_quality_suffixes):
+            normalizer = ChannelNameNormalizer(self.name_quality_suffixes)
+            self._name_normalizer = normalizer
+        return normalizer
+    
+    def apply_execution_limits(self, service: Optional['ExecutionService'] = None):
+        (service or ExecutionService.shared()).configure(
+            self.global_max_workers, self.global_bandwidth_kbps * 1024
+        )
+    
     def is_blacklisted(self, url: str) -> bool:
         if not self.use_ip_filtering:
             return False
@@ -622,9 +1001,389 @@ class LinkReplacementSettings:
             return 0
 
 
+class ChannelNameSearchIndex:
+    """Инвертированный индекс названий каналов для похожего и нечеткого поиска.
+    
+    Обе метрики — доля общих слов (нечеткий поиск) или символов (похожий поиск) от
+    размера большего названия. Символ индексируется вместе с номером его повтора в
+    названии, поэтому число общих записей равно числу общих символов. С NumPy общие
+    токены запроса со всеми записями подходящего размера считаются одной операцией
+    над списками токенов; без NumPy по индексу отбираются кандидаты, у которых может
+    набраться нужная доля, и сравниваются только они.
+    """
+    
+    WORD_PATTERN = re.compile(r'\w+')
+    
+    def __init__(self, channels: List[ChannelData]):
+        self.channels = channels
+        self._names = [(channel.name or "").lower() for channel in channels]
+        self._lock = threading.Lock()
+        self._char_index = None
+        self._word_index = None
+        self._removed: Set[int] = set()
+        self._positions: Optional[Dict[int, int]] = None
+        self._delta: Optional['ChannelNameSearchIndex'] = None
+    
+    @staticmethod
+    def _char_tokens(name: str) -> List[Tuple[str, int]]:
+        # (символ, номер повтора): пересечение таких записей — общие символы с учётом повторов,
+        # а размер записи равен длине названия
+        seen: Dict[str, int] = {}
+        tokens = []
+        for char in name:
+            seen[char] = seen.get(char, 0) + 1
+            tokens.append((char, seen[char]))
+        return tokens
+    
+    def _word_tokens(self, name: str) -> Set[str]:
+        return set(self.WORD_PATTERN.findall(name))
+    
+    def _build(self, tokenize: Callable) -> Tuple[List[int], array, Dict[Any, array]]:
+        entry_tokens = [tokenize(name) for name in self._names]
+        
+        # Записи нумеруются по возрастанию размера, чтобы фильтр по длине был срезом списка
+        order = sorted(range(len(entry_tokens)), key=lambda i: len(entry_tokens[i]))
+        sizes = array('i')
+        postings: Dict[Any, array] = {}
+        for rank, i in enumerate(order):
+            tokens = entry_tokens[i]
+            sizes.append(len(tokens))
+            for token in tokens:
+                posting = postings.get(token)
+                if posting is None:
+                    posting = postings[token] = array('i')
+                posting.append(rank)
+        return order, sizes, postings
+    
+    def _get_char_index(self):
+        with self._lock:
+            if self._char_index is None:
+                self._char_index = self._build(self._char_tokens)
+            return self._char_index
+    
+    def _get_word_index(self):
+        with self._lock:
+            if self._word_index is None:
+                self._word_index = self._build(self._word_tokens)
+            return self._word_index
+    
+    @staticmethod
+    def _size_range(index, size: int, threshold: float) -> Tuple[int, int, int]:
+        """Минимум общих токенов и срез рангов записей, размер которых допускает совпадение"""
+        _, sizes, _ = index
+        # Допуск на погрешность float: лишний кандидат отсеется при сравнении, пропущенный — нет
+        min_common = max(math.ceil(size * threshold - 1e-9), 1)
+        max_size = math.floor(size / threshold + 1e-9)
+        return min_common, bisect.bisect_left(sizes, min_common), bisect.bisect_right(sizes, max_size)
+    
+    @staticmethod
+    def _candidates(index, tokens: List[Any], threshold: float) -> List[int]:
+        order, sizes, postings = index
+        size = len(tokens)
+        min_common, start, stop = ChannelNameSearchIndex._size_range(index, size, threshold)
+        if start >= stop:
+            return []
+        
+        # Нужно хотя бы min_common общих токенов, значит среди любых size - min_common + 1
+        # токенов запроса есть общий; берём самые редкие
+        tokens = sorted(tokens, key=lambda token: len(postings.get(token, ())))
+        candidates = set()
+        for token in tokens[:size - min_common + 1]:
+            posting = postings.get(token)
+            if posting:
+                candidates.update(posting[bisect.bisect_left(posting, start):bisect.bisect_left(posting, stop)])
+        return sorted(order[rank] for rank in candidates)
+    
+    def updated(self, removed: List[ChannelData],
+                added: List[ChannelData]) -> Optional['ChannelNameSearchIndex']:
+        """Копия индекса с изменениями источника: основная часть общая, удалённые записи скрыты,
+        добавленные ищутся в небольшом дополнительном индексе. None — изменений слишком много
+        и индекс дешевле построить заново"""
+        if self._positions is None:
+            self._positions = {id(channel): i for i, channel in enumerate(self.channels)}
+        
+        removed_ids = {id(channel) for channel in removed}
+        delta = [channel for channel in (self._delta.channels if self._delta else [])
+                 if id(channel) not in removed_ids] + added
+        
+        index = copy.copy(self)
+        index._removed = self._removed | {
+            self._positions[id(channel)] for channel in removed if id(channel) in self._positions
+        }
+        if len(index._removed) + len(delta) > len(self.channels) // 5:
+            return None
+        index._delta = ChannelNameSearchIndex(delta) if delta else None
+        return index
+    
+    def find_similar(self, name: str, threshold: float) -> List[ChannelData]:
+        query = (name or "").lower()
+        if threshold <= 0:
+            results = [channel for i, channel in enumerate(self.channels) if i not in self._removed]
+        elif not query:
+            results = [channel for i, (channel, other) in enumerate(zip(self.channels, self._names))
+                       if not other and i not in self._removed]
+        else:
+            results = [self.channels[i]
+                       for i in self._matches(self._get_char_index(), self._char_tokens(query),
+                                              self._char_tokens, threshold)
+                       if i not in self._removed]
+        
+        if self._delta:
+            results.extend(self._delta.find_similar(name, threshold))
+        return results
+    
+    def _matches(self, index, tokens: List[Any], tokenize: Callable, threshold: float) -> List[int]:
+        """Записи, у которых доля общих токенов от размера большей из двух записей не ниже порога"""
+        if np is not None:
+            return self._matches_numpy(index, tokens, threshold)
+        
+        query = set(tokens)
+        results = []
+        for i in self._candidates(index, tokens, threshold):
+            other = tokenize(self._names[i])
+            if len(query.intersection(other)) / max(len(tokens), len(other)) >= threshold:
+                results.append(i)
+        return results
+    
+    @staticmethod
+    def _matches_numpy(index, tokens: List[Any], threshold: float) -> List[int]:
+        """Общие токены со всеми записями подходящего размера считаются сразу: число вхождений
+        ранга в списки токенов запроса и есть число общих токенов"""
+        order, sizes, postings = index
+        _, start, stop = ChannelNameSearchIndex._size_range(index, len(tokens), threshold)
+        if start >= stop:
+            return []
+        
+        parts = []
+        for token in tokens:
+            posting = postings.get(token)
+            if posting:
+                lo = bisect.bisect_left(posting, start)
+                hi = bisect.bisect_left(posting, stop)
+                if lo < hi:
+                    parts.append(np.frombuffer(posting, dtype=np.intc)[lo:hi])
+        if not parts:
+            return []
+        
+        common = np.bincount(np.concatenate(parts) - start, minlength=stop - start)
+        lengths = np.frombuffer(sizes, dtype=np.intc)[start:stop]
+        scores = common / np.maximum(lengths, len(tokens))
+        return sorted(order[rank] for rank in (np.flatnonzero(scores >= threshold) + start).tolist())
+    
+    def find_fuzzy(self, name: str, threshold: float) -> List[ChannelData]:
+        words = self._word_tokens((name or "").lower())
+        if not words:
+            return []
+        
+        if threshold <= 0:
+            results = [channel for i, (channel, other) in enumerate(zip(self.channels, self._names))
+                       if self.WORD_PATTERN.search(other) and i not in self._removed]
+        else:
+            results = [self.channels[i]
+                       for i in self._matches(self._get_word_index(), list(words), self._word_tokens, threshold)
+                       if i not in self._removed]
+        
+        if self._delta:
+            results.extend(self._delta.find_fuzzy(name, threshold))
+        return results
+
+
+class LinkSourceCatalog:
+    """Каналы источников в памяти: загружаются один раз и общие для всех потоков замены"""
+    
+    def __init__(self, manager: 'LinkSourceManager'):
+        self.manager = manager
+        self._channels: Dict[str, List[ChannelData]] = {}
+        self._lock = threading.Lock()
+        self._source_locks: Dict[str, threading.Lock] = {}
+        self._source_indexes: Dict[Tuple[str, tuple], Dict[str, List[ChannelData]]] = {}
+        self._global_indexes: Dict[Tuple[tuple, tuple], Dict[str, List[ChannelData]]] = {}
+        self._search_indexes: Dict[tuple, ChannelNameSearchIndex] = {}
+        self._generation = 0
+    
+    def get_channels(self, source: LinkSource) -> List[ChannelData]:
+        with self._lock:
+            channels = self._channels.get(source.name)
+            if channels is not None:
+                return channels
+            source_lock = self._source_locks.setdefault(source.name, threading.Lock())
+        
+        # Пока один поток читает источник, остальные ждут его, а не читают параллельно
+        with source_lock:
+            with self._lock:
+                channels = self._channels.get(source.name)
+                if channels is not None:
+                    return channels
+            
+            channels = self.manager.load_cached_links(source)
+            if channels is None:
+                with self.manager.source_refresh_lock(source.name):
+                    channels = self.manager.load_cached_links(source)
+                    if channels is None:
+                        channels = self.manager.load_links_from_source(source)
+                        if channels:
+                            self.manager.cache_links(source, channels)
+            
+            channels = channels or []
+            with self._lock:
+                self._channels[source.name] = channels
+            return channels
+    
+    def preload(self, sources: List[LinkSource]):
+        for source in sources:
+            self.get_channels(source)
+    
+    def set_channels(self, source_name: str, channels: List[ChannelData]):
+        with self._lock:
+            self._channels[source_name] = channels
+            self._drop_indexes(source_name)
+    
+    def invalidate(self, source_name: Optional[str] = None):
+        with self._lock:
+            if source_name is None:
+                self._channels.clear()
+            else:
+                self._channels.pop(source_name, None)
+            self._drop_indexes(source_name)
+    
+    def apply_changes(self, source_name: str, channels: List[ChannelData],
+                      removed: List[ChannelData], added: List[ChannelData]):
+        """Заменяет каналы источника и правит индексы только на изменившиеся записи.
+        В channels неизменившиеся записи должны быть прежними объектами"""
+        removed_ids = {id(channel) for channel in removed}
+        with self._lock:
+            self._channels[source_name] = channels
+            self._generation += 1
+            
+            for key in [key for key in self._source_indexes if key[0] == source_name]:
+                normalizer = ChannelNameNormalizer(list(key[1]))
+                index = dict(self._source_indexes[key])
+                for channel in removed:
+                    name = normalizer.normalize(channel.name)
+                    remaining = [other for other in index.get(name, []) if id(other) not in removed_ids]
+                    if remaining:
+                        index[name] = remaining
+                    else:
+                        index.pop(name, None)
+                for channel in added:
+                    name = normalizer.normalize(channel.name)
+                    index[name] = index.get(name, []) + [channel]
+                self._source_indexes[key] = index
+            
+            # Общий индекс собирается из индексов источников, поэтому его достаточно собрать заново
+            for key in [key for key in self._global_indexes if source_name in key[0]]:
+                del self._global_indexes[key]
+            
+            for key in [key for key in self._search_indexes if source_name in key]:
+                index = self._search_indexes[key].updated(removed, added)
+                if index is None:
+                    del self._search_indexes[key]
+                else:
+                    self._search_indexes[key] = index
+    
+    def is_loaded(self, source_name: str) -> bool:
+        with self._lock:
+            return source_name in self._channels
+    
+    def get_loaded_channels(self, source_name: str) -> List[ChannelData]:
+        with self._lock:
+            return self._channels.get(source_name, [])
+    
+    def _drop_indexes(self, source_name: Optional[str]):
+        self._generation += 1
+        self._search_indexes.clear()
+        self._global_indexes.clear()
+        if source_name is None:
+            self._source_indexes.clear()
+        else:
+            for key in [key for key in self._source_indexes if key[0] == source_name]:
+                del self._source_indexes[key]
+    
+    def get_source_index(self, source: LinkSource,
+                         normalizer: ChannelNameNormalizer) -> Dict[str, List[ChannelData]]:
+        channels = self.get_channels(source)
+        key = (source.name, normalizer.key)
+        with self._lock:
+            index = self._source_indexes.get(key)
+            if index is not None:
+                return index
+        
+        index = {}
+        for channel in channels:
+            index.setdefault(normalizer.normalize(channel.name), []).append(channel)
+        
+        with self._lock:
+            # Источник могли обновить, пока строился индекс, — тогда не сохраняем устаревший
+            if self._channels.get(source.name) is channels:
+                self._source_indexes[key] = index
+        return index
+    
+    def get_search_index(self, sources: List[LinkSource]) -> ChannelNameSearchIndex:
+        key = tuple(source.name for source in sources)
+        with self._lock:
+            index = self._search_indexes.get(key)
+            if index is not None:
+                return index
+            generation = self._generation
+        
+        channels = []
+        for source in sources:
+            channels.extend(self.get_channels(source))
+        index = ChannelNameSearchIndex(channels)
+        
+        with self._lock:
+            if self._generation == generation:
+                index = self._search_indexes.setdefault(key, index)
+        return index
+    
+    def get_index(self, sources: List[LinkSource],
+                  normalizer: ChannelNameNormalizer) -> Dict[str, List[ChannelData]]:
+        """Общий индекс по нормализованному названию для набора источников"""
+        key = (tuple(source.name for source in sources), normalizer.key)
+        with self._lock:
+            index = self._global_indexes.get(key)
+            if index is not None:
+                return index
+            generation = self._generation
+        
+        index = {}
+        for source in sources:
+            for name, channels in self.get_source_index(source, normalizer).items():
+                index.setdefault(name, []).extend(channels)
+        
+        with self._lock:
+            if self._generation == generation:
+                self._global_indexes[key] = index
+        return index
+    
+    def find_exact(self, sources: List[LinkSource], name: str,
+                   normalizer: ChannelNameNormalizer) -> List[ChannelData]:
+        with self._lock:
+            unloaded = [source for source in sources if source.name not in self._channels]
+        
+        # Источники, которых нет в памяти, ищем одним запросом к кэшу и целиком не читаем;
+        # загруженные и не найденные в кэше — по общему индексу в памяти
+        results = []
+        queried: Set[str] = set()
+        if unloaded:
+            results, missing = self.manager.find_cached_links(unloaded, name, normalizer)
+            queried = {source.name for source in unloaded} - {source.name for source in missing}
+        
+        in_memory = [source for source in sources if source.name not in queried]
+        if in_memory:
+            results.extend(self.get_index(in_memory, normalizer).get(normalizer.normalize(name), []))
+        return results
+
+
+class SourceFetchError(Exception):
+    """Источник не удалось прочитать; его кэш и сведения о прошлой загрузке остаются прежними"""
+
+
 class LinkSourceManager:
     
-    def __init__(self, config_dir: str = None):
+    UNKNOWN_LINK_SCORE = 50.0
+    
+    def __init__(self, config_dir: str = None, url_check_cache: 'URLCheckCache' = None):
         if config_dir is None:
             config_dir = SystemThemeManager.get_config_dir()
         
@@ -632,8 +1391,13 @@ class LinkSourceManager:
         self.sources_file = os.path.join(config_dir, "link_sources.json")
         self.sources: List[LinkSource] = []
         self.cache_dir = os.path.join(config_dir, "link_cache")
+        self.url_check_cache = url_check_cache
+        self.catalog = LinkSourceCatalog(self)
+        self._save_lock = threading.Lock()
+        self._refresh_locks: Dict[str, threading.Lock] = {}
         
         self._ensure_config_dir()
+        self.link_store = LinkCacheStore(self.cache_dir)
         self._load_sources()
     
     def _ensure_config_dir(self):
@@ -664,9 +1428,11 @@ class LinkSourceManager:
     
     def _save_sources(self):
         try:
-            data = [source.to_dict() for source in self.sources]
-            with open(self.sources_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # Источники обновляются параллельно, и каждый поток сохраняет список
+            with self._save_lock:
+                data = [source.to_dict() for source in self.sources]
+                with open(self.sources_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
             return True
         except (IOError, OSError) as e:
             logger.error(f"Ошибка сохранения источников: {e}")
@@ -678,12 +1444,21 @@ class LinkSourceManager:
     
     def remove_source(self, source_name: str) -> bool:
         self.sources = [s for s in self.sources if s.name != source_name]
+        self.catalog.invalidate(source_name)
+        self.link_store.remove(source_name)
         return self._save_sources()
     
     def update_source(self, old_name: str, new_source: LinkSource) -> bool:
         for i, source in enumerate(self.sources):
             if source.name == old_name:
+                if (source.path, source.source_type) != (new_source.path, new_source.source_type):
+                    new_source.etag = ""
+                    new_source.last_modified = ""
                 self.sources[i] = new_source
+                self.catalog.invalidate(old_name)
+                self.catalog.invalidate(new_source.name)
+                if old_name != new_source.name:
+                    self.link_store.remove(old_name)
                 return self._save_sources()
         return False
     
@@ -700,33 +1475,155 @@ class LinkSourceManager:
         return None
     
     def load_links_from_source(self, source: LinkSource) -> List[ChannelData]:
-        channels = []
+        try:
+            return self.fetch_source(source, conditional=False) or []
+        except SourceFetchError as e:
+            logger.error(str(e))
+            return []
+    
+    def fetch_source(self, source: LinkSource, conditional: bool = True,
+                     cancel_token: Optional['CancellationToken'] = None) -> Optional[List[ChannelData]]:
+        """Читает источник. С conditional=True возвращает None, если источник не изменился
+        с прошлой загрузки: онлайн — по ETag/Last-Modified, локальный — по размеру и времени файла.
+        Если прочитать не удалось, бросает SourceFetchError и сведения об источнике не меняет"""
+        # Без кэша ответ 304 оставил бы источник пустым, поэтому условный запрос только при наличии кэша
+        conditional = conditional and self.link_store.has_source(source.name)
+        etag = source.etag
+        last_modified = source.last_modified
         
         try:
             if source.source_type == "local":
-                if os.path.exists(source.path):
-                    with open(source.path, 'r', encoding='utf-8', errors='replace') as f:
-                        content = f.read()
-                    channels = self._parse_content(content, source.name)
+                if not os.path.exists(source.path):
+                    raise SourceFetchError(f"Файл источника {source.name} не найден: {source.path}")
+                
+                stat = os.stat(source.path)
+                validator = f"{stat.st_size}-{stat.st_mtime_ns}"
+                if conditional and validator == source.etag:
+                    return None
+                
+                with open(source.path, 'r', encoding='utf-8', errors='replace') as f:
+                    content = f.read()
+                channels = self._parse_content(content, source.name)
+                etag = validator
             elif source.source_type == "online":
-                try:
-                    response = requests.get(source.path, timeout=10, verify=False)
-                    if response.status_code == 200:
-                        channels = self._parse_content(response.text, source.name)
-                except Exception as e:
-                    logger.error(f"Ошибка загрузки онлайн источника {source.name}: {e}")
-            
-            source.total_links = len(channels)
+                headers = {}
+                if conditional and source.etag:
+                    headers['If-None-Match'] = source.etag
+                if conditional and source.last_modified:
+                    headers['If-Modified-Since'] = source.last_modified
+                
+                http = cancel_token.session() if cancel_token else requests
+                response = http.get(source.path, timeout=10, verify=False, headers=headers)
+                if response.status_code == 304 and headers:
+                    source.last_updated = datetime.now()
+                    self._save_sources()
+                    return None
+                if response.status_code != 200:
+                    raise SourceFetchError(f"Источник {source.name} ответил HTTP {response.status_code}")
+                
+                channels = self._parse_content(response.text, source.name)
+                etag = response.headers.get('ETag', '')
+                last_modified = response.headers.get('Last-Modified', '')
+            else:
+                raise SourceFetchError(f"Неизвестный тип источника {source.name}: {source.source_type}")
             
+        except SourceFetchError:
+            raise
         except Exception as e:
-            logger.error(f"Ошибка загрузки источника {source.name}: {e}")
-            return []
+            raise SourceFetchError(f"Ошибка загрузки источника {source.name}: {e}") from e
         
+        source.etag = etag
+        source.last_modified = last_modified
+        source.total_links = len(channels)
         source.last_updated = datetime.now()
         self._save_sources()
         
         return channels
     
+    def source_refresh_lock(self, source_name: str) -> threading.Lock:
+        """Блокировка записи кэша источника: обновление сверяет кэш с новым содержимым
+        и применяет отличия, два таких обновления одного источника не должны пересекаться"""
+        with self._save_lock:
+            return self._refresh_locks.setdefault(source_name, threading.Lock())
+    
+    def refresh_source(self, source: LinkSource,
+                       cancel_token: Optional['CancellationToken'] = None) -> Optional[List[ChannelData]]:
+        """Перечитывает источник и обновляет его кэш и каталог; None — источник не изменился.
+        Ошибку чтения (SourceFetchError) передаёт вызывающему"""
+        # Ручное обновление и автообновление одного источника выполняются по очереди:
+        # второе увидит уже обновлённый кэш и, скорее всего, получит «не изменился»
+        with self.source_refresh_lock(source.name):
+            channels = self.fetch_source(source, cancel_token=cancel_token)
+            if channels is None:
+                return None
+            
+            if channels:
+                self.update_cached_links(source, channels)
+            else:
+                self.catalog.invalidate(source.name)
+            return channels
+    
+    def update_cached_links(self, source: LinkSource, channels: List[ChannelData]) -> Dict[str, int]:
+        """Применяет к кэшу и каталогу только отличия нового содержимого источника от прежнего
+        и записывает статистику изменений в source.last_refresh_stats"""
+        hashes = [LinkCacheStore.entry_hash(channel) for channel in channels]
+        previous = self.link_store.get_entry_counts(source.name)
+        if previous is None:
+            self.cache_links(source, channels)
+            stats = {'added': len(channels), 'removed': 0, 'changed': 0, 'unchanged': 0}
+        else:
+            old_counts, old_names = previous
+            new_counts = Counter(hashes)
+            removed_counts = old_counts - new_counts
+            extra = new_counts - old_counts
+            added = []
+            for entry_hash, channel in zip(hashes, channels):
+                if extra[entry_hash] > 0:
+                    extra[entry_hash] -= 1
+                    added.append((entry_hash, channel))
+            
+            if removed_counts or added:
+                self.link_store.apply_diff(source.name, removed_counts, added)
+            source.last_cache_update = datetime.now()
+            source.link_cache = {}
+            
+            if self.catalog.is_loaded(source.name):
+                self._apply_catalog_diff(source.name, channels, hashes)
+            
+            # Изменённой считаем запись, у которой сменились ссылка или атрибуты, но осталось название
+            removed_names = Counter()
+            for entry_hash, count in removed_counts.items():
+                removed_names[old_names.get(entry_hash)] += count
+            added_names = Counter(channel.name for _, channel in added)
+            changed = sum((removed_names & added_names).values())
+            stats = {'added': len(added) - changed, 'removed': sum(removed_counts.values()) - changed,
+                     'changed': changed, 'unchanged': len(channels) - len(added)}
+        
+        source.last_refresh_stats = stats
+        self._save_sources()
+        logger.info(f"Источник {source.name}: добавлено {stats['added']}, удалено {stats['removed']}, "
+                    f"изменено {stats['changed']}, без изменений {stats['unchanged']}")
+        return stats
+    
+    def _apply_catalog_diff(self, source_name: str, channels: List[ChannelData], hashes: List[str]):
+        # Неизменившиеся записи остаются прежними объектами, на которые уже ссылаются индексы
+        previous: Dict[str, deque] = {}
+        for channel in self.catalog.get_loaded_channels(source_name):
+            previous.setdefault(LinkCacheStore.entry_hash(channel), deque()).append(channel)
+        
+        merged = []
+        added = []
+        for entry_hash, channel in zip(hashes, channels):
+            same = previous.get(entry_hash)
+            if same:
+                merged.append(same.popleft())
+            else:
+                merged.append(channel)
+                added.append(channel)
+        
+        removed = [channel for same in previous.values() for channel in same]
+        self.catalog.apply_changes(source_name, merged, removed, added)
+    
     def _parse_content(self, content: str, source_name: str) -> List[ChannelData]:
         channels = []
         lines = content.split('\n')
@@ -786,68 +1683,91 @@ class LinkSourceManager:
         
         return channels
     
+    def _legacy_cache_file(self, source: LinkSource) -> str:
+        return os.path.join(self.cache_dir, f"{hashlib.md5(source.name.encode()).hexdigest()}.json")
+    
     def cache_links(self, source: LinkSource, channels: List[ChannelData]):
-        try:
-            cache_file = os.path.join(self.cache_dir, f"{hashlib.md5(source.name.encode()).hexdigest()}.json")
-            
-            cache_data = {
-                'channels': [ch.to_dict() for ch in channels],
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-            
-            source.last_cache_update = datetime.now()
-            source.link_cache = {ch.name: [ch.url] for ch in channels if ch.url}
-            
-        except Exception as e:
-            logger.error(f"Ошибка кэширования ссылок: {e}")
+        self.link_store.put_channels(source.name, channels)
+        source.last_cache_update = datetime.now()
+        # Поиск по названию теперь идёт через индекс кэша, копия ссылок в link_sources.json не нужна
+        source.link_cache = {}
+        
+        self.catalog.set_channels(source.name, channels)
     
-    def load_cached_links(self, source: LinkSource) -> Optional[List[ChannelData]]:
+    def _migrate_legacy_cache(self, source: LinkSource):
+        cache_file = self._legacy_cache_file(source)
+        if not os.path.exists(cache_file):
+            return
+        
         try:
-            cache_file = os.path.join(self.cache_dir, f"{hashlib.md5(source.name.encode()).hexdigest()}.json")
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cache_data = json.load(f)
             
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                
-                channels = [ChannelData.from_dict(ch) for ch in cache_data.get('channels', [])]
-                return channels
-                
+            channels = [ChannelData.from_dict(ch) for ch in cache_data.get('channels', [])]
+            self.link_store.put_channels(source.name, channels)
+            os.remove(cache_file)
+            logger.info(f"Кэш источника {source.name} перенесён в базу ({len(channels)} каналов)")
         except Exception as e:
-            logger.error(f"Ошибка загрузки кэша: {e}")
-        
-        return None
+            logger.error(f"Ошибка переноса кэша источника {source.name}: {e}")
     
-    def search_channel(self, channel_name: str, settings: LinkReplacementSettings) -> List[ChannelData]:
+    def load_cached_links(self, source: LinkSource) -> Optional[List[ChannelData]]:
+        if not self.link_store.has_source(source.name):
+            self._migrate_legacy_cache(source)
+        return self.link_store.get_channels(source.name)
+    
+    def find_cached_links(self, sources: List[LinkSource], name: str,
+                          normalizer: ChannelNameNormalizer) -> Tuple[List[ChannelData], List[LinkSource]]:
+        """Поиск по названию в кэше без загрузки источников: найденные каналы и источники,
+        которых в кэше нет (старый кэш таких источников переносится при их загрузке)"""
+        found = self.link_store.find_by_name([source.name for source in sources], name, normalizer)
+        if found is None:
+            return [], list(sources)
+        channels, cached = found
+        return channels, [source for source in sources if source.name not in cached]
+    
+    def search_channel(self, channel_name: str, settings: LinkReplacementSettings,
+                       headers: Optional[Dict[str, str]] = None) -> List[ChannelData]:
+        """headers - заголовки заменяемого канала: с ними кандидаты проверяются и под
+        их ключом лежат оценки ссылок в кэше проверок"""
         results = []
         enabled_sources = self.get_enabled_sources()
         
-        for source in enabled_sources:
-            cached_channels = self.load_cached_links(source)
-            if cached_channels is None:
-                cached_channels = self.load_links_from_source(source)
-                if cached_channels:
-                    self.cache_links(source, cached_channels)
-            
-            if not cached_channels:
-                continue
-            
-            for cached_channel in cached_channels:
-                if self._is_match(channel_name, cached_channel.name, settings):
-                    results.append(cached_channel)
+        if settings.search_type == "exact":
+            results = self.catalog.find_exact(enabled_sources, channel_name, settings.get_name_normalizer())
+        elif settings.search_type == "similar":
+            results = self.catalog.get_search_index(enabled_sources).find_similar(
+                channel_name, settings.min_name_similarity)
+        elif settings.search_type == "fuzzy":
+            results = self.catalog.get_search_index(enabled_sources).find_fuzzy(
+                channel_name, settings.min_name_similarity)
+        
+        # Каналы каталога общие для всех потоков, поэтому оценки не записываем в них
+        scores = {}
+        if self.url_check_cache and results:
+            keys = {URLUtils.check_key(ch.url, headers): ch.url for ch in results if ch.url}
+            scores = {keys[key]: score for key, score in self.url_check_cache.get_scores(list(keys)).items()}
+        
+        def get_score(channel: ChannelData) -> float:
+            score = scores.get(channel.url, channel.link_score)
+            return score if score is not None else self.UNKNOWN_LINK_SCORE
         
         results.sort(key=lambda x: (
-            -self._get_source_priority(x.link_source),
-            -settings.get_url_priority(x.url) if x.url else 0
+            -settings.get_url_priority(x.url) if x.url else 0,
+            -get_score(x),
+            -self._get_source_priority(x.link_source)
         ))
         
-        return results[:settings.max_alternative_urls]
+        best = []
+        for result in results[:settings.max_alternative_urls]:
+            channel = result.copy()
+            channel.link_score = scores.get(result.url, result.link_score)
+            best.append(channel)
+        return best
     
     def _is_match(self, channel1_name: str, channel2_name: str, settings: LinkReplacementSettings) -> bool:
         if settings.search_type == "exact":
-            return channel1_name.lower() == channel2_name.lower()
+            normalizer = settings.get_name_normalizer()
+            return normalizer.normalize(channel1_name) == normalizer.normalize(channel2_name)
         
         elif settings.search_type == "similar":
             similarity = self._calculate_similarity(channel1_name, channel2_name)
@@ -890,6 +1810,134 @@ class LinkSourceManager:
         return 5
 
 
+class CancellationToken:
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._resources: 'weakref.WeakSet[Any]' = weakref.WeakSet()
+        self._session: Optional[requests.Session] = None
+    
+    def cancel(self):
+        self._event.set()
+        with self._lock:
+            resources = list(self._resources)
+            self._resources.clear()
+            session = self._session
+            self._session = None
+        
+        for resource in resources:
+            self._close(resource)
+        
+        if session is not None:
+            session.close()
+    
+    def close(self):
+        """Освобождает соединения без отмены"""
+        with self._lock:
+            session = self._session
+            self._session = None
+        
+        if session is not None:
+            session.close()
+    
+    def session(self) -> requests.Session:
+        """Сессия, сокеты которой закрываются при отмене, в том числе во время ожидания ответа"""
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+                adapter = _CancellableHTTPAdapter(self, pool_maxsize=32)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+    
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def register(self, resource: Any):
+        """Запоминает сокет или ответ, чтобы закрыть его при отмене"""
+        with self._lock:
+            if not self._event.is_set():
+                self._resources.add(resource)
+                return
+        self._close(resource)
+    
+    def unregister(self, resource: Any):
+        with self._lock:
+            self._resources.discard(resource)
+    
+    @staticmethod
+    def response_connect_time(response: requests.Response) -> Optional[float]:
+        """Время установления соединения, по которому получен ответ"""
+        connection = getattr(getattr(response, 'raw', None), '_connection', None)
+        return getattr(connection, 'connect_time', None)
+    
+    @staticmethod
+    def _response_socket(response: requests.Response) -> Optional[socket.socket]:
+        raw = getattr(response, 'raw', None)
+        connection = getattr(raw, '_connection', None)
+        sock = getattr(connection, 'sock', None)
+        if sock is None:
+            # Старые версии urllib3 хранят сокет только в файловом объекте
+            fp = getattr(getattr(raw, '_fp', None), 'fp', None)
+            sock = getattr(getattr(fp, 'raw', None), '_sock', None)
+        return sock if isinstance(sock, socket.socket) else None
+    
+    @staticmethod
+    def _close(resource: Any):
+        sock = resource if isinstance(resource, socket.socket) else None
+        if isinstance(resource, requests.Response):
+            sock = CancellationToken._response_socket(resource)
+        
+        # shutdown будит поток, заблокированный в recv, в отличие от close
+        try:
+            if sock is not None:
+                sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            resource.close()
+        except Exception:
+            pass
+
+
+class _CancellableHTTPAdapter(requests.adapters.HTTPAdapter):
+    
+    def __init__(self, cancel_token: CancellationToken, **kwargs):
+        self.cancel_token = cancel_token
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        token = self.cancel_token
+        
+        def connection_class(base):
+            class CancellableConnection(base):
+                def connect(self):
+                    # Время соединения запоминается на самом соединении, отдельное не нужно
+                    start = time.time()
+                    super().connect()
+                    self.connect_time = time.time() - start
+                    token.register(self.sock)
+            return CancellableConnection
+        
+        pool_classes = {}
+        for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items():
+            pool_classes[scheme] = type(pool_class.__name__, (pool_class,), {
+                'ConnectionCls': connection_class(pool_class.ConnectionCls)
+            })
+        self.poolmanager.pool_classes_by_scheme = pool_classes
+
+
+@dataclass
+class HLSSegment:
+    url: str
+    byte_range: Optional[Tuple[int, int]] = None
+    init: Optional['HLSSegment'] = None
+
+
 class URLUtils:
     
     @staticmethod
@@ -965,34 +2013,951 @@ class URLUtils:
             logger.error(f"Неожиданная ошибка проверки URL: {e}")
             return False, None, f"Ошибка: {str(e)[:50]}"
     
+    CHECK_KEY_SEPARATOR = "\x1f"
+    PROBE_BYTES = 1024
+    SCORE_SAMPLE_BYTES = 128 * 1024
+    DEFAULT_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    
     @staticmethod
-    def estimate_quality(response_time: float, status_code: int) -> LinkQuality:
-        if status_code >= 400:
-            return LinkQuality.NOT_WORKING
-        return LinkQuality.WORKING
+    def check_key(url: str, headers: Optional[Dict[str, str]] = None) -> str:
+        if not headers:
+            return url
+        return url + URLUtils.CHECK_KEY_SEPARATOR + json.dumps(headers, sort_keys=True, ensure_ascii=False)
     
     @staticmethod
-    def should_filter_url(url: str, temporary_domains: List[str], unsafe_domains: List[str]) -> bool:
-        url_lower = url.lower()
+    def normalize_check_key(key: str) -> str:
+        """Нормализует только адрес ключа проверки: заголовки добавляются без изменений,
+        иначе разбор URL отрезал бы их часть после «#»"""
+        url, separator, headers = (key or "").partition(URLUtils.CHECK_KEY_SEPARATOR)
+        normalized = URLUtils.normalize_url(url)
+        return normalized + separator + headers if normalized else ""
+    
+    @staticmethod
+    def split_check_key(key: str) -> Tuple[str, Dict[str, str]]:
+        if URLUtils.CHECK_KEY_SEPARATOR not in key:
+            return key, {}
+        url, headers = key.split(URLUtils.CHECK_KEY_SEPARATOR, 1)
+        try:
+            return url, json.loads(headers)
+        except ValueError:
+            return url, {}
+    
+    @staticmethod
+    def request_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        merged = dict(URLUtils.DEFAULT_HEADERS)
+        for key, value in (headers or {}).items():
+            # Заголовок канала заменяет стандартный независимо от регистра имени
+            for existing in [k for k in merged if k.lower() == key.lower()]:
+                del merged[existing]
+            merged[key] = value
+        return merged
+    
+    @staticmethod
+    def open_connection(host: str, port: int, timeout: float,
+                        cancel_token: Optional[CancellationToken] = None) -> socket.socket:
+        if cancel_token is None:
+            return socket.create_connection((host, port), timeout=timeout)
         
-        for domain in temporary_domains:
-            if domain.lower() in url_lower:
-                return True
+        deadline = time.time() + timeout
+        last_error: OSError = socket.timeout("Таймаут")
         
-        for domain in unsafe_domains:
-            if domain.lower() in url_lower:
-                return True
+        for family, sock_type, proto, _, address in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM):
+            sock = socket.socket(family, sock_type, proto)
+            cancel_token.register(sock)
+            try:
+                # Неблокирующее соединение, чтобы отмена срабатывала без ожидания таймаута
+                sock.setblocking(False)
+                error = sock.connect_ex(address)
+                while error in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise socket.timeout("Таймаут")
+                    if cancel_token.is_cancelled():
+                        raise OSError("Проверка отменена")
+                    _, writable, failed = select.select([], [sock], [sock], min(remaining, 0.1))
+                    if writable or failed:
+                        error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                        break
+                
+                if error not in (0, errno.EISCONN):
+                    raise OSError(error, os.strerror(error))
+                
+                sock.settimeout(max(deadline - time.time(), 0.1))
+                return sock
+            except OSError as e:
+                cancel_token.unregister(sock)
+                sock.close()
+                last_error = e
+                if cancel_token.is_cancelled():
+                    break
         
-        return False
-
-
-class SafeWorker(QRunnable):
+        raise last_error
     
-    class WorkerSignals(QObject):
-        progress = pyqtSignal(int, int, str)
-        error = pyqtSignal(str)
-        finished = pyqtSignal()
-        result = pyqtSignal(object)
+    @staticmethod
+    def _release(resource: Any, cancel_token: Optional[CancellationToken] = None):
+        if cancel_token is not None:
+            cancel_token.unregister(resource)
+        try:
+            resource.close()
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _open_stream(url: str, timeout: Tuple[float, float], verify_ssl: bool, headers: Dict[str, str],
+                     cancel_token: Optional[CancellationToken] = None) -> requests.Response:
+        if cancel_token is None:
+            return requests.get(url, timeout=timeout, verify=verify_ssl, headers=headers,
+                                allow_redirects=True, stream=True)
+        
+        if cancel_token.is_cancelled():
+            raise requests.exceptions.ConnectionError("Проверка отменена")
+        
+        response = cancel_token.session().get(url, timeout=timeout, verify=verify_ssl, headers=headers,
+                                              allow_redirects=True, stream=True)
+        cancel_token.register(response)
+        return response
+    
+    @staticmethod
+    def measure_url(url: str, timeout: float = 5, verify_ssl: bool = False,
+                    sample_bytes: int = 0, sample_seconds: float = 0.5,
+                    read_timeout: Optional[float] = None,
+                    cancel_token: Optional[CancellationToken] = None,
+                    redirect_cache: Optional['RedirectCache'] = None,
+                    headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        result = {
+            'success': False,
+            'message': '',
+            'response_time': None,
+            'connect_time': None,
+            'bytes_per_second': None,
+            'final_url': None,
+            'redirect_hops': 0,
+            'unreachable': False
+        }
+        
+        if not url or not url.strip():
+            result['message'] = "Пустой URL"
+            return result
+        
+        parsed = urlparse(url)
+        if not parsed.scheme or not parsed.hostname:
+            result['message'] = "Некорректный URL"
+            return result
+        
+        if len(url) > 2000:
+            result['message'] = "URL слишком длинный"
+            return result
+        
+        if parsed.scheme not in ['http', 'https']:
+            result['message'] = f"Неподдерживаемый протокол: {parsed.scheme}"
+            return result
+        
+        cached = redirect_cache.get(url) if redirect_cache else None
+        if cached:
+            # Сразу к конечному адресу; если он устарел (например, истёк токен) - проходим цепочку заново
+            final_url, hops = cached
+            result = URLUtils._measure_http(final_url, timeout, verify_ssl, sample_bytes,
+                                            sample_seconds, read_timeout, cancel_token, headers)
+            if result['success']:
+                result['redirect_hops'] += hops
+                return result
+            
+            redirect_cache.invalidate(url)
+            if cancel_token is not None and cancel_token.is_cancelled():
+                return result
+        
+        result = URLUtils._measure_http(url, timeout, verify_ssl, sample_bytes,
+                                        sample_seconds, read_timeout, cancel_token, headers)
+        if redirect_cache and result['success'] and result['redirect_hops']:
+            redirect_cache.put(url, result['final_url'], result['redirect_hops'])
+        return result
+    
+    @staticmethod
+    def _measure_http(url: str, timeout: float, verify_ssl: bool, sample_bytes: int,
+                      sample_seconds: float, read_timeout: Optional[float],
+                      cancel_token: Optional[CancellationToken],
+                      headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        result = {
+            'success': False,
+            'message': '',
+            'response_time': None,
+            'connect_time': None,
+            'bytes_per_second': None,
+            'final_url': None,
+            'redirect_hops': 0,
+            'unreachable': False
+        }
+        headers = URLUtils.request_headers(headers)
+        # Своя сессия с замером соединения, если вызывающий не дал токен отмены
+        own_token = cancel_token is None
+        if own_token:
+            cancel_token = CancellationToken()
+        
+        try:
+            start_time = time.time()
+            response = URLUtils._open_stream(url, (timeout, read_timeout or timeout), verify_ssl,
+                                             headers, cancel_token)
+            result['response_time'] = time.time() - start_time
+            result['connect_time'] = CancellationToken.response_connect_time(response)
+            result['final_url'] = response.url
+            result['redirect_hops'] = len(response.history)
+            
+            try:
+                if not 200 <= response.status_code < 400:
+                    result['message'] = f"HTTP {response.status_code}"
+                    return result
+                
+                # Без замера скорости достаточно убедиться, что поток отдаёт данные
+                limit = sample_bytes or URLUtils.PROBE_BYTES
+                received = 0
+                throttled = 0.0
+                sample_start = time.time()
+                for chunk in response.iter_content(chunk_size=min(16384, limit)):
+                    received += len(chunk)
+                    throttled += ExecutionService.account_bytes(len(chunk))
+                    if received >= limit or time.time() - sample_start - throttled >= sample_seconds:
+                        break
+            finally:
+                URLUtils._release(response, cancel_token)
+            
+            # Паузы ограничителя трафика не должны занижать измеренную скорость
+            sample_time = time.time() - sample_start - throttled
+            if received and sample_bytes:
+                result['bytes_per_second'] = received / max(sample_time, 0.001)
+            
+            result['success'] = True
+            result['message'] = f"HTTP {response.status_code}"
+            return result
+            
+        except (socket.timeout, requests.exceptions.Timeout):
+            result['message'] = "Таймаут"
+            result['unreachable'] = True
+            if result['response_time'] is None:
+                result['response_time'] = timeout
+            return result
+        except (OSError, requests.exceptions.ConnectionError):
+            result['message'] = "Ошибка соединения"
+            result['unreachable'] = True
+            return result
+        except Exception as e:
+            result['message'] = f"Ошибка: {str(e)[:50]}"
+            return result
+        finally:
+            if own_token:
+                cancel_token.close()
+    
+    @staticmethod
+    def probe_stream_protocol(url: str, timeout: float = 5,
+                              cancel_token: Optional[CancellationToken] = None,
+                              headers: Optional[Dict[str, str]] = None) -> Tuple[bool, Optional[float], str]:
+        try:
+            parsed = urlparse(url)
+            scheme = parsed.scheme.lower()
+            
+            if scheme in ('udp', 'rtp'):
+                return URLUtils.probe_udp(parsed.hostname or "", parsed.port, timeout, cancel_token)
+            
+            if not parsed.hostname:
+                return False, None, "Некорректный URL"
+            
+            if scheme == 'rtmp':
+                return URLUtils.probe_rtmp(parsed.hostname, parsed.port or 1935, timeout, cancel_token)
+            elif scheme == 'rtsp':
+                return URLUtils.probe_rtsp(url, parsed.hostname, parsed.port or 554, timeout, cancel_token,
+                                           headers)
+            elif scheme == 'tcp':
+                if not parsed.port:
+                    return False, None, "Не указан порт"
+                return URLUtils.probe_tcp(parsed.hostname, parsed.port, timeout, cancel_token)
+            
+            return False, None, f"Неподдерживаемый протокол: {scheme}"
+            
+        except ValueError:
+            return False, None, "Некорректный порт"
+    
+    @staticmethod
+    def probe_tcp(host: str, port: int, timeout: float = 5,
+                  cancel_token: Optional[CancellationToken] = None) -> Tuple[bool, Optional[float], str]:
+        start_time = time.time()
+        try:
+            sock = URLUtils.open_connection(host, port, timeout, cancel_token)
+            URLUtils._release(sock, cancel_token)
+            return True, time.time() - start_time, "TCP соединение установлено"
+        except socket.timeout:
+            return False, timeout, "Таймаут"
+        except OSError:
+            return False, None, "Ошибка соединения"
+    
+    @staticmethod
+    def probe_rtmp(host: str, port: int = 1935, timeout: float = 5,
+                   cancel_token: Optional[CancellationToken] = None) -> Tuple[bool, Optional[float], str]:
+        start_time = time.time()
+        sock = None
+        try:
+            sock = URLUtils.open_connection(host, port, timeout, cancel_token)
+            sock.settimeout(timeout)
+            # C0 (версия 3) + C1: время, четыре нуля и 1528 случайных байт
+            timestamp = (int(time.time()) & 0xFFFFFFFF).to_bytes(4, 'big')
+            sock.sendall(b'\x03' + timestamp + b'\x00' * 4 + os.urandom(1528))
+            
+            s0 = sock.recv(1)
+            response_time = time.time() - start_time
+            
+            if not s0:
+                return False, response_time, "RTMP: соединение закрыто"
+            if s0[0] != 3:
+                return False, response_time, f"RTMP: неверная версия {s0[0]}"
+            return True, response_time, "RTMP рукопожатие"
+        except socket.timeout:
+            return False, timeout, "Таймаут"
+        except OSError:
+            return False, None, "Ошибка соединения"
+        finally:
+            if sock is not None:
+                URLUtils._release(sock, cancel_token)
+    
+    @staticmethod
+    def probe_rtsp(url: str, host: str, port: int = 554, timeout: float = 5,
+                   cancel_token: Optional[CancellationToken] = None,
+                   headers: Optional[Dict[str, str]] = None) -> Tuple[bool, Optional[float], str]:
+        start_time = time.time()
+        sock = None
+        try:
+            sock = URLUtils.open_connection(host, port, timeout, cancel_token)
+            sock.settimeout(timeout)
+            request_headers = {'CSeq': '1', 'User-Agent': 'M3UEditor'}
+            for key, value in (headers or {}).items():
+                if key.lower() == 'user-agent':
+                    request_headers['User-Agent'] = value
+                elif key.lower() != 'cseq':
+                    request_headers[key] = value
+            request = f"OPTIONS {url} RTSP/1.0\r\n" + "".join(
+                f"{key}: {value}\r\n" for key, value in request_headers.items()
+            ) + "\r\n"
+            sock.sendall(request.encode('utf-8'))
+            
+            data = b''
+            while b'\r\n' not in data and len(data) < 4096:
+                chunk = sock.recv(1024)
+                if not chunk:
+                    break
+                data += chunk
+            
+            response_time = time.time() - start_time
+            status_line = data.split(b'\r\n', 1)[0].decode('latin-1', errors='ignore')
+            match = re.match(r'RTSP/\d\.\d\s+(\d{3})', status_line)
+            
+            if not match:
+                return False, response_time, "RTSP: некорректный ответ"
+            
+            status = int(match.group(1))
+            if status < 400:
+                return True, response_time, f"RTSP {status}"
+            if status == 401:
+                return True, response_time, "RTSP 401 (требуется авторизация)"
+            return False, response_time, f"RTSP {status}"
+        except socket.timeout:
+            return False, timeout, "Таймаут"
+        except OSError:
+            return False, None, "Ошибка соединения"
+        finally:
+            if sock is not None:
+                URLUtils._release(sock, cancel_token)
+    
+    @staticmethod
+    def _is_local_address(host: str) -> bool:
+        if not host:
+            return True
+        try:
+            address = ipaddress.ip_address(socket.gethostbyname(host))
+        except (OSError, ValueError):
+            return False
+        if address.is_loopback or address.is_unspecified:
+            return True
+        try:
+            return str(address) in socket.gethostbyname_ex(socket.gethostname())[2]
+        except OSError:
+            return False
+    
+    @staticmethod
+    def probe_udp(host: str, port: Optional[int], timeout: float = 3,
+                  cancel_token: Optional[CancellationToken] = None) -> Tuple[bool, Optional[float], str]:
+        if not port:
+            return False, None, "Не указан порт"
+        
+        start_time = time.time()
+        sock = None
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            if cancel_token is not None:
+                cancel_token.register(sock)
+            sock.settimeout(timeout)
+            
+            is_multicast = False
+            if host:
+                try:
+                    is_multicast = 224 <= int(host.split('.')[0]) <= 239
+                except ValueError:
+                    is_multicast = False
+            
+            if is_multicast:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind(('', port))
+                membership = socket.inet_aton(host) + socket.inet_aton('0.0.0.0')
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+            elif URLUtils._is_local_address(host):
+                # Поток направлен на эту машину (udp://@:порт) и приходит на локальный порт
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind((host, port))
+            else:
+                # Порт удалённого источника локально не слушается: запрашиваем его напрямую,
+                # закрытый порт вернёт отказ ICMP
+                sock.connect((host, port))
+                sock.send(b'')
+            
+            if cancel_token is None:
+                sock.recvfrom(65536)
+            else:
+                # Короткие интервалы ожидания, чтобы отмена не ждала всего таймаута
+                deadline = start_time + timeout
+                while True:
+                    if cancel_token.is_cancelled():
+                        return False, None, "Проверка отменена"
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise socket.timeout("Таймаут")
+                    sock.settimeout(min(remaining, 0.1))
+                    try:
+                        sock.recvfrom(65536)
+                        break
+                    except socket.timeout:
+                        continue
+            return True, time.time() - start_time, "UDP пакеты получены"
+        except socket.timeout:
+            return False, timeout, "Нет UDP пакетов"
+        except ConnectionRefusedError:
+            return False, time.time() - start_time, "UDP порт закрыт"
+        except OSError as e:
+            if cancel_token is not None and cancel_token.is_cancelled():
+                return False, None, "Проверка отменена"
+            return False, None, f"Ошибка UDP: {str(e)[:50]}"
+        finally:
+            if sock is not None:
+                URLUtils._release(sock, cancel_token)
+    
+    @staticmethod
+    def compute_link_score(result: Dict[str, Any], success_rate: Optional[float] = None) -> float:
+        """Оценка ссылки 0-100: задержка ответа, время соединения, скорость и история"""
+        if not result.get('success'):
+            return 0.0
+        
+        def inverse(value: Optional[float], half_value: float) -> float:
+            if value is None:
+                return 0.5
+            return 1.0 / (1.0 + max(value, 0.0) / half_value)
+        
+        bytes_per_second = result.get('bytes_per_second')
+        hls = result.get('hls') or {}
+        if hls.get('segment_bitrate'):
+            bytes_per_second = hls['segment_bitrate'] / 8
+        
+        # Для HLS важнее запас скорости над заявленным битрейтом: ниже единицы поток будет буферизоваться
+        ratio = URLUtils.hls_bandwidth_ratio(hls)
+        if ratio is not None:
+            throughput = min(1.0, ratio / 1.5)
+        elif bytes_per_second is None:
+            throughput = 0.5
+        else:
+            throughput = min(1.0, bytes_per_second / 625000)
+        
+        score = (0.4 * inverse(result.get('response_time'), 1.0) +
+                 0.2 * inverse(result.get('connect_time'), 0.3) +
+                 0.4 * throughput)
+        
+        if success_rate is not None:
+            score *= success_rate
+        
+        return round(score * 100, 1)
+    
+    @staticmethod
+    def hls_bandwidth_ratio(probe: Optional[Dict[str, Any]]) -> Optional[float]:
+        """Во сколько раз скорость загрузки сегмента превышает заявленный битрейт варианта"""
+        probe = probe or {}
+        if not probe.get('segment_bitrate') or not probe.get('declared_bandwidth'):
+            return None
+        return probe['segment_bitrate'] / probe['declared_bandwidth']
+    
+    @staticmethod
+    def _parse_byte_range(value: str, next_offset: int) -> Optional[Tuple[int, int]]:
+        match = re.match(r'(\d+)(?:@(\d+))?$', value.strip())
+        if not match:
+            return None
+        length = int(match.group(1))
+        offset = int(match.group(2)) if match.group(2) is not None else next_offset
+        return offset, offset + length - 1
+    
+    @staticmethod
+    def parse_hls_playlist(text: str, base_url: str) -> Tuple[List[Tuple[Optional[int], str]], List[HLSSegment], bool]:
+        variants = []
+        segments = []
+        bandwidth = None
+        expect_variant = False
+        init_section = None
+        byte_range = None
+        # Диапазон без смещения продолжает предыдущий диапазон того же ресурса
+        next_offsets: Dict[str, int] = {}
+        
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            
+            if line.startswith('#EXT-X-STREAM-INF'):
+                match = re.search(r'[:,]BANDWIDTH=(\d+)', line)
+                bandwidth = int(match.group(1)) if match else None
+                expect_variant = True
+            elif line.startswith('#EXT-X-MAP:'):
+                uri = re.search(r'URI="([^"]*)"', line)
+                map_range = re.search(r'BYTERANGE="([^"]*)"', line)
+                init_section = None
+                if uri:
+                    init_section = HLSSegment(
+                        urljoin(base_url, uri.group(1)),
+                        URLUtils._parse_byte_range(map_range.group(1), 0) if map_range else None
+                    )
+            elif line.startswith('#EXT-X-BYTERANGE:'):
+                byte_range = line.split(':', 1)[1]
+            elif line.startswith('#'):
+                continue
+            elif expect_variant:
+                variants.append((bandwidth, urljoin(base_url, line)))
+                expect_variant = False
+            else:
+                segment_url = urljoin(base_url, line)
+                segment_range = None
+                if byte_range is not None:
+                    segment_range = URLUtils._parse_byte_range(byte_range, next_offsets.get(segment_url, 0))
+                    if segment_range:
+                        next_offsets[segment_url] = segment_range[1] + 1
+                    byte_range = None
+                segments.append(HLSSegment(segment_url, segment_range, init_section))
+        
+        return variants, segments, '#EXT-X-ENDLIST' in text
+    
+    @staticmethod
+    def probe_hls_stream(url: str, timeout: int = 5, verify_ssl: bool = False,
+                         max_segment_bytes: int = 2 * 1024 * 1024,
+                         cancel_token: Optional[CancellationToken] = None,
+                         redirect_cache: Optional['RedirectCache'] = None,
+                         headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        result = {
+            'success': False,
+            'message': '',
+            'response_time': None,
+            'variant_count': 0,
+            'declared_bandwidth': None,
+            'time_to_first_segment': None,
+            'segment_bitrate': None,
+            'final_url': None,
+            'redirect_hops': 0
+        }
+        headers = URLUtils.request_headers(headers)
+        
+        def fetch_playlist(playlist_url: str) -> Tuple[Optional[str], str]:
+            response = URLUtils._open_stream(playlist_url, (timeout, timeout), verify_ssl,
+                                             headers, cancel_token)
+            if result['response_time'] is None:
+                result['response_time'] = time.time() - start_time
+                result['final_url'] = response.url
+                result['redirect_hops'] += len(response.history)
+            
+            try:
+                if not 200 <= response.status_code < 400:
+                    return None, f"HTTP {response.status_code}"
+                
+                content = b''
+                for chunk in response.iter_content(chunk_size=65536):
+                    content += chunk
+                    ExecutionService.account_bytes(len(chunk))
+                    if len(content) >= 1024 * 1024:
+                        break
+            finally:
+                URLUtils._release(response, cancel_token)
+            
+            text = content.decode('utf-8', errors='ignore')
+            if '#EXT' not in text:
+                return None, "Ответ не является HLS плейлистом"
+            return text, response.url
+        
+        start_time = time.time()
+        
+        try:
+            cached = redirect_cache.get(url) if redirect_cache else None
+            text = None
+            if cached:
+                result['redirect_hops'] = cached[1]
+                try:
+                    text, info = fetch_playlist(cached[0])
+                except (OSError, requests.exceptions.RequestException):
+                    text = None
+                
+                if text is None:
+                    redirect_cache.invalidate(url)
+                    if cancel_token is not None and cancel_token.is_cancelled():
+                        result['message'] = "Проверка отменена"
+                        return result
+                    result['response_time'] = None
+                    result['redirect_hops'] = 0
+                    start_time = time.time()
+            
+            if text is None:
+                text, info = fetch_playlist(url)
+                if text is None:
+                    result['message'] = info
+                    return result
+                if redirect_cache and result['redirect_hops']:
+                    redirect_cache.put(url, result['final_url'], result['redirect_hops'])
+            
+            variants, segments, ended = URLUtils.parse_hls_playlist(text, info)
+            
+            if variants:
+                result['variant_count'] = len(variants)
+                bandwidth, variant_url = min(
+                    variants, key=lambda v: v[0] if v[0] is not None else float('inf')
+                )
+                result['declared_bandwidth'] = bandwidth
+                
+                text, info = fetch_playlist(variant_url)
+                if text is None:
+                    result['message'] = f"Вариант потока: {info}"
+                    return result
+                
+                _, segments, ended = URLUtils.parse_hls_playlist(text, info)
+            
+            if not segments:
+                result['message'] = "В плейлисте нет сегментов"
+                return result
+            
+            # Живой поток проигрыватели начинают за три сегмента до конца
+            if ended or len(segments) < 3:
+                segment = segments[0]
+            else:
+                segment = segments[-3]
+            
+            def open_segment(part: HLSSegment) -> requests.Response:
+                part_headers = headers
+                if part.byte_range:
+                    part_headers = dict(headers, Range="bytes=%d-%d" % part.byte_range)
+                return URLUtils._open_stream(part.url, (timeout, timeout), verify_ssl,
+                                             part_headers, cancel_token)
+            
+            # Без секции инициализации (EXT-X-MAP) сегмент fMP4 не воспроизвести: она входит во время старта
+            if segment.init is not None:
+                response = open_segment(segment.init)
+                try:
+                    if not 200 <= response.status_code < 400:
+                        result['message'] = f"Секция инициализации: HTTP {response.status_code}"
+                        return result
+                    init_received = 0
+                    for chunk in response.iter_content(chunk_size=65536):
+                        init_received += len(chunk)
+                        ExecutionService.account_bytes(len(chunk))
+                        if init_received >= max_segment_bytes:
+                            break
+                finally:
+                    URLUtils._release(response, cancel_token)
+            
+            response = open_segment(segment)
+            # Битрейт считается только по передаче тела: соединение и ожидание заголовков в него не входят
+            body_start = time.time()
+            
+            received = 0
+            throttled = 0.0
+            try:
+                if not 200 <= response.status_code < 400:
+                    result['message'] = f"Сегмент: HTTP {response.status_code}"
+                    return result
+                
+                for chunk in response.iter_content(chunk_size=65536):
+                    if not chunk:
+                        continue
+                    if result['time_to_first_segment'] is None:
+                        result['time_to_first_segment'] = time.time() - start_time
+                    received += len(chunk)
+                    throttled += ExecutionService.account_bytes(len(chunk))
+                    if received >= max_segment_bytes:
+                        break
+            finally:
+                URLUtils._release(response, cancel_token)
+            
+            download_time = time.time() - body_start - throttled
+            
+            if received == 0:
+                result['message'] = "Пустой сегмент"
+                return result
+            
+            result['segment_bitrate'] = received * 8 / max(download_time, 0.001)
+            result['success'] = True
+            result['message'] = (f"HLS: сегмент за {result['time_to_first_segment']:.2f} сек, "
+                                 f"{result['segment_bitrate'] / 1000000:.1f} Мбит/с")
+            if result['declared_bandwidth']:
+                result['message'] += f" (заявлено {result['declared_bandwidth'] / 1000000:.1f})"
+            
+            return result
+            
+        except requests.exceptions.Timeout:
+            result['message'] = "Таймаут"
+            return result
+        except requests.exceptions.ConnectionError:
+            result['message'] = "Ошибка соединения"
+            return result
+        except Exception as e:
+            result['message'] = f"Ошибка: {str(e)[:50]}"
+            return result
+    
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        url = (url or "").strip()
+        if not url:
+            return ""
+        
+        try:
+            parsed = urlparse(url)
+            port = parsed.port
+        except ValueError:
+            return url
+        
+        if not parsed.scheme or not parsed.netloc:
+            return url
+        
+        scheme = parsed.scheme.lower()
+        host = (parsed.hostname or "").lower()
+        if ':' in host:
+            host = f"[{host}]"
+        
+        netloc = host
+        if parsed.username:
+            userinfo = parsed.username
+            if parsed.password:
+                userinfo += f":{parsed.password}"
+            netloc = f"{userinfo}@{netloc}"
+        
+        default_ports = {'http': 80, 'https': 443, 'rtsp': 554, 'rtmp': 1935}
+        if port is not None and default_ports.get(scheme) != port:
+            netloc += f":{port}"
+        
+        path = parsed.path
+        if not path and scheme in ('http', 'https'):
+            path = '/'
+        
+        return urlunparse((scheme, netloc, path, parsed.params, parsed.query, ''))
+    
+    @staticmethod
+    def estimate_quality(response_time: float, status_code: int) -> LinkQuality:
+        if status_code >= 400:
+            return LinkQuality.NOT_WORKING
+        return LinkQuality.WORKING
+    
+    @staticmethod
+    def should_filter_url(url: str, temporary_domains: List[str], unsafe_domains: List[str]) -> bool:
+        url_lower = url.lower()
+        
+        for domain in temporary_domains:
+            if domain.lower() in url_lower:
+                return True
+        
+        for domain in unsafe_domains:
+            if domain.lower() in url_lower:
+                return True
+        
+        return False
+
+
+class ExecutionJob:
+    
+    def __init__(self, job_id: int, name: str, max_workers: int):
+        self.job_id = job_id
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.queue: deque = deque()
+        self.running = 0
+        self.completed = 0
+        self.bytes_received = 0
+        self.started_at = time.monotonic()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started_at, 0.001)
+        return {
+            'id': self.job_id,
+            'name': self.name,
+            'max_workers': self.max_workers,
+            'running': self.running,
+            'queued': len(self.queue),
+            'completed': self.completed,
+            'tasks_per_second': self.completed / elapsed,
+            'bytes_per_second': self.bytes_received / elapsed
+        }
+
+
+class ExecutionService:
+    """Общий для приложения пул потоков: ограничивает число одновременных проверок
+    (а значит и открытых соединений) и трафик, задачи разных заданий чередуются"""
+    
+    _shared: Optional['ExecutionService'] = None
+    _shared_lock = threading.Lock()
+    _local = threading.local()
+    
+    def __init__(self, max_threads: int = 20, max_bytes_per_second: int = 0):
+        self.max_threads = max(1, max_threads)
+        self.max_bytes_per_second = max(0, max_bytes_per_second)
+        self._condition = threading.Condition()
+        self._jobs: List[ExecutionJob] = []
+        self._next_job = 0
+        self._job_ids = itertools.count(1)
+        self._threads = 0
+        self._idle_threads = 0
+        self._bandwidth_lock = threading.Lock()
+        self._bandwidth_tokens = 0.0
+        self._bandwidth_updated = time.monotonic()
+    
+    @classmethod
+    def shared(cls) -> 'ExecutionService':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+    
+    def configure(self, max_threads: int, max_bytes_per_second: int = 0):
+        with self._condition:
+            self.max_threads = max(1, max_threads)
+            self.max_bytes_per_second = max(0, max_bytes_per_second)
+            self._condition.notify_all()
+    
+    def create_job(self, name: str, max_workers: int) -> ExecutionJob:
+        with self._condition:
+            job = ExecutionJob(next(self._job_ids), name, max_workers)
+            self._jobs.append(job)
+            return job
+    
+    def submit(self, job: ExecutionJob, fn: Callable, *args) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        with self._condition:
+            job.queue.append((future, fn, args))
+            if self._idle_threads == 0 and self._threads < self.max_threads:
+                self._threads += 1
+                threading.Thread(target=self._worker_loop, name="ExecutionService",
+                                 daemon=True).start()
+            self._condition.notify()
+        return future
+    
+    def cancel_job(self, job: ExecutionJob):
+        """Отменяет ещё не начатые задачи задания"""
+        with self._condition:
+            queued = list(job.queue)
+            job.queue.clear()
+        
+        for future, _, _ in queued:
+            future.cancel()
+    
+    def finish_job(self, job: ExecutionJob):
+        self.cancel_job(job)
+        with self._condition:
+            if job in self._jobs:
+                self._jobs.remove(job)
+    
+    def get_jobs_stats(self) -> List[Dict[str, Any]]:
+        with self._condition:
+            return [job.get_stats() for job in self._jobs]
+    
+    def _take_task(self) -> Optional[Tuple[ExecutionJob, concurrent.futures.Future, Callable, tuple]]:
+        # Обход заданий по кругу, чтобы большое задание не вытесняло остальные
+        count = len(self._jobs)
+        for offset in range(count):
+            position = (self._next_job + offset) % count
+            job = self._jobs[position]
+            if job.queue and job.running < job.max_workers:
+                self._next_job = position + 1
+                future, fn, args = job.queue.popleft()
+                job.running += 1
+                return job, future, fn, args
+        return None
+    
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._threads > self.max_threads:
+                        self._threads -= 1
+                        return
+                    task = self._take_task()
+                    if task is not None:
+                        break
+                    self._idle_threads += 1
+                    signalled = self._condition.wait(timeout=30)
+                    self._idle_threads -= 1
+                    # Простаивающие потоки завершаются, пул создаст их заново по мере нужды
+                    if not signalled and not self._take_task_ready():
+                        self._threads -= 1
+                        return
+            
+            job, future, fn, args = task
+            if future.set_running_or_notify_cancel():
+                self._local.job = job
+                self._local.service = self
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+                finally:
+                    self._local.job = None
+                    self._local.service = None
+            
+            with self._condition:
+                job.running -= 1
+                job.completed += 1
+                self._condition.notify_all()
+    
+    def _take_task_ready(self) -> bool:
+        return any(job.queue and job.running < job.max_workers for job in self._jobs)
+    
+    @classmethod
+    def account_bytes(cls, size: int) -> float:
+        """Учитывает полученные байты задания текущего потока и притормаживает
+        его, если превышен общий лимит трафика. Возвращает длительность паузы"""
+        job = getattr(cls._local, 'job', None)
+        if job is None:
+            return 0.0
+        
+        job.bytes_received += size
+        service = cls._local.service
+        rate = service.max_bytes_per_second
+        if not rate:
+            return 0.0
+        
+        with service._bandwidth_lock:
+            now = time.monotonic()
+            service._bandwidth_tokens = min(
+                float(rate), service._bandwidth_tokens + (now - service._bandwidth_updated) * rate
+            )
+            service._bandwidth_updated = now
+            service._bandwidth_tokens -= size
+            delay = -service._bandwidth_tokens / rate if service._bandwidth_tokens < 0 else 0.0
+        
+        delay = min(delay, 1.0)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class SafeWorker(QRunnable):
+    
+    class WorkerSignals(QObject):
+        progress = pyqtSignal(int, int, str)
+        error = pyqtSignal(str)
+        finished = pyqtSignal()
+        result = pyqtSignal(object)
     
     def __init__(self, fn, *args, **kwargs):
         super().__init__()
@@ -1031,18 +2996,174 @@ class BaseWorker(QThread):
         super().__init__()
         self._stop_requested = False
         self._lock = threading.RLock()
+        self.cancel_token = CancellationToken()
+        self.job_name = "Задание"
+        self.execution_service: Optional[ExecutionService] = None
     
     def stop(self):
         self._stop_requested = True
+        self.cancel_token.cancel()
     
     def is_stopped(self) -> bool:
         return self._stop_requested
+    
+    def _run_cancellable(self, func: Callable, items: List[Any], max_workers: int):
+        """Выполняет func для каждого элемента в общем пуле и отдаёт (элемент, результат, ошибка)
+        по мере готовности. После stop() не ждёт выполняющиеся задачи"""
+        service = self.execution_service or ExecutionService.shared()
+        job = service.create_job(self.job_name, max_workers)
+        try:
+            futures = {service.submit(job, func, item): item for item in items}
+            pending = set(futures)
+            
+            while pending and not self.is_stopped():
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=0.1, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    try:
+                        yield futures[future], future.result(), None
+                    except Exception as e:
+                        yield futures[future], None, e
+        finally:
+            service.finish_job(job)
+            self.cancel_token.close()
+
+
+class LinkSourceUpdateScheduler:
+    """Когда обновлять источники с автообновлением: раз в интервал источника со случайным
+    сдвигом, после неудачи — повтор с удваивающейся паузой, но не реже интервала"""
+    
+    JITTER_FRACTION = 0.1
+    MAX_JITTER_SECONDS = 600
+    RETRY_BASE_SECONDS = 300
+    
+    def __init__(self, source_manager: LinkSourceManager):
+        self.source_manager = source_manager
+        self._lock = threading.Lock()
+        self._next_attempt: Dict[str, float] = {}
+        self._failures: Dict[str, int] = {}
+        self._running: Set[str] = set()
+    
+    def _jitter(self, delay: float) -> float:
+        # Сдвиг разносит обновления источников с одинаковым интервалом по времени
+        return random.uniform(0, min(delay * self.JITTER_FRACTION, self.MAX_JITTER_SECONDS))
+    
+    @staticmethod
+    def _interval(source: LinkSource) -> float:
+        return max(source.update_interval_hours, 1) * 3600
+    
+    def due_sources(self, now: Optional[float] = None) -> List[LinkSource]:
+        """Источники, которые пора обновить; до record_result/release они не выдаются повторно"""
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            for source in self.source_manager.get_enabled_sources():
+                if not source.auto_update or source.name in self._running:
+                    continue
+                
+                next_attempt = self._next_attempt.get(source.name)
+                if next_attempt is None:
+                    interval = self._interval(source)
+                    last_updated = source.last_updated.timestamp() if source.last_updated else 0
+                    next_attempt = last_updated + interval + self._jitter(interval)
+                    self._next_attempt[source.name] = next_attempt
+                
+                if now >= next_attempt:
+                    self._running.add(source.name)
+                    due.append(source)
+        return due
+    
+    def record_result(self, source_name: str, ok: bool, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        source = self.source_manager.get_source_by_name(source_name)
+        with self._lock:
+            self._running.discard(source_name)
+            if source is None:
+                self._next_attempt.pop(source_name, None)
+                self._failures.pop(source_name, None)
+                return
+            
+            interval = self._interval(source)
+            if ok:
+                self._failures.pop(source_name, None)
+                delay = interval
+            else:
+                failures = self._failures.get(source_name, 0) + 1
+                self._failures[source_name] = failures
+                delay = min(self.RETRY_BASE_SECONDS * 2 ** min(failures - 1, 16), interval)
+                logger.warning(f"Автообновление источника {source_name} не удалось "
+                               f"(попытка {failures}), повтор через {int(delay // 60)} мин")
+            self._next_attempt[source_name] = now + delay + self._jitter(delay)
+    
+    def release(self, sources: List[LinkSource]):
+        """Снимает отметку выполнения с источников, обновление которых прервано"""
+        with self._lock:
+            for source in sources:
+                self._running.discard(source.name)
+    
+    def reset(self):
+        """Пересчитывает расписание после изменения списка или настроек источников"""
+        with self._lock:
+            self._next_attempt.clear()
+            self._failures.clear()
+
+
+class SourceRefreshWorker(BaseWorker):
+    
+    source_refreshed = pyqtSignal(str, str, bool)
+    
+    def __init__(self, source_manager: LinkSourceManager, sources: List[LinkSource], max_workers: int = 4,
+                 job_name: str = "Обновление источников"):
+        super().__init__()
+        self.source_manager = source_manager
+        self.sources = sources
+        self.max_workers = max_workers
+        self.job_name = job_name
+    
+    def run(self):
+        try:
+            total = len(self.sources)
+            processed = 0
+            self.progress.emit(0, total, "Обновление источников...")
+            
+            for source, channels, error in self._run_cancellable(
+                lambda source: self.source_manager.refresh_source(source, self.cancel_token),
+                self.sources,
+                self.max_workers
+            ):
+                if error is not None:
+                    logger.error(f"Ошибка обновления источника {source.name}: {error}")
+                    status = "Ошибка"
+                elif channels is None:
+                    status = "Не изменился"
+                elif not channels:
+                    status = "Не удалось загрузить"
+                else:
+                    stats = source.last_refresh_stats
+                    status = (f"Загружено каналов: {len(channels)} (добавлено {stats.get('added', 0)}, "
+                              f"удалено {stats.get('removed', 0)}, изменено {stats.get('changed', 0)})")
+                
+                processed += 1
+                self.source_refreshed.emit(source.name, status, error is None and channels != [])
+                self.progress.emit(processed, total, f"{source.name}: {status}")
+            
+            self.finished.emit()
+            
+        except Exception as e:
+            self.error.emit(f"Ошибка обновления источников: {str(e)}")
+            logger.error(f"SourceRefreshWorker ошибка: {e}")
 
 
 class LinkReplacementWorker(BaseWorker):
     
     channel_updated = pyqtSignal(ChannelData, str, str)
     
+    CANDIDATE_RACE_WIDTH = 4
+    # С этого числа каналов точный поиск идёт по общему индексу в памяти: запрос к кэшу занимает
+    # около миллисекунды, а полная загрузка источника на 200 тысяч каналов — около двух секунд
+    EXACT_PRELOAD_CHANNELS = 2000
+    
     def __init__(self, 
                  channels: List[ChannelData],
                  source_manager: LinkSourceManager,
@@ -1051,47 +3172,68 @@ class LinkReplacementWorker(BaseWorker):
         self.channels = channels.copy()
         self.source_manager = source_manager
         self.settings = settings
+        self.job_name = "Замена ссылок"
+        self._candidate_tokens: Set[CancellationToken] = set()
+        self._candidate_job: Optional[ExecutionJob] = None
+        self._candidate_results: Dict[str, concurrent.futures.Future] = {}
+        self._candidate_reused = 0
+    
+    def stop(self):
+        super().stop()
+        with self._lock:
+            tokens = list(self._candidate_tokens)
+        for token in tokens:
+            token.cancel()
     
     def run(self):
+        service = self.execution_service or ExecutionService.shared()
+        channel_workers = min(self.settings.max_workers, 5)
+        self._candidate_job = service.create_job("Замена ссылок: проверка кандидатов",
+                                                 channel_workers * self.CANDIDATE_RACE_WIDTH)
+        with self._lock:
+            self._candidate_results = {}
+            self._candidate_reused = 0
         try:
             total = len(self.channels)
             processed = 0
             
-            with concurrent.futures.ThreadPoolExecutor(
-                max_workers=min(self.settings.max_workers, 5)
-            ) as executor:
-                futures = []
-                for i, channel in enumerate(self.channels):
-                    if self.is_stopped():
-                        break
-                    
-                    future = executor.submit(self._process_channel, channel, i)
-                    futures.append(future)
+            # Источники читаются один раз до запуска потоков, дальше поиск идёт по памяти
+            self.progress.emit(0, total, "Загрузка источников...")
+            sources = self.source_manager.get_enabled_sources()
+            if self.settings.search_type == "exact" and len(self.channels) < self.EXACT_PRELOAD_CHANNELS:
+                # Немногие каналы дешевле найти запросами к кэшу, в память читаются только источники без кэша
+                sources = [source for source in sources
+                           if not self.source_manager.link_store.has_source(source.name)]
+            self.source_manager.catalog.preload(sources)
+            if self.is_stopped():
+                self.finished.emit()
+                return
+            
+            for _, result, error in self._run_cancellable(
+                lambda item: self._process_channel(item[1], item[0]),
+                list(enumerate(self.channels)),
+                channel_workers
+            ):
+                if error is not None:
+                    logger.error(f"Ошибка обработки канала: {error}")
+                elif result and not self.is_stopped():
+                    channel, old_url, new_url = result
+                    if new_url:
+                        self.channel_updated.emit(channel, old_url, new_url)
                 
-                for future in concurrent.futures.as_completed(futures):
-                    if self.is_stopped():
-                        break
-                    
-                    try:
-                        result = future.result(timeout=30)
-                        if result:
-                            channel, old_url, new_url = result
-                            if new_url:
-                                self.channel_updated.emit(channel, old_url, new_url)
-                    except concurrent.futures.TimeoutError:
-                        logger.warning("Таймаут обработки канала")
-                    except Exception as e:
-                        logger.error(f"Ошибка обработки канала: {e}")
-                    
-                    processed += 1
-                    progress = int((processed / total) * 100) if total > 0 else 0
-                    self.progress.emit(processed, total, f"Обработано: {processed}/{total}")
+                processed += 1
+                self.progress.emit(processed, total, f"Обработано: {processed}/{total}")
             
             self.finished.emit()
             
         except Exception as e:
             self.error.emit(f"Ошибка при замене ссылок: {str(e)}")
             logger.error(f"LinkReplacementWorker ошибка: {e}")
+        finally:
+            service.finish_job(self._candidate_job)
+            if self._candidate_reused:
+                logger.info(f"Замена ссылок: проверено кандидатов {len(self._candidate_results)}, "
+                            f"повторных проверок не понадобилось {self._candidate_reused}")
     
     def _process_channel(self, channel: ChannelData, index: int) -> Optional[Tuple[ChannelData, str, str]]:
         if self.is_stopped():
@@ -1109,7 +3251,7 @@ class LinkReplacementWorker(BaseWorker):
         
         if should_replace:
             new_url = self._find_replacement(channel, reason)
-            if new_url:
+            if new_url and not self.is_stopped():
                 old_url = channel.url
                 channel.url = new_url
                 channel.add_url_to_history(old_url, new_url, reason, "auto_replacement")
@@ -1120,55 +3262,198 @@ class LinkReplacementWorker(BaseWorker):
     
     def _find_replacement(self, channel: ChannelData, reason: str) -> Optional[str]:
         try:
-            alternative_channels = self.source_manager.search_channel(channel.name, self.settings)
+            # Новая ссылка будет воспроизводиться с заголовками канала, с ними и проверяем
+            headers = channel.get_request_headers()
+            alternative_channels = self.source_manager.search_channel(channel.name, self.settings, headers)
             
             if not alternative_channels:
                 return None
             
-            if self.settings.prioritize_whitelisted:
-                for alt_channel in alternative_channels:
-                    if not alt_channel.url or not alt_channel.url.strip():
-                        continue
-                    
-                    if self.settings.is_blacklisted(alt_channel.url):
-                        continue
-                    
-                    if self.settings.is_whitelisted(alt_channel.url):
-                        is_available, response_time, _ = URLUtils.check_url_availability(
-                            alt_channel.url, 
-                            self.settings.check_timeout,
-                            False
-                        )
-                        
-                        if is_available:
-                            return alt_channel.url
+            return self._race_candidates(self._candidate_urls(alternative_channels), headers)
             
-            for alt_channel in alternative_channels:
-                if not alt_channel.url or not alt_channel.url.strip():
-                    continue
-                
-                if self.settings.is_blacklisted(alt_channel.url):
-                    continue
-                
-                if URLUtils.should_filter_url(alt_channel.url, 
-                                            self.settings.temporary_domains,
-                                            self.settings.unsafe_domains):
-                    continue
+        except Exception as e:
+            logger.error(f"Ошибка поиска замены для {channel.name}: {e}")
+            return None
+    
+    def _candidate_urls(self, alternative_channels: List[ChannelData]) -> List[str]:
+        """Ссылки-кандидаты в порядке приоритета: сначала из белого списка, затем остальные"""
+        preferred = []
+        others = []
+        seen = set()
+        
+        for alt_channel in alternative_channels:
+            url = alt_channel.url
+            if not url or not url.strip() or url in seen:
+                continue
+            
+            if self.settings.is_blacklisted(url):
+                continue
+            
+            whitelisted = self.settings.prioritize_whitelisted and self.settings.is_whitelisted(url)
+            if not whitelisted and URLUtils.should_filter_url(url,
+                                                              self.settings.temporary_domains,
+                                                              self.settings.unsafe_domains):
+                continue
+            
+            seen.add(url)
+            (preferred if whitelisted else others).append(url)
+        
+        return preferred + others
+    
+    def _race_candidates(self, urls: List[str], headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Проверяет до CANDIDATE_RACE_WIDTH кандидатов одновременно и возвращает первый по приоритету
+        рабочий. Как только он известен, проверки менее приоритетных кандидатов отменяются"""
+        if not urls:
+            return None
+        
+        results: List[Optional[bool]] = [None] * len(urls)
+        tokens = [CancellationToken() for _ in urls]
+        lock = threading.Lock()
+        best = [len(urls)]
+        
+        with self._lock:
+            self._candidate_tokens.update(tokens)
+        if self.is_stopped():
+            for token in tokens:
+                token.cancel()
+        
+        def check(index: int) -> bool:
+            try:
+                success = bool(self._check_candidate(urls[index], headers, tokens[index]))
+            except Exception as e:
+                logger.error(f"Ошибка проверки кандидата {urls[index]}: {e}")
+                success = False
+            finally:
+                tokens[index].close()
+            
+            losers = []
+            with lock:
+                results[index] = success
+                if success and index < best[0]:
+                    losers = tokens[index + 1:best[0]]
+                    best[0] = index
+            for token in losers:
+                token.cancel()
+            return success
+        
+        service = self.execution_service or ExecutionService.shared()
+        futures: List[concurrent.futures.Future] = []
+        try:
+            while not self.is_stopped():
+                with lock:
+                    pending = [i for i in range(len(futures)) if results[i] is None]
+                    for i, result in enumerate(results):
+                        if result is None:
+                            break
+                        if result:
+                            return urls[i]
+                    else:
+                        return None
+                    limit = best[0]
                 
-                is_available, response_time, _ = URLUtils.check_url_availability(
-                    alt_channel.url, 
-                    self.settings.check_timeout,
-                    False
-                )
+                while len(futures) < limit and len(pending) < self.CANDIDATE_RACE_WIDTH:
+                    pending.append(len(futures))
+                    futures.append(service.submit(self._candidate_job, check, len(futures)))
                 
-                if is_available:
-                    return alt_channel.url
+                # Задачи каналов сами занимают потоки пула: если проверка самого приоритетного
+                # кандидата ещё не началась, выполняем её здесь, а не ждём свободного потока
+                blocker = futures[pending[0]]
+                if blocker.cancel():
+                    check(pending[0])
+                else:
+                    concurrent.futures.wait([blocker], timeout=0.1)
             
             return None
+        finally:
+            for future in futures:
+                future.cancel()
+            for token in tokens:
+                if not token.is_cancelled():
+                    token.cancel()
+            with self._lock:
+                self._candidate_tokens.difference_update(tokens)
+    
+    def _check_candidate(self, url: str, headers: Optional[Dict[str, str]] = None,
+                         cancel_token: Optional[CancellationToken] = None) -> bool:
+        """Проверяет кандидата не более одного раза за запуск: одну ссылку часто предлагают
+        нескольким каналам, они получают уже известный результат или ждут идущей проверки"""
+        cancel_token = cancel_token or self.cancel_token
+        check_key = URLUtils.check_key(url, headers)
+        key = URLUtils.normalize_check_key(check_key) or check_key
+        
+        while True:
+            with self._lock:
+                future = self._candidate_results.get(key)
+                owner = future is None
+                if owner:
+                    future = concurrent.futures.Future()
+                    self._candidate_results[key] = future
+            
+            if owner:
+                break
             
-        except Exception as e:
-            logger.error(f"Ошибка поиска замены для {channel.name}: {e}")
+            while not future.done():
+                if cancel_token.is_cancelled() or self.is_stopped():
+                    return False
+                concurrent.futures.wait([future], timeout=0.1)
+            
+            # None — проверку отменили, ссылку проверяем сами
+            if future.result() is not None:
+                with self._lock:
+                    self._candidate_reused += 1
+                return future.result()
+        
+        success = None
+        try:
+            success = self._probe_candidate(url, check_key, headers, cancel_token)
+        finally:
+            if success is None:
+                with self._lock:
+                    self._candidate_results.pop(key, None)
+            future.set_result(success)
+        
+        return bool(success)
+    
+    def _probe_candidate(self, url: str, check_key: str, headers: Optional[Dict[str, str]],
+                         cancel_token: CancellationToken) -> Optional[bool]:
+        cache = self.source_manager.url_check_cache
+        if cache and self.settings.use_check_cache and self.settings.check_cache_ttl_hours > 0:
+            cached = cache.get(check_key, self.settings.check_cache_ttl_hours)
+            if cached and cached['success'] is not None:
+                return cached['success']
+        
+        # Кандидаты ранжируются по оценке, поэтому для них замеряется и скорость
+        if self.settings.hls_deep_probe and urlparse(url).path.lower().endswith('.m3u8'):
+            probe = URLUtils.probe_hls_stream(url, self.settings.check_timeout, False,
+                                              cancel_token=cancel_token, headers=headers)
+            measurement = {
+                'success': probe['success'],
+                'message': probe['message'],
+                'response_time': probe['response_time'],
+                'final_url': probe['final_url'],
+                'redirect_hops': probe['redirect_hops'],
+                'hls': {
+                    'variant_count': probe['variant_count'],
+                    'declared_bandwidth': probe['declared_bandwidth'],
+                    'time_to_first_segment': probe['time_to_first_segment'],
+                    'segment_bitrate': probe['segment_bitrate']
+                }
+            }
+        else:
+            measurement = URLUtils.measure_url(url, self.settings.check_timeout, False,
+                                               sample_bytes=URLUtils.SCORE_SAMPLE_BYTES,
+                                               cancel_token=cancel_token, headers=headers)
+        measurement['quality'] = (LinkQuality.WORKING if measurement['success']
+                                  else LinkQuality.NOT_WORKING)
+        
+        # Оборванная отменой проверка ничего не говорит о ссылке
+        if self.is_stopped() or cancel_token.is_cancelled():
             return None
+        
+        if cache:
+            cache.put(check_key, measurement)
+        
+        return measurement['success']
 
 
 class PlaylistHeaderManager:
@@ -1275,6 +3560,164 @@ class PlaylistHeaderManager:
         return header_text
 
 
+class M3UPlaylistIO:
+    
+    @staticmethod
+    def read(filepath: str) -> Tuple[PlaylistHeaderManager, List[ChannelData]]:
+        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        
+        header_manager = PlaylistHeaderManager()
+        header_manager.parse_header(content)
+        
+        lines = content.split('\n')
+        
+        start_index = 0
+        for i, line in enumerate(lines):
+            if line.startswith('#EXTINF:'):
+                start_index = i
+                break
+        
+        return header_manager, M3UPlaylistIO.parse_channels('\n'.join(lines[start_index:]))
+    
+    @staticmethod
+    def parse_channels(content: str) -> List[ChannelData]:
+        channels = []
+        
+        lines = content.splitlines()
+        i = 0
+        
+        try:
+            while i < len(lines):
+                line = lines[i].strip()
+                
+                if not line:
+                    i += 1
+                    continue
+                
+                if line.startswith('#EXTINF:'):
+                    channel = ChannelData()
+                    channel.extinf = line
+                    
+                    if ',' in line:
+                        parts = line.split(',', 1)
+                        channel.name = parts[1].strip()
+                    
+                    attrs_part = line.split(',')[0] if ',' in line else line
+                    
+                    tvg_id_match = re.search(r'tvg-id="([^"]*)"', attrs_part)
+                    if tvg_id_match:
+                        channel.tvg_id = tvg_id_match.group(1)
+                    
+                    logo_match = re.search(r'tvg-logo="([^"]*)"', attrs_part)
+                    if logo_match:
+                        channel.tvg_logo = logo_match.group(1)
+                    
+                    group_match = re.search(r'group-title="([^"]*)"', attrs_part)
+                    if group_match:
+                        channel.group = group_match.group(1)
+                    else:
+                        channel.group = "Без группы"
+                    
+                    j = i + 1
+                    has_url = False
+                    url_lines = []
+                    extvlcopt_lines = []
+                    
+                    while j < len(lines):
+                        next_line = lines[j].strip()
+                        if not next_line:
+                            j += 1
+                            continue
+                        
+                        if next_line.startswith('#EXTINF:'):
+                            break
+                        
+                        if next_line.startswith('#'):
+                            extvlcopt_lines.append(next_line)
+                        else:
+                            url_lines.append(next_line)
+                            has_url = True
+                            break
+                        
+                        j += 1
+                    
+                    if has_url:
+                        j += 1
+                        
+                        while j < len(lines):
+                            next_line = lines[j].strip()
+                            if not next_line:
+                                j += 1
+                                continue
+                            
+                            if next_line.startswith('#EXTINF:'):
+                                break
+                            
+                            if next_line.startswith('#'):
+                                extvlcopt_lines.append(next_line)
+                            else:
+                                break
+                            
+                            j += 1
+                    else:
+                        while j < len(lines) and not lines[j].strip():
+                            j += 1
+                    
+                    if url_lines:
+                        channel.url = '\n'.join(url_lines)
+                        channel.has_url = True
+                    else:
+                        channel.url = ""
+                        channel.has_url = False
+                    
+                    channel.extvlcopt_lines = extvlcopt_lines
+                    channel.parse_extvlcopt_headers()
+                    if 'User-Agent' in channel.extra_headers:
+                        channel.user_agent = channel.extra_headers['User-Agent']
+                    
+                    channels.append(channel)
+                    
+                    i = j
+                else:
+                    i += 1
+            
+        except (IndexError, ValueError) as e:
+            logger.error(f"Ошибка парсинга M3U в строке {i}: {e}")
+        
+        return channels
+    
+    @staticmethod
+    def write(filepath: str, header_text: str, channels: List[ChannelData]):
+        """Атомарная запись: во временный файл рядом, затем замена"""
+        tmp_path = filepath + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                if header_text:
+                    f.write(header_text)
+                else:
+                    f.write('#EXTM3U\n\n')
+                
+                for channel in channels:
+                    f.write(channel.extinf + '\n')
+                    
+                    for extra_line in channel.extvlcopt_lines:
+                        f.write(extra_line + '\n')
+                    
+                    if channel.url:
+                        f.write(channel.url + '\n')
+                    else:
+                        f.write('\n')
+            
+            if os.path.exists(filepath):
+                shutil.copymode(filepath, tmp_path)
+            os.replace(tmp_path, filepath)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
 class BlacklistManager:
     
     def __init__(self, config_dir: str = None):
@@ -1374,88 +3817,1009 @@ class BlacklistManager:
         return filtered_channels, removed_count
 
 
-class URLCheckerWorker(BaseWorker):
+class URLCheckCache:
+    
+    def __init__(self, config_dir: str = None):
+        if config_dir is None:
+            config_dir = SystemThemeManager.get_config_dir()
+        
+        self.config_dir = config_dir
+        self.db_file = os.path.join(config_dir, "url_check_cache.db")
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        
+        self._ensure_config_dir()
+        self._open()
+    
+    def _ensure_config_dir(self):
+        try:
+            os.makedirs(self.config_dir, exist_ok=True)
+        except (OSError, PermissionError) as e:
+            logger.error(f"Ошибка создания директории: {e}")
+            raise
+    
+    def _open(self):
+        try:
+            self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS url_checks ("
+                "url TEXT PRIMARY KEY, "
+                "success INTEGER, "
+                "message TEXT, "
+                "response_time REAL, "
+                "quality INTEGER, "
+                "checked_at REAL NOT NULL, "
+                "hls TEXT)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(url_checks)")}
+            if 'hls' not in columns:
+                self._conn.execute("ALTER TABLE url_checks ADD COLUMN hls TEXT")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS url_stats ("
+                "url TEXT PRIMARY KEY, "
+                "checks INTEGER NOT NULL, "
+                "successes INTEGER NOT NULL, "
+                "score REAL, "
+                "updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS host_latency ("
+                "host TEXT PRIMARY KEY, "
+                "data TEXT NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка открытия кэша проверок: {e}")
+            self._conn = None
+    
+    def _row_to_result(self, url: str, row: Tuple) -> Dict[str, Any]:
+        success, message, response_time, quality_value, checked_at, hls, score = row
+        try:
+            quality = LinkQuality(quality_value)
+        except ValueError:
+            quality = LinkQuality.UNKNOWN
+        
+        try:
+            hls = json.loads(hls) if hls else None
+        except ValueError:
+            hls = None
+        
+        return {
+            'success': None if success is None else bool(success),
+            'message': message or "",
+            'response_time': response_time,
+            'quality': quality,
+            'url': url,
+            'checked_at': datetime.fromtimestamp(checked_at),
+            'hls': hls,
+            'score': score
+        }
+    
+    def get(self, url: str, max_age_hours: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        return self.get_many([url], max_age_hours).get(url)
+    
+    def get_many(self, urls: List[str], max_age_hours: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        if self._conn is None or not urls:
+            return results
+        
+        keys: Dict[str, List[str]] = {}
+        for url in urls:
+            key = URLUtils.normalize_check_key(url)
+            if key:
+                keys.setdefault(key, []).append(url)
+        
+        min_checked_at = None
+        if max_age_hours is not None:
+            min_checked_at = time.time() - max_age_hours * 3600
+        
+        key_list = list(keys.keys())
+        try:
+            with self._lock:
+                for start in range(0, len(key_list), 500):
+                    chunk = key_list[start:start + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    query = (f"SELECT c.url, c.success, c.message, c.response_time, c.quality, "
+                             f"c.checked_at, c.hls, s.score "
+                             f"FROM url_checks c LEFT JOIN url_stats s ON s.url = c.url "
+                             f"WHERE c.url IN ({placeholders})")
+                    params: List[Any] = list(chunk)
+                    if min_checked_at is not None:
+                        query += " AND c.checked_at >= ?"
+                        params.append(min_checked_at)
+                    
+                    for row in self._conn.execute(query, params):
+                        for url in keys.get(row[0], []):
+                            results[url] = self._row_to_result(url, row[1:])
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка чтения кэша проверок: {e}")
+        
+        return results
+    
+    def put(self, url: str, result: Dict[str, Any], checked_at: Optional[datetime] = None):
+        self.put_many([dict(result, url=url)], checked_at)
+    
+    def put_many(self, results: List[Dict[str, Any]], checked_at: Optional[datetime] = None):
+        if self._conn is None or not results:
+            return
+        
+        timestamp = (checked_at or datetime.now()).timestamp()
+        rows = []
+        keyed_results = {}
+        for result in results:
+            key = URLUtils.normalize_check_key(result.get('url', ''))
+            if not key:
+                continue
+            
+            keyed_results[key] = result
+            success = result.get('success')
+            quality = result.get('quality', LinkQuality.UNKNOWN)
+            hls = result.get('hls')
+            rows.append((
+                key,
+                None if success is None else int(bool(success)),
+                result.get('message', ''),
+                result.get('response_time'),
+                quality.value if isinstance(quality, LinkQuality) else int(quality or 0),
+                timestamp,
+                json.dumps(hls) if hls else None
+            ))
+        
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO url_checks "
+                    "(url, success, message, response_time, quality, checked_at, hls) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._update_stats(keyed_results, timestamp)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка записи кэша проверок: {e}")
+    
+    def _update_stats(self, keyed_results: Dict[str, Dict[str, Any]], timestamp: float):
+        stats = {}
+        key_list = [key for key, result in keyed_results.items() if result.get('success') is not None]
+        for start in range(0, len(key_list), 500):
+            chunk = key_list[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for url, checks, successes in self._conn.execute(
+                    f"SELECT url, checks, successes FROM url_stats WHERE url IN ({placeholders})", chunk):
+                stats[url] = (checks, successes)
+        
+        rows = []
+        for key in key_list:
+            result = keyed_results[key]
+            checks, successes = stats.get(key, (0, 0))
+            checks += 1
+            successes += 1 if result.get('success') else 0
+            score = URLUtils.compute_link_score(result, successes / checks)
+            result['score'] = score
+            rows.append((key, checks, successes, score, timestamp))
+        
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO url_stats (url, checks, successes, score, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+    
+    def get_scores(self, urls: List[str]) -> Dict[str, float]:
+        scores = {}
+        if self._conn is None or not urls:
+            return scores
+        
+        keys: Dict[str, List[str]] = {}
+        for url in urls:
+            key = URLUtils.normalize_check_key(url)
+            if key:
+                keys.setdefault(key, []).append(url)
+        
+        key_list = list(keys.keys())
+        try:
+            with self._lock:
+                for start in range(0, len(key_list), 500):
+                    chunk = key_list[start:start + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    for key, score in self._conn.execute(
+                            f"SELECT url, score FROM url_stats WHERE url IN ({placeholders})", chunk):
+                        for url in keys.get(key, []):
+                            scores[url] = score
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка чтения кэша проверок: {e}")
+        
+        return scores
+    
+    def load_host_latency(self) -> Dict[str, Dict[str, Any]]:
+        hosts = {}
+        if self._conn is None:
+            return hosts
+        
+        try:
+            with self._lock:
+                for host, data in self._conn.execute("SELECT host, data FROM host_latency"):
+                    try:
+                        hosts[host] = json.loads(data)
+                    except ValueError:
+                        continue
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка чтения статистики хостов: {e}")
+        
+        return hosts
+    
+    def save_host_latency(self, hosts: Dict[str, Dict[str, Any]]):
+        if self._conn is None or not hosts:
+            return
+        
+        timestamp = time.time()
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO host_latency (host, data, updated_at) VALUES (?, ?, ?)",
+                    [(host, json.dumps(data), timestamp) for host, data in hosts.items()]
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка записи статистики хостов: {e}")
+    
+    def remove(self, url: str):
+        if self._conn is None:
+            return
+        
+        try:
+            with self._lock:
+                key = URLUtils.normalize_check_key(url)
+                self._conn.execute("DELETE FROM url_checks WHERE url = ?", (key,))
+                self._conn.execute("DELETE FROM url_stats WHERE url = ?", (key,))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка удаления из кэша проверок: {e}")
+    
+    def purge_older_than(self, hours: float) -> int:
+        if self._conn is None:
+            return 0
+        
+        try:
+            with self._lock:
+                cursor = self._conn.execute(
+                    "DELETE FROM url_checks WHERE checked_at < ?",
+                    (time.time() - hours * 3600,)
+                )
+                self._conn.commit()
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка очистки кэша проверок: {e}")
+            return 0
+    
+    def clear(self):
+        if self._conn is None:
+            return
+        
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM url_checks")
+                self._conn.execute("DELETE FROM url_stats")
+                self._conn.execute("DELETE FROM host_latency")
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка очистки кэша проверок: {e}")
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class LinkCacheStore:
+    """Кэш каналов источников в SQLite: только поля для замены и индекс по нормализованному названию"""
+    
+    # Ключ хранится без суффиксов качества, чтобы один индекс подходил к любым настройкам суффиксов
+    BASE_NORMALIZER = ChannelNameNormalizer([])
+    
+    def __init__(self, cache_dir: str):
+        self.db_file = os.path.join(cache_dir, "links.db")
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._open()
+    
+    def _open(self):
+        try:
+            self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources ("
+                "name TEXT PRIMARY KEY, "
+                "channel_count INTEGER NOT NULL, "
+                "cached_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS links ("
+                "source TEXT NOT NULL, "
+                "position INTEGER NOT NULL, "
+                "name TEXT NOT NULL, "
+                "norm_name TEXT NOT NULL, "
+                "group_title TEXT, "
+                "tvg_id TEXT, "
+                "tvg_logo TEXT, "
+                "url TEXT, "
+                "extvlcopt TEXT, "
+                "entry_hash TEXT, "
+                "PRIMARY KEY (source, position)) WITHOUT ROWID"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(links)")}
+            if 'entry_hash' not in columns:
+                self._conn.execute("ALTER TABLE links ADD COLUMN entry_hash TEXT")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS links_norm_name ON links (source, norm_name)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS links_entry_hash ON links (source, entry_hash)"
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка открытия кэша ссылок: {e}")
+            self._conn = None
+    
+    @staticmethod
+    def _row_to_channel(source_name: str, row: Tuple) -> ChannelData:
+        name, group, tvg_id, tvg_logo, url, extvlcopt = row
+        channel = ChannelData()
+        channel.name = name
+        channel.group = group or "Без группы"
+        channel.tvg_id = tvg_id or ""
+        channel.tvg_logo = tvg_logo or ""
+        channel.url = url or ""
+        channel.has_url = bool(channel.url)
+        channel.link_source = source_name
+        if extvlcopt:
+            channel.extvlcopt_lines = extvlcopt.split('\n')
+            channel.parse_extvlcopt_headers()
+        channel.update_extinf()
+        return channel
+    
+    @staticmethod
+    def entry_hash(channel: ChannelData) -> str:
+        """Хэш сохраняемых полей записи: одинаков, пока запись в источнике не менялась"""
+        data = '\x1f'.join((channel.name or "", channel.url or "", channel.group or "", channel.tvg_id or "",
+                            channel.tvg_logo or "", '\n'.join(channel.extvlcopt_lines)))
+        return hashlib.md5(data.encode('utf-8', errors='replace')).hexdigest()
+    
+    def _link_row(self, source_name: str, position: int, channel: ChannelData, entry_hash: str) -> Tuple:
+        return (source_name, position, channel.name or "", self.BASE_NORMALIZER.normalize(channel.name),
+                channel.group, channel.tvg_id, channel.tvg_logo, channel.url,
+                '\n'.join(channel.extvlcopt_lines), entry_hash)
+    
+    def _insert_links(self, rows: List[Tuple]):
+        self._conn.executemany(
+            "INSERT INTO links (source, position, name, norm_name, group_title, "
+            "tvg_id, tvg_logo, url, extvlcopt, entry_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+    
+    def has_source(self, source_name: str) -> bool:
+        if self._conn is None:
+            return False
+        
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT 1 FROM sources WHERE name = ?", (source_name,)
+                ).fetchone()
+            return row is not None
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка чтения кэша ссылок: {e}")
+            return False
+    
+    def put_channels(self, source_name: str, channels: List[ChannelData]):
+        if self._conn is None:
+            return
+        
+        rows = [self._link_row(source_name, position, channel, self.entry_hash(channel))
+                for position, channel in enumerate(channels)]
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM links WHERE source = ?", (source_name,))
+                self._insert_links(rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sources (name, channel_count, cached_at) VALUES (?, ?, ?)",
+                    (source_name, len(rows), time.time())
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка записи кэша ссылок: {e}")
+            with self._lock:
+                self._conn.rollback()
+    
+    def get_entry_counts(self, source_name: str) -> Optional[Tuple[Counter, Dict[str, str]]]:
+        """Сколько раз каждая запись (по хэшу) встречается в кэше источника и названия записей;
+        None, если источника нет в кэше"""
+        if not self.has_source(source_name):
+            return None
+        
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT entry_hash, MIN(name), COUNT(*) FROM links WHERE source = ? GROUP BY entry_hash",
+                    (source_name,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка чтения кэша ссылок: {e}")
+            return None
+        
+        return (Counter({entry_hash: count for entry_hash, _, count in rows}),
+                {entry_hash: name for entry_hash, name, _ in rows})
+    
+    def apply_diff(self, source_name: str, removed: Counter, added: List[Tuple[str, ChannelData]]):
+        """Удаляет removed (хэш -> число записей) и дописывает added в конец источника"""
+        if self._conn is None:
+            return
+        
+        try:
+            with self._lock:
+                for entry_hash, count in removed.items():
+                    self._conn.execute(
+                        "DELETE FROM links WHERE source = ? AND position IN ("
+                        "SELECT position FROM links WHERE source = ? AND entry_hash IS ? "
+                        "ORDER BY position DESC LIMIT ?)",
+                        (source_name, source_name, entry_hash, count)
+                    )
+                
+                last_position = self._conn.execute(
+                    "SELECT COALESCE(MAX(position), -1) FROM links WHERE source = ?", (source_name,)
+                ).fetchone()[0]
+                self._insert_links([
+                    self._link_row(source_name, last_position + offset, channel, entry_hash)
+                    for offset, (entry_hash, channel) in enumerate(added, start=1)
+                ])
+                
+                channel_count = self._conn.execute(
+                    "SELECT COUNT(*) FROM links WHERE source = ?", (source_name,)
+                ).fetchone()[0]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sources (name, channel_count, cached_at) VALUES (?, ?, ?)",
+                    (source_name, channel_count, time.time())
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка записи кэша ссылок: {e}")
+            with self._lock:
+                self._conn.rollback()
+    
+    def get_channels(self, source_name: str) -> Optional[List[ChannelData]]:
+        if not self.has_source(source_name):
+            return None
+        
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT name, group_title, tvg_id, tvg_logo, url, extvlcopt "
+                    "FROM links WHERE source = ? ORDER BY position",
+                    (source_name,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка чтения кэша ссылок: {e}")
+            return None
+        
+        return [self._row_to_channel(source_name, row) for row in rows]
+    
+    def find_by_name(self, source_names: List[str], name: str,
+                     normalizer: ChannelNameNormalizer) -> Optional[Tuple[List[ChannelData], Set[str]]]:
+        """Каналы источников с тем же нормализованным названием и имена источников, которые есть
+        в кэше; None, если кэш недоступен"""
+        if self._conn is None:
+            return None
+        
+        key = normalizer.normalize(name)
+        placeholders = ','.join('?' * len(source_names))
+        
+        # Совпадают записи с тем же ключом или с ключом, после которого идут только суффиксы качества.
+        # Порядок восстанавливаем сами: с ORDER BY SQLite выбирает первичный ключ вместо индекса
+        try:
+            with self._lock:
+                cached = {row[0] for row in self._conn.execute(
+                    f"SELECT name FROM sources WHERE name IN ({placeholders})", source_names)}
+                rows = []
+                if key and cached:
+                    rows = self._conn.execute(
+                        f"SELECT source, position, name, group_title, tvg_id, tvg_logo, url, extvlcopt "
+                        f"FROM links WHERE source IN ({placeholders}) AND norm_name >= ? AND norm_name < ?",
+                        list(source_names) + [key, key + "!"]
+                    ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка чтения кэша ссылок: {e}")
+            return None
+        
+        order = {source_name: i for i, source_name in enumerate(source_names)}
+        rows.sort(key=lambda row: (order[row[0]], row[1]))
+        return [self._row_to_channel(row[0], row[2:]) for row in rows
+                if normalizer.normalize(row[2]) == key], cached
+    
+    def remove(self, source_name: str):
+        if self._conn is None:
+            return
+        
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM links WHERE source = ?", (source_name,))
+                self._conn.execute("DELETE FROM sources WHERE name = ?", (source_name,))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка удаления из кэша ссылок: {e}")
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class URLCheckCheckpoint:
+    
+    def __init__(self, playlist_path: str, config_dir: str = None):
+        if config_dir is None:
+            config_dir = SystemThemeManager.get_config_dir()
+        
+        key = os.path.abspath(playlist_path)
+        self.checkpoint_dir = os.path.join(config_dir, "url_check_checkpoints")
+        self.checkpoint_file = os.path.join(
+            self.checkpoint_dir, hashlib.md5(key.encode('utf-8')).hexdigest() + ".json"
+        )
+    
+    def save(self, urls: List[str], results: Dict[int, Dict[str, Any]], skipped_count: int = 0) -> bool:
+        serialized = {}
+        for idx, result in results.items():
+            item = dict(result)
+            quality = item.get('quality')
+            if isinstance(quality, LinkQuality):
+                item['quality'] = quality.value
+            serialized[str(idx)] = item
+        
+        data = {
+            'urls': urls,
+            'results': serialized,
+            'skipped_count': skipped_count,
+            'saved_at': datetime.now().isoformat()
+        }
+        
+        tmp_file = self.checkpoint_file + ".tmp"
+        try:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+            os.replace(tmp_file, self.checkpoint_file)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Ошибка сохранения контрольной точки проверки: {e}")
+            return False
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.checkpoint_file):
+            return None
+        
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            urls = list(data.get('urls', []))
+            results = {}
+            for key, item in data.get('results', {}).items():
+                idx = int(key)
+                if 0 <= idx < len(urls):
+                    try:
+                        item['quality'] = LinkQuality(item.get('quality', LinkQuality.UNKNOWN.value))
+                    except ValueError:
+                        item['quality'] = LinkQuality.UNKNOWN
+                    item['index'] = idx
+                    results[idx] = item
+            
+            return {
+                'urls': urls,
+                'results': results,
+                'skipped_count': int(data.get('skipped_count', 0)),
+                'saved_at': datetime.fromisoformat(data['saved_at'])
+            }
+        except (OSError, KeyError, TypeError, ValueError) as e:
+            logger.error(f"Ошибка загрузки контрольной точки проверки: {e}")
+            return None
+    
+    def clear(self):
+        try:
+            if os.path.exists(self.checkpoint_file):
+                os.remove(self.checkpoint_file)
+        except OSError as e:
+            logger.error(f"Ошибка удаления контрольной точки проверки: {e}")
+
+
+class HostLatencyTracker:
+    
+    MIN_SAMPLES = 5
+    DEAD_HOST_FAILURES = 3
+    RETRY_BASE_SECONDS = 60
+    RETRY_MAX_SECONDS = 3600
+    
+    def __init__(self, max_samples: int = 50):
+        self.max_samples = max_samples
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def load(self, url_check_cache: 'URLCheckCache'):
+        hosts = url_check_cache.load_host_latency()
+        with self._lock:
+            for host, data in hosts.items():
+                self._hosts[host] = {
+                    'connect': list(data.get('connect', []))[-self.max_samples:],
+                    'response': list(data.get('response', []))[-self.max_samples:],
+                    'failures': int(data.get('failures', 0)),
+                    'retry_at': float(data.get('retry_at', 0.0))
+                }
+    
+    def save(self, url_check_cache: 'URLCheckCache'):
+        with self._lock:
+            hosts = {host: dict(data) for host, data in self._hosts.items()}
+        url_check_cache.save_host_latency(hosts)
+    
+    def record(self, host: str, connect_time: Optional[float], response_time: Optional[float],
+               success: bool, unreachable: bool = False):
+        """unreachable - таймаут или ошибка соединения; ответ с кодом ошибки HTTP
+        означает, что хост жив, и серию неудач сбрасывает"""
+        if not host:
+            return
+        
+        with self._lock:
+            data = self._hosts.setdefault(host, {'connect': [], 'response': [], 'failures': 0,
+                                                 'retry_at': 0.0})
+            if success or not unreachable:
+                data['failures'] = 0
+                data['retry_at'] = 0.0
+                if success and connect_time is not None:
+                    data['connect'] = (data['connect'] + [connect_time])[-self.max_samples:]
+                if success and response_time is not None:
+                    data['response'] = (data['response'] + [response_time])[-self.max_samples:]
+            else:
+                data['failures'] += 1
+                if data['failures'] >= self.DEAD_HOST_FAILURES:
+                    delay = self.RETRY_BASE_SECONDS * 2 ** (data['failures'] - self.DEAD_HOST_FAILURES)
+                    data['retry_at'] = time.time() + min(delay, self.RETRY_MAX_SECONDS)
+    
+    def should_probe(self, host: str) -> bool:
+        """False, пока идёт пауза после серии таймаутов и ошибок соединения хоста"""
+        with self._lock:
+            data = self._hosts.get(host)
+            return data is None or data.get('retry_at', 0.0) <= time.time()
+    
+    @staticmethod
+    def _percentile(values: List[float], percent: float) -> float:
+        ordered = sorted(values)
+        return ordered[int(round(percent * (len(ordered) - 1)))]
+    
+    def get_stats(self, host: str) -> Optional[Dict[str, float]]:
+        with self._lock:
+            data = self._hosts.get(host)
+            if not data or len(data['response']) < self.MIN_SAMPLES:
+                return None
+            connect = data['connect'] or [0.0]
+            return {
+                'connect_p50': self._percentile(connect, 0.5),
+                'connect_p95': self._percentile(connect, 0.95),
+                'response_p50': self._percentile(data['response'], 0.5),
+                'response_p95': self._percentile(data['response'], 0.95)
+            }
+    
+    def get_timeouts(self, host: str, default_timeout: float,
+                     min_timeout: float, max_timeout: float) -> Tuple[float, float]:
+        """Таймауты соединения и чтения по истории задержек хоста"""
+        def clamp(value: float) -> float:
+            return max(min_timeout, min(max_timeout, value))
+        
+        with self._lock:
+            data = self._hosts.get(host)
+            failures = data['failures'] if data is not None else 0
+        
+        # Хост после серии таймаутов проверяем с наибольшим таймаутом: медленный, но живой
+        # источник должен иметь возможность ответить
+        if failures >= self.DEAD_HOST_FAILURES:
+            timeout = max(default_timeout, max_timeout)
+            return timeout, timeout
+        
+        stats = self.get_stats(host)
+        if stats is None:
+            return clamp(default_timeout), clamp(default_timeout)
+        
+        connect_timeout = clamp(max(stats['connect_p95'] * 3, stats['connect_p50'] * 5))
+        read_timeout = clamp(max(stats['response_p95'] * 2, stats['response_p50'] * 4))
+        if failures:
+            connect_timeout = max(connect_timeout, clamp(default_timeout))
+            read_timeout = max(read_timeout, clamp(default_timeout))
+        return connect_timeout, read_timeout
+
+
+class RedirectCache:
+    """Конечные адреса цепочек перенаправлений с коротким сроком жизни"""
+    
+    def __init__(self, ttl_seconds: float = 600, max_entries: int = 50000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[str, int, float]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, url: str) -> Optional[Tuple[str, int]]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                del self._entries[url]
+                return None
+            return entry[0], entry[1]
+    
+    def put(self, url: str, final_url: str, hops: int):
+        if self.ttl_seconds <= 0 or not final_url or final_url == url:
+            return
+        
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = {key: value for key, value in self._entries.items() if value[2] >= now}
+                while len(self._entries) >= self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[url] = (final_url, hops, time.monotonic() + self.ttl_seconds)
+    
+    def invalidate(self, url: str):
+        with self._lock:
+            self._entries.pop(url, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class PlaylistHealthSampler:
+    """Стратифицированная выборка ссылок для быстрой оценки доли рабочих
+    по группам и хостам с доверительными интервалами"""
+    
+    def __init__(self, confidence: float = 0.95, margin: float = 0.1,
+                 max_samples: int = 2000, seed: Optional[int] = None):
+        self.confidence = confidence
+        self.margin = margin
+        self.max_samples = max(1, max_samples)
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self._random = random.Random(seed)
+        
+        self.effective_margin = margin
+        self.capped = False
+        self.units: Dict[str, Tuple[str, str]] = {}
+        self.group_population: Dict[str, int] = {}
+        self.host_population: Dict[str, int] = {}
+        self.group_samples: Dict[str, List[str]] = {}
+        self.host_samples: Dict[str, List[str]] = {}
+        self.sample: List[str] = []
+    
+    def required_sample_size(self, population: int, margin: Optional[float] = None) -> int:
+        """Объём выборки по Кокрену для p = 0.5 с поправкой на конечную совокупность"""
+        if population <= 0:
+            return 0
+        margin = margin or self.margin
+        n0 = self.z ** 2 * 0.25 / margin ** 2
+        return min(population, math.ceil(n0 / (1 + (n0 - 1) / population)))
+    
+    def achieved_margin(self, population: int, sampled: int) -> float:
+        """Погрешность для p = 0.5 при sampled ссылках из population"""
+        if sampled >= population:
+            return 0.0
+        if sampled <= 0:
+            return 1.0
+        return min(1.0, self.z * math.sqrt(0.25 / sampled * (population - sampled) / (population - 1)))
     
-    url_checked = pyqtSignal(int, bool, str, object, LinkQuality, str)
+    def select(self, channels: List[ChannelData]) -> List[str]:
+        self.units = {}
+        for channel in channels:
+            if not channel.has_url or not channel.url or not channel.url.strip():
+                continue
+            key = channel.get_check_key()
+            if key not in self.units:
+                host = (urlparse(channel.url.strip()).hostname or "").lower() or "(без хоста)"
+                self.units[key] = (channel.group or "Без группы", host)
+        
+        # Один случайный ранг на ссылку: первые по рангу в каждой страте дают
+        # простую случайную выборку и для группы, и для хоста
+        ranks = {url: self._random.random() for url in self.units}
+        groups: Dict[str, List[str]] = {}
+        hosts: Dict[str, List[str]] = {}
+        for url in sorted(self.units, key=ranks.__getitem__):
+            group, host = self.units[url]
+            groups.setdefault(group, []).append(url)
+            hosts.setdefault(host, []).append(url)
+        
+        self.group_population = {group: len(urls) for group, urls in groups.items()}
+        self.host_population = {host: len(urls) for host, urls in hosts.items()}
+        
+        margin = self.margin
+        while True:
+            self.group_samples = {group: urls[:self.required_sample_size(len(urls), margin)]
+                                  for group, urls in groups.items()}
+            self.host_samples = {host: urls[:self.required_sample_size(len(urls), margin)]
+                                 for host, urls in hosts.items()}
+            selected = set()
+            for urls in itertools.chain(self.group_samples.values(), self.host_samples.values()):
+                selected.update(urls)
+            
+            if len(selected) <= self.max_samples or margin >= 0.5:
+                break
+            margin = min(0.5, margin * 1.25)
+        
+        # Множество мелких страт (обычно хостов) может не уложиться в лимит и при погрешности 50%.
+        # Тогда берём max_samples ссылок с наименьшими рангами — пропорциональную выборку:
+        # в каждой страте это её первые по рангу ссылки, то есть простая случайная выборка,
+        # а мелкие страты могут остаться без оценки
+        self.capped = len(selected) > self.max_samples
+        if self.capped:
+            cutoff = ranks[sorted(self.units, key=ranks.__getitem__)[self.max_samples - 1]]
+            self.group_samples = {group: [url for url in urls if ranks[url] <= cutoff]
+                                  for group, urls in groups.items()}
+            self.host_samples = {host: [url for url in urls if ranks[url] <= cutoff]
+                                 for host, urls in hosts.items()}
+            selected = {url for url in self.units if ranks[url] <= cutoff}
+            margin = max(self.achieved_margin(self.group_population[group], len(urls))
+                         for group, urls in self.group_samples.items() if urls)
+        
+        self.effective_margin = margin
+        self.sample = sorted(selected, key=ranks.__getitem__)
+        return list(self.sample)
+    
+    def _interval(self, working: int, checked: int, population: int) -> Tuple[float, float, float]:
+        """Интервал Уилсона с поправкой на конечную совокупность"""
+        estimate = working / checked
+        if checked >= population:
+            return estimate, estimate, estimate
+        
+        n_eff = checked * (population - 1) / (population - checked)
+        z2 = self.z ** 2
+        denominator = 1 + z2 / n_eff
+        center = (estimate + z2 / (2 * n_eff)) / denominator
+        half = self.z * math.sqrt(estimate * (1 - estimate) / n_eff + z2 / (4 * n_eff ** 2)) / denominator
+        return estimate, max(0.0, center - half), min(1.0, center + half)
+    
+    def _stratum_report(self, name: str, population: int, urls: List[str],
+                        results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        checked = [results[url] for url in urls if url in results and results[url].get('success') is not None]
+        working = sum(1 for result in checked if result['success'])
+        entry = {
+            'name': name,
+            'population': population,
+            'sampled': len(urls),
+            'checked': len(checked),
+            'working': working,
+            'estimate': None,
+            'low': None,
+            'high': None
+        }
+        if checked:
+            entry['estimate'], entry['low'], entry['high'] = self._interval(working, len(checked), population)
+        return entry
+    
+    def report(self, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        groups = [self._stratum_report(group, self.group_population[group], urls, results)
+                  for group, urls in self.group_samples.items()]
+        hosts = [self._stratum_report(host, self.host_population[host], urls, results)
+                 for host, urls in self.host_samples.items()]
+        groups.sort(key=lambda entry: -entry['population'])
+        hosts.sort(key=lambda entry: -entry['population'])
+        
+        # Общая оценка - взвешенная по группам (стратифицированная)
+        covered = [entry for entry in groups if entry['checked']]
+        covered_population = sum(entry['population'] for entry in covered)
+        overall = {
+            'name': "Весь плейлист",
+            'population': len(self.units),
+            'sampled': len(self.sample),
+            'checked': sum(1 for url in self.sample
+                           if url in results and results[url].get('success') is not None),
+            'working': sum(1 for url in self.sample if results.get(url, {}).get('success') is True),
+            'estimate': None,
+            'low': None,
+            'high': None
+        }
+        
+        if covered_population:
+            estimate = 0.0
+            variance = 0.0
+            for entry in covered:
+                weight = entry['population'] / covered_population
+                p = entry['working'] / entry['checked']
+                fpc = 1 - entry['checked'] / entry['population']
+                estimate += weight * p
+                variance += weight ** 2 * p * (1 - p) / entry['checked'] * fpc
+            half = self.z * math.sqrt(variance)
+            overall['estimate'] = estimate
+            overall['low'] = max(0.0, estimate - half)
+            overall['high'] = min(1.0, estimate + half)
+        
+        return {'overall': overall, 'groups': groups, 'hosts': hosts,
+                'margin': self.effective_margin, 'confidence': self.confidence, 'capped': self.capped}
+
+
+class URLCheckerWorker(BaseWorker):
     
-    def __init__(self, urls: List[str], timeout: int = 5, max_workers: int = 5):
+    PRIORITY_VISIBLE = 0
+    PRIORITY_SELECTED = 1
+    PRIORITY_GROUP = 2
+    PRIORITY_DEFAULT = 3
+    
+    urls_checked = pyqtSignal(list)
+    
+    def __init__(self, urls: List[str], timeout: int = 5, max_workers: int = 5,
+                 batch_interval: float = 0.25,
+                 completed_results: Optional[Dict[int, Dict[str, Any]]] = None,
+                 deep_probe_hls: bool = False,
+                 protocol_timeouts: Optional[Dict[str, float]] = None,
+                 host_latency: Optional[HostLatencyTracker] = None,
+                 timeout_bounds: Optional[Tuple[float, float]] = None,
+                 job_name: str = "Проверка ссылок",
+                 redirect_cache: Optional[RedirectCache] = None):
         super().__init__()
         self.urls = urls.copy()
+        self.job_name = job_name
         self.timeout = timeout
-        self.max_workers = min(max_workers, 5)
-        self._results = {}
-        self._processed_count = 0
+        self.max_workers = max(1, max_workers)
+        self.batch_interval = batch_interval
+        self.deep_probe_hls = deep_probe_hls
+        self.protocol_timeouts = dict(protocol_timeouts or {})
+        self.host_latency = host_latency
+        self.timeout_bounds = timeout_bounds
+        self.redirect_cache = redirect_cache
+        self._results = dict(completed_results or {})
+        self._processed_count = len(self._results)
         self._total_count = len(urls)
+        self._pending_batch: List[Dict[str, Any]] = []
+        self._last_flush = 0.0
+        self._priorities: Dict[int, int] = {}
+        self._queue: List[Tuple[int, int]] = []
+        self._queue_done = threading.Event()
+        self._active_tasks = 0
+        self._task_error: Optional[Exception] = None
+    
+    def set_priorities(self, priorities: Dict[int, int]):
+        """Задаёт приоритеты индексов URL (меньше - раньше) и перестраивает очередь"""
+        with self._lock:
+            self._priorities = dict(priorities)
+            self._queue = [(self._priorities.get(idx, self.PRIORITY_DEFAULT), idx)
+                           for _, idx in self._queue]
+            heapq.heapify(self._queue)
     
     def run(self):
         try:
-            if self._total_count == 0:
-                self.finished.emit()
-                return
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = {}
-                
-                for i, url in enumerate(self.urls):
-                    if self.is_stopped():
-                        break
-                    
-                    future = executor.submit(self.check_single_url, url, i)
-                    futures[future] = i
-                
-                for future in concurrent.futures.as_completed(futures.keys()):
-                    if self.is_stopped():
-                        break
-                    
-                    idx = futures[future]
-                    try:
-                        result = future.result(timeout=self.timeout + 2)
-                        
-                        with self._lock:
-                            self._results[idx] = result
-                        
-                        success = result['success'] if result['success'] is not None else False
-                        response_time = result['response_time']
-                        quality = result['quality']
-                        
-                        self.url_checked.emit(
-                            result['index'], 
-                            success, 
-                            result['message'], 
-                            response_time, 
-                            quality,
-                            result.get('url', '')
-                        )
-                        
-                        with self._lock:
-                            self._processed_count += 1
-                            processed = self._processed_count
-                        
-                        self.progress.emit(processed, self._total_count, 
-                                          f"Проверено: {processed}/{self._total_count}")
-                        
-                    except concurrent.futures.TimeoutError:
-                        error_result = {
-                            'index': idx, 
-                            'success': False, 
-                            'message': 'Таймаут проверки',
-                            'response_time': None,
-                            'quality': LinkQuality.NOT_WORKING,
-                            'url': self.urls[idx] if idx < len(self.urls) else ''
-                        }
-                        
-                        with self._lock:
-                            self._results[idx] = error_result
-                        
-                        self.url_checked.emit(idx, False, 'Таймаут проверки', None, LinkQuality.NOT_WORKING, self.urls[idx] if idx < len(self.urls) else '')
-                        
-                        with self._lock:
-                            self._processed_count += 1
-                            processed = self._processed_count
-                        
-                        self.progress.emit(processed, self._total_count, 
-                                          f"Проверено: {processed}/{self._total_count}")
-                    
+            if self._total_count == 0:
+                self.finished.emit()
+                return
+            
+            self._last_flush = time.monotonic()
+            
+            service = self.execution_service or ExecutionService.shared()
+            job = service.create_job(self.job_name, self.max_workers)
+            try:
+                with self._lock:
+                    self._queue = [(self._priorities.get(i, self.PRIORITY_DEFAULT), i)
+                                   for i in range(self._total_count) if i not in self._results]
+                    heapq.heapify(self._queue)
+                    self._active_tasks = min(self.max_workers, len(self._queue))
+                    self._task_error = None
+                    self._queue_done.clear()
+                    if not self._active_tasks:
+                        self._queue_done.set()
+                    for _ in range(self._active_tasks):
+                        service.submit(job, self._check_next, service, job)
+                
+                while not self._queue_done.wait(0.1) and not self.is_stopped():
+                    pass
+            finally:
+                service.finish_job(job)
+                self.cancel_token.close()
+            
+            if self._task_error is not None:
+                raise self._task_error
+            
+            self._flush_results()
             self.finished.emit()
             
         except Exception as e:
@@ -1463,7 +4827,66 @@ class URLCheckerWorker(BaseWorker):
             logger.error(f"URLCheckerWorker ошибка: {e}")
             self.finished.emit()
     
+    def _next_index(self) -> Optional[int]:
+        with self._lock:
+            if self.is_stopped() or not self._queue:
+                return None
+            return heapq.heappop(self._queue)[1]
+    
+    def _check_next(self, service: ExecutionService, job: ExecutionJob):
+        """Проверяет одну ссылку из очереди и ставит в пул задачу для следующей. Между ссылками
+        поток возвращается пулу, так что задания приложения чередуются и во время большой проверки"""
+        idx = None
+        try:
+            idx = self._next_index()
+            if idx is not None:
+                result = self.check_single_url(self.urls[idx], idx)
+                # Результат прерванной проверки отбрасываем: URL останется непроверенным
+                if not self.is_stopped():
+                    self._add_result(idx, result)
+        except Exception as e:
+            with self._lock:
+                self._task_error = self._task_error or e
+        finally:
+            with self._lock:
+                if idx is not None and self._queue and self._task_error is None and not self.is_stopped():
+                    service.submit(job, self._check_next, service, job)
+                else:
+                    self._active_tasks -= 1
+                    if self._active_tasks <= 0:
+                        self._queue_done.set()
+    
+    def _add_result(self, idx: int, result: Dict[str, Any]):
+        with self._lock:
+            # Отложенная проверка показывается в списке, но результатом не считается:
+            # прежний статус ссылки и время проверки остаются, продолжение её повторит
+            if not result.get('deferred'):
+                self._results[idx] = result
+            self._processed_count += 1
+            self._pending_batch.append(result)
+            flush = time.monotonic() - self._last_flush >= self.batch_interval
+            if flush:
+                self._last_flush = time.monotonic()
+        
+        if flush:
+            self._flush_results()
+    
+    def _flush_results(self):
+        with self._lock:
+            batch = self._pending_batch
+            self._pending_batch = []
+            processed = self._processed_count
+            self._last_flush = time.monotonic()
+        
+        if batch:
+            self.urls_checked.emit(batch)
+        
+        self.progress.emit(processed, self._total_count, 
+                          f"Проверено: {processed}/{self._total_count}")
+    
     def check_single_url(self, url: str, index: int) -> Dict[str, Any]:
+        url, headers = URLUtils.split_check_key(url)
+        
         if self.is_stopped():
             return {
                 'index': index, 
@@ -1507,29 +4930,91 @@ class URLCheckerWorker(BaseWorker):
                     'url': url
                 }
             
+            if parsed.scheme in ['http', 'https'] and self.deep_probe_hls and \
+                    parsed.path.lower().endswith('.m3u8'):
+                probe = URLUtils.probe_hls_stream(url, self.timeout, False,
+                                                  cancel_token=self.cancel_token,
+                                                  redirect_cache=None if headers else self.redirect_cache,
+                                                  headers=headers)
+                
+                return {
+                    'index': index,
+                    'success': probe['success'],
+                    'message': probe['message'],
+                    'response_time': probe['response_time'],
+                    'quality': LinkQuality.WORKING if probe['success'] else LinkQuality.NOT_WORKING,
+                    'url': url,
+                    'final_url': probe['final_url'],
+                    'redirect_hops': probe['redirect_hops'],
+                    'hls': {
+                        'variant_count': probe['variant_count'],
+                        'declared_bandwidth': probe['declared_bandwidth'],
+                        'time_to_first_segment': probe['time_to_first_segment'],
+                        'segment_bitrate': probe['segment_bitrate']
+                    }
+                }
+            
             if parsed.scheme in ['http', 'https']:
-                is_available, response_time, message = URLUtils.check_url_availability(
-                    url, self.timeout, False
-                )
+                host = (parsed.hostname or "").lower()
+                # Пауза для недоступных хостов — часть адаптивных таймаутов и без них не действует
+                adaptive = self.host_latency is not None and self.timeout_bounds is not None
+                if adaptive and not self.host_latency.should_probe(host):
+                    return {
+                        'index': index,
+                        'success': None,
+                        'message': 'Хост не отвечает, проверка отложена',
+                        'response_time': None,
+                        'quality': LinkQuality.UNKNOWN,
+                        'url': url,
+                        'deferred': True
+                    }
+                
+                connect_timeout = read_timeout = self.timeout
+                if self.host_latency and self.timeout_bounds:
+                    connect_timeout, read_timeout = self.host_latency.get_timeouts(
+                        host, self.timeout, *self.timeout_bounds
+                    )
+                
+                measurement = URLUtils.measure_url(url, connect_timeout, False,
+                                                   read_timeout=read_timeout,
+                                                   cancel_token=self.cancel_token,
+                                                   redirect_cache=None if headers else self.redirect_cache,
+                                                   headers=headers)
+                is_available = measurement['success']
+                
+                if self.host_latency and not self.is_stopped():
+                    self.host_latency.record(
+                        host, measurement['connect_time'], measurement['response_time'], is_available,
+                        measurement['unreachable']
+                    )
                 
                 quality = LinkQuality.WORKING if is_available else LinkQuality.NOT_WORKING
                 
                 return {
                     'index': index, 
                     'success': is_available, 
-                    'message': message,
-                    'response_time': response_time,
+                    'message': measurement['message'],
+                    'response_time': measurement['response_time'],
+                    'connect_time': measurement['connect_time'],
+                    'bytes_per_second': measurement['bytes_per_second'],
+                    'final_url': measurement['final_url'],
+                    'redirect_hops': measurement['redirect_hops'],
                     'quality': quality,
                     'url': url
                 }
             
             elif parsed.scheme in ['rtmp', 'rtsp', 'udp', 'tcp', 'rtp']:
+                protocol = 'udp' if parsed.scheme == 'rtp' else parsed.scheme
+                is_available, response_time, message = URLUtils.probe_stream_protocol(
+                    url, self.protocol_timeouts.get(protocol, self.timeout), self.cancel_token, headers
+                )
+                
                 return {
                     'index': index, 
-                    'success': True,
-                    'message': f'{parsed.scheme.upper()} поток',
-                    'response_time': None,
-                    'quality': LinkQuality.WORKING,
+                    'success': is_available,
+                    'message': message,
+                    'response_time': response_time,
+                    'quality': LinkQuality.WORKING if is_available else LinkQuality.NOT_WORKING,
                     'url': url
                 }
             
@@ -2076,6 +5561,15 @@ class URLCheckDialog(QDialog):
         self.urls_to_check: List[str] = []
         self.results: Dict[int, Dict[str, Any]] = {}
         self.checker: Optional[URLCheckerWorker] = None
+        self.skipped_count = 0
+        self.priority_provider: Optional[Callable[[], Dict[int, int]]] = None
+        self.checkpoint: Optional[URLCheckCheckpoint] = None
+        self.resumed_results: Dict[int, Dict[str, Any]] = {}
+        self.worker_options: Dict[str, Any] = {'timeout': 5, 'max_workers': 5}
+        
+        self._checkpoint_timer = QTimer(self)
+        self._checkpoint_timer.setInterval(30000)
+        self._checkpoint_timer.timeout.connect(self._save_checkpoint)
         
         self._setup_ui()
         
@@ -2116,9 +5610,43 @@ class URLCheckDialog(QDialog):
         
         layout.addWidget(button_box)
     
-    def set_urls(self, urls: List[str]):
+    def set_urls(self, urls: List[str], skipped_count: int = 0):
         self.urls_to_check = urls
-        self.info_label.setText(f"Готово к проверке {len(urls)} ссылок")
+        self.skipped_count = skipped_count
+        
+        info_text = f"Готово к проверке {len(urls)} ссылок"
+        if skipped_count:
+            info_text += f" (пропущено актуальных: {skipped_count})"
+        self.info_label.setText(info_text)
+    
+    def set_priority_provider(self, provider: Optional[Callable[[], Dict[int, int]]]):
+        self.priority_provider = provider
+    
+    def set_worker_options(self, **options):
+        self.worker_options.update(options)
+    
+    def set_checkpoint(self, checkpoint: Optional[URLCheckCheckpoint],
+                       resumed_results: Optional[Dict[int, Dict[str, Any]]] = None):
+        self.checkpoint = checkpoint
+        self.resumed_results = dict(resumed_results or {})
+        
+        if self.resumed_results:
+            self.info_label.setText(
+                f"Продолжение проверки: проверено {len(self.resumed_results)} из "
+                f"{len(self.urls_to_check)} ссылок"
+            )
+    
+    def _save_checkpoint(self):
+        if not self.checkpoint:
+            return
+        
+        results = self.checker.get_results() if self.checker else self.results
+        if results:
+            self.checkpoint.save(self.urls_to_check, results, self.skipped_count)
+    
+    def reprioritize(self):
+        if self.checker and self.priority_provider:
+            self.checker.set_priorities(self.priority_provider())
     
     def start_checking(self):
         if not self.urls_to_check:
@@ -2126,9 +5654,12 @@ class URLCheckDialog(QDialog):
             return
         
         self.results_list.clear()
-        self.results = {}
+        self.results = dict(self.resumed_results)
         self.apply_btn.setEnabled(False)
         
+        if self.results:
+            self.on_urls_checked([self.results[idx] for idx in sorted(self.results)])
+        
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         self.close_btn.setEnabled(False)
@@ -2136,33 +5667,62 @@ class URLCheckDialog(QDialog):
         self._check_started = True
         self._closed_by_user = False
         
-        self.checker = URLCheckerWorker(self.urls_to_check, timeout=5, max_workers=5)
+        self.checker = URLCheckerWorker(self.urls_to_check, completed_results=self.results,
+                                        **self.worker_options)
         self.checker.progress.connect(self.update_progress)
-        self.checker.url_checked.connect(self.on_url_checked)
+        self.checker.urls_checked.connect(self.on_urls_checked)
         self.checker.finished.connect(self.on_checking_finished)
         self.checker.error.connect(self.on_checking_error)
         
+        if self.priority_provider:
+            self.checker.set_priorities(self.priority_provider())
+        
         self.checker.start()
+        
+        if self.checkpoint:
+            self._checkpoint_timer.start()
     
     def stop_checking(self):
+        self._checkpoint_timer.stop()
+        
         if self.checker:
             self.checker.stop()
             self.checker.wait(1000)
+            self.results = self.checker.get_results()
             self.checker = None
         
+        self.resumed_results = dict(self.results)
+        self._save_checkpoint()
+        
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.close_btn.setEnabled(True)
         self.apply_btn.setEnabled(bool(self.results))
-        self.info_label.setText("Проверка остановлена")
+        self.info_label.setText(
+            f"Проверка остановлена. Проверено: {len(self.results)} из {len(self.urls_to_check)}"
+        )
     
     def update_progress(self, current: int, total: int, status: str):
         self.progress_bar.setMaximum(total)
         self.progress_bar.setValue(current)
         self.info_label.setText(f"{status} - {current}/{total}")
     
-    def on_url_checked(self, index: int, success: bool, message: str, response_time: Optional[float], quality: LinkQuality, url: str):
-        if index < len(self.urls_to_check):
+    def on_urls_checked(self, results: List[Dict[str, Any]]):
+        self.results_list.setUpdatesEnabled(False)
+        try:
+            for result in results:
+                self._add_result_item(result)
+        finally:
+            self.results_list.setUpdatesEnabled(True)
+    
+    def _add_result_item(self, result: Dict[str, Any]):
+        index = result.get('index', -1)
+        success = result.get('success')
+        message = result.get('message', '')
+        response_time = result.get('response_time')
+        url = result.get('url', '')
+        
+        if 0 <= index < len(self.urls_to_check):
             url_short = url[:50] + "..." if len(url) > 50 else url
             
             if success is None:
@@ -2179,6 +5739,9 @@ class URLCheckDialog(QDialog):
                 tooltip = f"{url}\n{message}"
                 if response_time:
                     tooltip += f"\nВремя ответа: {response_time:.2f} сек"
+                if result.get('redirect_hops'):
+                    tooltip += (f"\nПеренаправлений: {result['redirect_hops']}, "
+                                f"конечный адрес: {result.get('final_url', '')}")
                 item.setToolTip(tooltip)
             else:
                 item = QListWidgetItem(f"✗ {url_short}")
@@ -2188,34 +5751,48 @@ class URLCheckDialog(QDialog):
             item.setData(Qt.ItemDataRole.UserRole, url)
             self.results_list.addItem(item)
     
-    def on_checking_finished(self):
+    def on_checking_finished(self, completed: bool = True):
         if self._closed_by_user:
             return
+        
+        self._checkpoint_timer.stop()
             
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.close_btn.setEnabled(True)
         
+        # После остановки проверщик уже снят, и сигнал завершения приходит от прерванной проверки
+        completed = completed and self.checker is not None
         if self.checker:
             self.results = self.checker.get_results()
             self.checker = None
         
+        self.resumed_results = {}
+        # Завершённую проверку продолжать нечего, иначе при открытии плейлиста она предлагалась бы снова
+        if completed and self.checkpoint:
+            self.checkpoint.clear()
+        else:
+            self._save_checkpoint()
+        
         self.apply_btn.setEnabled(bool(self.results))
         
         working = sum(1 for r in self.results.values() if r.get('success') is True)
         not_working = sum(1 for r in self.results.values() if r.get('success') is False)
         unknown = sum(1 for r in self.results.values() if r.get('success') is None)
         
-        self.info_label.setText(
+        info_text = (
             f"Проверка завершена. "
             f"Работают: {working}, не работают: {not_working}, неизвестно: {unknown}"
         )
+        if self.skipped_count:
+            info_text += f"\nПропущено проверок (актуальные результаты): {self.skipped_count}"
+        self.info_label.setText(info_text)
         
         self._check_started = False
     
     def on_checking_error(self, error_message: str):
         QMessageBox.critical(self, "Ошибка", error_message)
-        self.on_checking_finished()
+        self.on_checking_finished(completed=False)
     
     def get_results(self) -> Dict[int, Dict[str, Any]]:
         return self.results.copy()
@@ -2223,6 +5800,8 @@ class URLCheckDialog(QDialog):
     def apply_results(self):
         if self.results:
             self.url_check_completed.emit(self.results.copy())
+            if self.checkpoint:
+                self.checkpoint.clear()
             self.accept()
         else:
             QMessageBox.warning(self, "Предупреждение", "Нет результатов для применения")
@@ -2240,6 +5819,205 @@ class URLCheckDialog(QDialog):
         event.accept()
 
 
+class HealthSampleDialog(QDialog):
+    
+    def __init__(self, channels: List[ChannelData], title: str, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Оценка состояния ссылок: {title}")
+        self.resize(800, 600)
+        
+        self.channels = channels
+        self.title = title
+        self.sampler: Optional[PlaylistHealthSampler] = None
+        self.checker: Optional[URLCheckerWorker] = None
+        self.sample_urls: List[str] = []
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.worker_options: Dict[str, Any] = {'timeout': 5, 'max_workers': 5}
+        self.url_check_cache: Optional[URLCheckCache] = None
+        self.started_at = 0.0
+        
+        self._setup_ui()
+    
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        
+        params_group = QGroupBox("Параметры выборки")
+        params_layout = QFormLayout(params_group)
+        
+        self.confidence_combo = QComboBox()
+        for confidence in (0.90, 0.95, 0.99):
+            self.confidence_combo.addItem(f"{confidence:.0%}", confidence)
+        self.confidence_combo.setCurrentIndex(1)
+        params_layout.addRow("Доверительная вероятность:", self.confidence_combo)
+        
+        self.margin_spin = QSpinBox()
+        self.margin_spin.setRange(1, 50)
+        self.margin_spin.setValue(10)
+        self.margin_spin.setSuffix(" %")
+        params_layout.addRow("Допустимая погрешность:", self.margin_spin)
+        
+        self.max_samples_spin = QSpinBox()
+        self.max_samples_spin.setRange(50, 100000)
+        self.max_samples_spin.setValue(2000)
+        params_layout.addRow("Максимум проверок:", self.max_samples_spin)
+        
+        layout.addWidget(params_group)
+        
+        self.info_label = QLabel(f"Каналов в плейлисте: {len(self.channels)}")
+        self.info_label.setWordWrap(True)
+        layout.addWidget(self.info_label)
+        
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar)
+        
+        self.report_tree = QTreeWidget()
+        self.report_tree.setHeaderLabels(
+            ["Группа / хост", "Ссылок", "Проверено", "Работает", "Оценка", "Интервал"]
+        )
+        self.report_tree.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.report_tree)
+        
+        button_box = QDialogButtonBox()
+        self.start_btn = QPushButton("Начать оценку")
+        self.start_btn.clicked.connect(self.start_sampling)
+        
+        self.stop_btn = QPushButton("Остановить")
+        self.stop_btn.clicked.connect(self.stop_sampling)
+        self.stop_btn.setEnabled(False)
+        
+        self.close_btn = QPushButton("Закрыть")
+        self.close_btn.clicked.connect(self.reject)
+        
+        button_box.addButton(self.start_btn, QDialogButtonBox.ButtonRole.ActionRole)
+        button_box.addButton(self.stop_btn, QDialogButtonBox.ButtonRole.ActionRole)
+        button_box.addButton(self.close_btn, QDialogButtonBox.ButtonRole.RejectRole)
+        layout.addWidget(button_box)
+    
+    def set_worker_options(self, **options):
+        self.worker_options.update(options)
+    
+    def start_sampling(self):
+        self.sampler = PlaylistHealthSampler(
+            confidence=self.confidence_combo.currentData(),
+            margin=self.margin_spin.value() / 100,
+            max_samples=self.max_samples_spin.value()
+        )
+        self.sample_urls = self.sampler.select(self.channels)
+        self.results = {}
+        
+        if not self.sample_urls:
+            QMessageBox.warning(self, "Предупреждение", "Нет ссылок для проверки")
+            return
+        
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.started_at = time.time()
+        
+        options = dict(self.worker_options, job_name=f"Оценка: {self.title}")
+        self.checker = URLCheckerWorker(self.sample_urls, **options)
+        self.checker.progress.connect(self.update_progress)
+        self.checker.urls_checked.connect(self.on_urls_checked)
+        self.checker.finished.connect(self.on_sampling_finished)
+        self.checker.error.connect(self.on_sampling_error)
+        self.checker.start()
+        
+        self._update_report()
+    
+    def stop_sampling(self):
+        if self.checker:
+            self.checker.stop()
+            self.checker.wait(1000)
+            self.checker = None
+        
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self._update_report()
+    
+    def update_progress(self, current: int, total: int, status: str):
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(current)
+    
+    def on_urls_checked(self, results: List[Dict[str, Any]]):
+        for result in results:
+            index = result.get('index', -1)
+            if 0 <= index < len(self.sample_urls) and not result.get('deferred'):
+                self.results[self.sample_urls[index]] = result
+        self._update_report()
+    
+    def on_sampling_finished(self):
+        if self.checker is None:
+            return
+        
+        self.checker = None
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        
+        if self.url_check_cache and self.results:
+            self.url_check_cache.put_many(
+                [dict(result, url=url) for url, result in self.results.items()], datetime.now()
+            )
+        
+        self._update_report()
+    
+    def on_sampling_error(self, error_message: str):
+        QMessageBox.critical(self, "Ошибка", error_message)
+        self.on_sampling_finished()
+    
+    @staticmethod
+    def _format_row(entry: Dict[str, Any]) -> List[str]:
+        if entry['estimate'] is None:
+            estimate = interval = "—"
+        else:
+            estimate = f"{entry['estimate']:.0%}"
+            interval = f"{entry['low']:.0%} – {entry['high']:.0%}"
+        return [entry['name'], str(entry['population']), f"{entry['checked']}/{entry['sampled']}",
+                str(entry['working']), estimate, interval]
+    
+    def _update_report(self):
+        if not self.sampler:
+            return
+        
+        report = self.sampler.report(self.results)
+        overall = report['overall']
+        
+        elapsed = time.time() - self.started_at
+        text = (f"Выборка: {overall['sampled']} из {overall['population']} ссылок, "
+                f"погрешность ±{report['margin']:.0%} при вероятности {report['confidence']:.0%}. "
+                f"Проверено {overall['checked']} за {elapsed:.0f} сек.")
+        if report['capped']:
+            text += " Выборка урезана до максимума проверок, у мелких групп и хостов точность ниже."
+        if overall['estimate'] is not None:
+            text += (f"\nОценка доли рабочих: {overall['estimate']:.0%} "
+                     f"({overall['low']:.0%} – {overall['high']:.0%})")
+        self.info_label.setText(text)
+        
+        expanded = {self.report_tree.topLevelItem(i).text(0)
+                    for i in range(self.report_tree.topLevelItemCount())
+                    if self.report_tree.topLevelItem(i).isExpanded()}
+        
+        self.report_tree.setUpdatesEnabled(False)
+        try:
+            self.report_tree.clear()
+            for title, entries in (("Группы", report['groups']), ("Хосты", report['hosts'])):
+                root = QTreeWidgetItem([f"{title} ({len(entries)})"])
+                for entry in entries:
+                    root.addChild(QTreeWidgetItem(self._format_row(entry)))
+                self.report_tree.addTopLevelItem(root)
+                root.setExpanded(not expanded or root.text(0) in expanded)
+        finally:
+            self.report_tree.setUpdatesEnabled(True)
+    
+    def reject(self):
+        if self.checker:
+            self.stop_sampling()
+        super().reject()
+    
+    def closeEvent(self, event):
+        if self.checker:
+            self.stop_sampling()
+        event.accept()
+
+
 class UndoRedoManager:
     
     def __init__(self, max_steps: int = 50):
@@ -3027,6 +6805,7 @@ class LinkSourceManagerDialog(QDialog):
     def __init__(self, source_manager: LinkSourceManager, parent=None):
         super().__init__(parent)
         self.source_manager = source_manager
+        self.refresh_worker: Optional[SourceRefreshWorker] = None
         self.setWindowTitle("Менеджер источников ссылок")
         self.resize(900, 600)
         
@@ -3085,6 +6864,13 @@ class LinkSourceManagerDialog(QDialog):
         
         layout.addLayout(btn_layout)
         
+        self.refresh_progress = QProgressBar()
+        self.refresh_progress.setVisible(False)
+        layout.addWidget(self.refresh_progress)
+        
+        self.refresh_status_label = QLabel("")
+        layout.addWidget(self.refresh_status_label)
+        
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
         button_box.rejected.connect(self.reject)
         layout.addWidget(button_box)
@@ -3176,33 +6962,64 @@ class LinkSourceManagerDialog(QDialog):
                 QMessageBox.warning(self, "Ошибка", "Не удалось удалить источник")
     
     def _refresh_all(self):
+        if self.refresh_worker and self.refresh_worker.isRunning():
+            self._stop_refresh()
+            return
+        
         sources = self.source_manager.get_enabled_sources()
         
         if not sources:
             QMessageBox.information(self, "Информация", "Нет включенных источников для обновления")
             return
         
-        progress_dialog = QProgressDialog("Обновление источников...", "Отмена", 0, len(sources), self)
-        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
-        
-        for i, source in enumerate(sources):
-            progress_dialog.setValue(i)
-            progress_dialog.setLabelText(f"Обновление: {source.name}")
-            
-            if progress_dialog.wasCanceled():
+        self.refresh_worker = SourceRefreshWorker(self.source_manager, sources)
+        self.refresh_worker.progress.connect(self._on_refresh_progress)
+        self.refresh_worker.source_refreshed.connect(self._on_source_refreshed)
+        self.refresh_worker.finished.connect(self._on_refresh_finished)
+        self.refresh_worker.error.connect(self._on_refresh_error)
+        
+        self.refresh_progress.setRange(0, len(sources))
+        self.refresh_progress.setValue(0)
+        self.refresh_progress.setVisible(True)
+        self.refresh_btn.setText("Остановить обновление")
+        self.refresh_worker.start()
+    
+    def _stop_refresh(self):
+        if self.refresh_worker:
+            self.refresh_worker.stop()
+            self.refresh_worker.wait()
+            self._on_refresh_finished()
+    
+    def _on_refresh_progress(self, current: int, total: int, message: str):
+        self.refresh_progress.setValue(current)
+        self.refresh_status_label.setText(message)
+    
+    def _on_source_refreshed(self, source_name: str, status: str, ok: bool):
+        for row in range(self.sources_table.rowCount()):
+            item = self.sources_table.item(row, 1)
+            if item and item.text() == source_name:
+                source = self.source_manager.get_source_by_name(source_name)
+                if source:
+                    self.sources_table.setItem(row, 4, QTableWidgetItem(str(source.total_links)))
+                date_item = QTableWidgetItem(datetime.now().strftime("%Y-%m-%d %H:%M"))
+                date_item.setToolTip(status)
+                self.sources_table.setItem(row, 7, date_item)
                 break
-            
-            try:
-                self.source_manager.load_links_from_source(source)
-                time.sleep(0.5)
-            except Exception as e:
-                logger.error(f"Ошибка обновления источника {source.name}: {e}")
-        
-        progress_dialog.setValue(len(sources))
+    
+    def _on_refresh_finished(self):
+        if self.refresh_worker is None:
+            return
         
+        self.refresh_worker = None
+        self.refresh_progress.setVisible(False)
+        self.refresh_btn.setText("Обновить всё")
+        self.refresh_status_label.setText("Источники обновлены")
         self._load_sources()
         self.sources_updated.emit()
-        QMessageBox.information(self, "Успех", "Источники обновлены")
+    
+    def _on_refresh_error(self, error_message: str):
+        QMessageBox.critical(self, "Ошибка", error_message)
+        self._on_refresh_finished()
     
     def _import_sources(self):
         filepath, _ = QFileDialog.getOpenFileName(
@@ -3264,8 +7081,13 @@ class LinkSourceManagerDialog(QDialog):
                 if enabled_item:
                     sources[i].enabled = enabled_item.checkState() == Qt.CheckState.Checked
         
+        self._stop_refresh()
         self.source_manager._save_sources()
         event.accept()
+    
+    def reject(self):
+        self._stop_refresh()
+        super().reject()
 
 
 class LinkSourceEditDialog(QDialog):
@@ -3514,6 +7336,11 @@ class LinkReplacementSettingsDialog(QDialog):
         self.use_fuzzy_check.setChecked(True)
         search_layout.addRow(self.use_fuzzy_check)
         
+        self.quality_suffixes_edit = QLineEdit()
+        self.quality_suffixes_edit.setPlaceholderText("hd, fhd, +1, orig")
+        self.quality_suffixes_edit.setToolTip("Суффиксы в конце названия, которые не учитываются при сравнении каналов")
+        search_layout.addRow("Суффиксы качества:", self.quality_suffixes_edit)
+        
         basic_layout.addWidget(search_group)
         
         replace_group = QGroupBox("Настройки замены")
@@ -3636,6 +7463,44 @@ class LinkReplacementSettingsDialog(QDialog):
         
         check_layout.addWidget(timeout_group)
         
+        protocol_group = QGroupBox("Таймауты потоковых протоколов")
+        protocol_layout = QFormLayout(protocol_group)
+        
+        self.protocol_timeout_spins: Dict[str, QDoubleSpinBox] = {}
+        for protocol, label in [('rtmp', "RTMP:"), ('rtsp', "RTSP:"), ('udp', "UDP/RTP:"), ('tcp', "TCP:")]:
+            spin = QDoubleSpinBox()
+            spin.setRange(0.5, 30)
+            spin.setDecimals(1)
+            spin.setSuffix(" сек")
+            protocol_layout.addRow(label, spin)
+            self.protocol_timeout_spins[protocol] = spin
+        
+        check_layout.addWidget(protocol_group)
+        
+        adaptive_group = QGroupBox("Адаптивные таймауты")
+        adaptive_layout = QFormLayout(adaptive_group)
+        
+        self.adaptive_timeouts_check = QCheckBox("Подбирать таймауты по истории задержек хоста")
+        self.adaptive_timeouts_check.setToolTip(
+            "Таймауты соединения и чтения вычисляются по p50/p95 задержек хоста.\n"
+            "Недоступные хосты проверяются с минимальным таймаутом."
+        )
+        adaptive_layout.addRow(self.adaptive_timeouts_check)
+        
+        self.adaptive_timeout_min_spin = QDoubleSpinBox()
+        self.adaptive_timeout_min_spin.setRange(0.5, 30)
+        self.adaptive_timeout_min_spin.setDecimals(1)
+        self.adaptive_timeout_min_spin.setSuffix(" сек")
+        adaptive_layout.addRow("Минимальный таймаут:", self.adaptive_timeout_min_spin)
+        
+        self.adaptive_timeout_max_spin = QDoubleSpinBox()
+        self.adaptive_timeout_max_spin.setRange(1, 60)
+        self.adaptive_timeout_max_spin.setDecimals(1)
+        self.adaptive_timeout_max_spin.setSuffix(" сек")
+        adaptive_layout.addRow("Максимальный таймаут:", self.adaptive_timeout_max_spin)
+        
+        check_layout.addWidget(adaptive_group)
+        
         workers_group = QGroupBox("Параметры многопоточности")
         workers_layout = QFormLayout(workers_group)
         
@@ -3643,7 +7508,63 @@ class LinkReplacementSettingsDialog(QDialog):
         self.max_workers_spin.setRange(1, 10)
         workers_layout.addRow("Максимум потоков:", self.max_workers_spin)
         
+        self.global_max_workers_spin = QSpinBox()
+        self.global_max_workers_spin.setRange(1, 100)
+        self.global_max_workers_spin.setToolTip(
+            "Общий предел одновременных проверок для всех вкладок и окон"
+        )
+        workers_layout.addRow("Всего потоков приложения:", self.global_max_workers_spin)
+        
+        self.global_bandwidth_spin = QSpinBox()
+        self.global_bandwidth_spin.setRange(0, 1000000)
+        self.global_bandwidth_spin.setSuffix(" КБ/с")
+        self.global_bandwidth_spin.setSpecialValueText("Без ограничения")
+        workers_layout.addRow("Ограничение трафика:", self.global_bandwidth_spin)
+        
         check_layout.addWidget(workers_group)
+        
+        cache_group = QGroupBox("Кэш результатов проверки")
+        cache_layout = QFormLayout(cache_group)
+        
+        self.use_check_cache_check = QCheckBox("Не перепроверять недавно проверенные ссылки")
+        cache_layout.addRow(self.use_check_cache_check)
+        
+        self.check_cache_ttl_spin = QSpinBox()
+        self.check_cache_ttl_spin.setRange(0, 720)
+        self.check_cache_ttl_spin.setSuffix(" ч")
+        self.check_cache_ttl_spin.setToolTip("0 - всегда проверять заново")
+        cache_layout.addRow("Срок актуальности:", self.check_cache_ttl_spin)
+        
+        self.redirect_cache_ttl_spin = QSpinBox()
+        self.redirect_cache_ttl_spin.setRange(0, 1440)
+        self.redirect_cache_ttl_spin.setSuffix(" мин")
+        self.redirect_cache_ttl_spin.setToolTip(
+            "Сколько помнить конечный адрес после перенаправлений. 0 - не запоминать"
+        )
+        cache_layout.addRow("Кэш перенаправлений:", self.redirect_cache_ttl_spin)
+        
+        self.incremental_stale_spin = QSpinBox()
+        self.incremental_stale_spin.setRange(0, 720)
+        self.incremental_stale_spin.setSuffix(" ч")
+        self.incremental_stale_spin.setToolTip(
+            "Для проверки изменённых ссылок: старше этого срока ссылка проверяется заново.\n"
+            "0 - проверять только новые и изменённые"
+        )
+        cache_layout.addRow("Устаревание результата:", self.incremental_stale_spin)
+        
+        check_layout.addWidget(cache_group)
+        
+        probe_group = QGroupBox("Глубокая проверка")
+        probe_layout = QFormLayout(probe_group)
+        
+        self.hls_deep_probe_check = QCheckBox("Загружать сегмент HLS потоков (.m3u8)")
+        self.hls_deep_probe_check.setToolTip(
+            "Разбирает плейлист, выбирает вариант потока и скачивает один сегмент.\n"
+            "Измеряет время до первого сегмента и реальную скорость загрузки."
+        )
+        probe_layout.addRow(self.hls_deep_probe_check)
+        
+        check_layout.addWidget(probe_group)
         check_layout.addStretch()
         
         self.tab_widget.addTab(check_tab, "Проверка")
@@ -3667,6 +7588,7 @@ class LinkReplacementSettingsDialog(QDialog):
     def _load_settings(self):
         self.match_threshold_spin.setValue(self.settings.match_threshold_percent)
         self.use_fuzzy_check.setChecked(self.settings.use_fuzzy_matching)
+        self.quality_suffixes_edit.setText(", ".join(self.settings.name_quality_suffixes))
         self.min_similarity_spin.setValue(self.settings.min_name_similarity)
         
         if self.settings.search_type == "exact":
@@ -3683,8 +7605,20 @@ class LinkReplacementSettingsDialog(QDialog):
         
         self.check_timeout_spin.setValue(self.settings.check_timeout)
         self.max_workers_spin.setValue(self.settings.max_workers)
+        self.global_max_workers_spin.setValue(self.settings.global_max_workers)
+        self.global_bandwidth_spin.setValue(self.settings.global_bandwidth_kbps)
         self.max_retries_spin.setValue(self.settings.max_retries)
         self.retry_delay_spin.setValue(self.settings.retry_delay)
+        self.use_check_cache_check.setChecked(self.settings.use_check_cache)
+        self.check_cache_ttl_spin.setValue(self.settings.check_cache_ttl_hours)
+        self.redirect_cache_ttl_spin.setValue(self.settings.redirect_cache_ttl_minutes)
+        self.incremental_stale_spin.setValue(self.settings.incremental_stale_hours)
+        self.hls_deep_probe_check.setChecked(self.settings.hls_deep_probe)
+        for protocol, spin in self.protocol_timeout_spins.items():
+            spin.setValue(self.settings.protocol_timeouts.get(protocol, self.settings.check_timeout))
+        self.adaptive_timeouts_check.setChecked(self.settings.adaptive_timeouts)
+        self.adaptive_timeout_min_spin.setValue(self.settings.adaptive_timeout_min)
+        self.adaptive_timeout_max_spin.setValue(self.settings.adaptive_timeout_max)
         
         self.auto_broken_check.setChecked(self.settings.auto_replace_broken)
         self.auto_missing_check.setChecked(self.settings.auto_replace_missing)
@@ -3713,6 +7647,9 @@ class LinkReplacementSettingsDialog(QDialog):
     def _save_settings_from_form(self):
         self.settings.match_threshold_percent = self.match_threshold_spin.value()
         self.settings.use_fuzzy_matching = self.use_fuzzy_check.isChecked()
+        self.settings.name_quality_suffixes = [
+            s.strip() for s in self.quality_suffixes_edit.text().split(",") if s.strip()
+        ]
         self.settings.min_name_similarity = self.min_similarity_spin.value()
         
         search_index = self.search_type_combo.currentIndex()
@@ -3730,8 +7667,21 @@ class LinkReplacementSettingsDialog(QDialog):
         
         self.settings.check_timeout = self.check_timeout_spin.value()
         self.settings.max_workers = self.max_workers_spin.value()
+        self.settings.global_max_workers = self.global_max_workers_spin.value()
+        self.settings.global_bandwidth_kbps = self.global_bandwidth_spin.value()
         self.settings.max_retries = self.max_retries_spin.value()
         self.settings.retry_delay = self.retry_delay_spin.value()
+        self.settings.use_check_cache = self.use_check_cache_check.isChecked()
+        self.settings.check_cache_ttl_hours = self.check_cache_ttl_spin.value()
+        self.settings.redirect_cache_ttl_minutes = self.redirect_cache_ttl_spin.value()
+        self.settings.incremental_stale_hours = self.incremental_stale_spin.value()
+        self.settings.hls_deep_probe = self.hls_deep_probe_check.isChecked()
+        for protocol, spin in self.protocol_timeout_spins.items():
+            self.settings.protocol_timeouts[protocol] = spin.value()
+        self.settings.adaptive_timeouts = self.adaptive_timeouts_check.isChecked()
+        self.settings.adaptive_timeout_min = self.adaptive_timeout_min_spin.value()
+        self.settings.adaptive_timeout_max = max(self.adaptive_timeout_min_spin.value(),
+                                                 self.adaptive_timeout_max_spin.value())
         
         self.settings.auto_replace_broken = self.auto_broken_check.isChecked()
         self.settings.auto_replace_missing = self.auto_missing_check.isChecked()
@@ -4117,19 +8067,59 @@ class DuplicateManagerDialog(QDialog):
             if len(channels) > 1:
                 self.duplicates[url] = channels
     
+    def _similar_candidates(self, i: int, threshold: float,
+                            names: NameSimilarityScorer, groups: NameSimilarityScorer) -> List[int]:
+        """Следующие за i каналы, у которых верхняя оценка get_similarity_score не ниже порога"""
+        channels = self.all_channels
+        rows = slice(i + 1, None)
+        name_ratios = names.quick_ratio([channels[i].name], rows)[0]
+        group_ratios = groups.quick_ratio([channels[i].group], rows)[0]
+        
+        if np is None:
+            bounds = []
+            for channel, name_ratio, group_ratio in zip(channels[i + 1:], name_ratios, group_ratios):
+                scores = []
+                if channels[i].name and channel.name:
+                    scores.append(name_ratio * 0.4)
+                if channels[i].group and channel.group:
+                    scores.append(group_ratio * 0.3)
+                if channels[i].url and channel.url:
+                    scores.append(0.3 if channels[i].url == channel.url else 0.0)
+                bounds.append(sum(scores) / len(scores) if scores else 0.0)
+            return [j for j, bound in enumerate(bounds, start=i + 1) if bound >= threshold - 1e-9]
+        
+        has_name = names.lengths[rows] > 0 if channels[i].name else np.zeros(len(name_ratios), dtype=bool)
+        has_group = groups.lengths[rows] > 0 if channels[i].group else np.zeros(len(group_ratios), dtype=bool)
+        has_url = self._url_ids[rows] >= 0 if channels[i].url else np.zeros(len(name_ratios), dtype=bool)
+        total = (np.where(has_name, name_ratios * 0.4, 0.0) + np.where(has_group, group_ratios * 0.3, 0.0)
+                 + np.where(has_url & (self._url_ids[rows] == self._url_ids[i]), 0.3, 0.0))
+        count = has_name.astype(np.int64) + has_group + has_url
+        bounds = np.where(count > 0, total / np.maximum(count, 1), 0.0)
+        return (np.flatnonzero(bounds >= threshold - 1e-9) + i + 1).tolist()
+    
     def _find_by_similar_names(self, threshold: float):
         processed = set()
         
+        # Точный SequenceMatcher считаем только для пар, которые проходят порог по верхней оценке
+        names = NameSimilarityScorer([channel.name for channel in self.all_channels])
+        groups = NameSimilarityScorer([channel.group for channel in self.all_channels])
+        if np is not None:
+            url_ids: Dict[str, int] = {}
+            self._url_ids = np.array(
+                [url_ids.setdefault(channel.url, len(url_ids)) if channel.url else -1
+                 for channel in self.all_channels], dtype=np.int64)
+        
         for i, channel1 in enumerate(self.all_channels):
             if i in processed:
                 continue
             
             similar_channels = [(i, channel1)]
             
-            for j, channel2 in enumerate(self.all_channels[i+1:], start=i+1):
+            for j in self._similar_candidates(i, threshold, names, groups):
                 if j in processed:
                     continue
                 
+                channel2 = self.all_channels[j]
                 similarity = channel1.get_similarity_score(channel2)
                 if similarity >= threshold:
                     similar_channels.append((j, channel2))
@@ -4483,7 +8473,8 @@ class PlaylistTab(QWidget):
     undo_state_changed = pyqtSignal(bool, bool)
     info_changed = pyqtSignal(str)
     
-    def __init__(self, filepath: str = None, parent=None, blacklist_manager: BlacklistManager = None):
+    def __init__(self, filepath: str = None, parent=None, blacklist_manager: BlacklistManager = None,
+                 url_check_cache: URLCheckCache = None):
         super().__init__(parent)
         self.filepath = filepath
         self.all_channels: List[ChannelData] = []
@@ -4492,6 +8483,8 @@ class PlaylistTab(QWidget):
         self.current_channel: Optional[ChannelData] = None
         self.modified = False
         self.blacklist_manager = blacklist_manager
+        self.url_check_cache = url_check_cache
+        self.url_check_dialog: Optional[URLCheckDialog] = None
         self.parent_window = None
         
         self.header_manager = PlaylistHeaderManager()
@@ -4525,10 +8518,19 @@ class PlaylistTab(QWidget):
         self.table.url_check_requested.connect(self._check_single_url)
         self.table.edit_user_agent_requested.connect(self._edit_user_agent)
         self.table.remove_broken_url_requested.connect(self._remove_broken_url)
+        
+        self._reprioritize_timer = QTimer(self)
+        self._reprioritize_timer.setSingleShot(True)
+        self._reprioritize_timer.setInterval(200)
+        self._reprioritize_timer.timeout.connect(self._reprioritize_url_check)
+        
+        self.table.verticalScrollBar().valueChanged.connect(self._schedule_url_check_reprioritize)
+        self.table.itemSelectionChanged.connect(self._schedule_url_check_reprioritize)
     
     def _setup_table(self):
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["№", "Название", "Группа", "TVG-ID", "Логотип", "URL/Статус"])
+        self.table.setColumnCount(7)
+        self.table.setHorizontalHeaderLabels(["№", "Название", "Группа", "TVG-ID", "Логотип", "URL/Статус",
+                                              "Оценка"])
         
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
@@ -4537,12 +8539,14 @@ class PlaylistTab(QWidget):
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.Interactive)
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.Interactive)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(6, QHeaderView.ResizeMode.Interactive)
         
         self.table.setColumnWidth(0, 60)
         self.table.setColumnWidth(1, 250)
         self.table.setColumnWidth(2, 150)
         self.table.setColumnWidth(3, 150)
         self.table.setColumnWidth(4, 200)
+        self.table.setColumnWidth(6, 70)
         
         self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
@@ -4577,6 +8581,7 @@ class PlaylistTab(QWidget):
                     channel.url_check_time = None
                     channel.link_quality = LinkQuality.UNKNOWN
                     channel.link_response_time = None
+                    channel.link_score = None
                     
                     if old_url != channel.url:
                         channel.add_url_to_history(old_url, channel.url, "Ручное Правка", "manual")
@@ -4601,6 +8606,7 @@ class PlaylistTab(QWidget):
             number_item = QTableWidgetItem(str(row + 1))
             number_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
             number_item.setFlags(number_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            number_item.setData(Qt.ItemDataRole.UserRole, channel)
             self.table.setItem(row, 0, number_item)
             
             name_item = QTableWidgetItem(channel.name)
@@ -4631,6 +8637,13 @@ class PlaylistTab(QWidget):
                 status_item.setBackground(QColor(255, 255, 200))
             
             self.table.setItem(row, 5, status_item)
+            
+            score_item = QTableWidgetItem()
+            if channel.link_score is not None:
+                score_item.setData(Qt.ItemDataRole.DisplayRole, channel.link_score)
+            score_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            score_item.setFlags(score_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.table.setItem(row, 6, score_item)
         finally:
             self.table.blockSignals(False)
     
@@ -4646,6 +8659,7 @@ class PlaylistTab(QWidget):
                 channel.url_check_time = None
                 channel.link_quality = LinkQuality.UNKNOWN
                 channel.link_response_time = None
+                channel.link_score = None
                 channel.add_url_to_history(old_url, "", "Удаление битой ссылки", "manual")
                 
                 self._update_table_row(row, channel)
@@ -4667,6 +8681,7 @@ class PlaylistTab(QWidget):
                 channel.url_check_time = None
                 channel.link_quality = LinkQuality.UNKNOWN
                 channel.link_response_time = None
+                channel.link_score = None
                 channel.add_url_to_history(old_url, "", "Удаление битой ссылки", "manual")
                 count += 1
         
@@ -5007,7 +9022,57 @@ class PlaylistTab(QWidget):
         
         self._check_urls(urls, channels_with_urls)
     
-    def check_all_urls(self):
+    def _get_display_name(self) -> str:
+        return os.path.basename(self.filepath) if self.filepath else "Безымянный"
+    
+    def estimate_url_health(self):
+        channels = [ch for ch in self.all_channels if ch.has_url and ch.url and ch.url.strip()]
+        if not channels:
+            QMessageBox.information(self, "Информация", "Нет ссылок для оценки")
+            return
+        
+        dialog = HealthSampleDialog(channels, self._get_display_name(), self)
+        dialog.set_worker_options(
+            **self._get_check_settings().get_checker_options(
+                getattr(self.parent_window, 'host_latency_tracker', None),
+                getattr(self.parent_window, 'redirect_cache', None)
+            )
+        )
+        dialog.url_check_cache = self.url_check_cache
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.show()
+    
+    def _get_check_settings(self) -> LinkReplacementSettings:
+        parent = self.parent_window
+        if parent and hasattr(parent, 'link_replacement_settings'):
+            return parent.link_replacement_settings
+        return LinkReplacementSettings()
+    
+    def _apply_check_result(self, channel: ChannelData, result: Dict[str, Any], check_time: datetime):
+        channel.apply_check_result(result, check_time)
+    
+    def _restore_cached_url_statuses(self) -> int:
+        if not self.url_check_cache:
+            return 0
+        
+        keys = [ch.get_check_key() for ch in self.all_channels if ch.has_url and ch.url and ch.url.strip()]
+        cached = self.url_check_cache.get_many(keys)
+        
+        restored = 0
+        for channel in self.all_channels:
+            if not channel.url:
+                continue
+            result = cached.get(channel.get_check_key())
+            if result:
+                self._apply_check_result(channel, result, result['checked_at'])
+                restored += 1
+        
+        return restored
+    
+    def check_all_urls(self, incremental: bool = False):
+        if self._url_check_in_progress():
+            return
+        
         urls = []
         channels_with_urls = []
         
@@ -5019,48 +9084,150 @@ class PlaylistTab(QWidget):
         if not urls:
             return
         
-        self._check_urls(urls, channels_with_urls)
+        checkpoint = URLCheckCheckpoint(self.filepath) if self.filepath else None
+        if checkpoint:
+            state = checkpoint.load()
+            if state and state['urls']:
+                reply = QMessageBox.question(
+                    self, "Незавершённая проверка",
+                    f"Найдена незавершённая проверка от {state['saved_at'].strftime('%d.%m.%Y %H:%M')}.\n"
+                    f"Проверено {len(state['results'])} из {len(state['urls'])} ссылок.\n\n"
+                    f"Продолжить её?",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                )
+                
+                if reply == QMessageBox.StandardButton.Yes:
+                    self._check_urls(state['urls'], channels_with_urls, state['skipped_count'],
+                                     checkpoint, state['urls'], state['results'])
+                    return
+                
+                checkpoint.clear()
+        
+        settings = self._get_check_settings()
+        skipped_count = 0
+        
+        if self.url_check_cache and settings.use_check_cache and settings.check_cache_ttl_hours > 0:
+            fresh_results = self.url_check_cache.get_many(
+                [ch.get_check_key() for ch in channels_with_urls], settings.check_cache_ttl_hours
+            )
+            
+            if fresh_results:
+                urls = []
+                channels_to_check = []
+                fresh_channels = []
+                
+                for channel in channels_with_urls:
+                    result = fresh_results.get(channel.get_check_key())
+                    # Неопределённый результат (например, отложенная проверка хоста) не считается свежим
+                    if result and result['success'] is not None:
+                        self._apply_check_result(channel, result, result['checked_at'])
+                        fresh_channels.append(channel)
+                    else:
+                        urls.append(channel.url)
+                        channels_to_check.append(channel)
+                
+                skipped_count += len(fresh_channels)
+                self._update_channel_rows(fresh_channels)
+                channels_with_urls = channels_to_check
+        
+        if incremental:
+            channels_to_check = [
+                ch for ch in channels_with_urls
+                if ch.needs_url_check(settings.incremental_stale_hours)
+            ]
+            skipped_count += len(channels_with_urls) - len(channels_to_check)
+            channels_with_urls = channels_to_check
+            urls = [ch.url for ch in channels_with_urls]
+        
+        if not urls:
+            QMessageBox.information(
+                self, "Информация",
+                f"Все ссылки проверялись недавно, повторная проверка не требуется.\n"
+                f"Пропущено проверок: {skipped_count}"
+            )
+            return
+        
+        self._check_urls(urls, channels_with_urls, skipped_count, checkpoint)
+    
+    def _url_check_in_progress(self) -> bool:
+        if self.url_check_dialog is None:
+            return False
+        
+        QMessageBox.information(self, "Информация", "Проверка ссылок уже выполняется")
+        self.url_check_dialog.raise_()
+        self.url_check_dialog.activateWindow()
+        return True
     
-    def _check_urls(self, urls: List[str], channels: List[ChannelData]):
+    def _check_urls(self, urls: List[str], channels: List[ChannelData], skipped_count: int = 0,
+                    checkpoint: Optional[URLCheckCheckpoint] = None,
+                    resume_urls: Optional[List[str]] = None,
+                    resume_results: Optional[Dict[int, Dict[str, Any]]] = None):
         if not urls or not channels:
             return
         
+        # Дедупликация по ссылке вместе с заголовками запроса канала
         url_to_channels = {}
         for i, channel in enumerate(channels):
-            if channel.url:
-                url = channel.url.strip()
-                if url not in url_to_channels:
-                    url_to_channels[url] = []
-                url_to_channels[url].append((channel, i))
+            if channel.url and channel.url.strip():
+                key = channel.get_check_key()
+                if key not in url_to_channels:
+                    url_to_channels[key] = []
+                url_to_channels[key].append((channel, i))
         
-        unique_urls = list(url_to_channels.keys())
+        if resume_urls is not None:
+            unique_urls = list(resume_urls)
+        else:
+            unique_urls = list(url_to_channels.keys())
         
         if not unique_urls:
             return
         
+        if self._url_check_in_progress():
+            return
+        
+        settings = self._get_check_settings()
+        
         dialog = URLCheckDialog(self)
-        dialog.set_urls(unique_urls)
-        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.set_urls(unique_urls, skipped_count)
+        dialog.set_checkpoint(checkpoint, resume_results)
+        dialog.set_worker_options(
+            job_name=f"Проверка: {self._get_display_name()}",
+            **settings.get_checker_options(getattr(self.parent_window, 'host_latency_tracker', None),
+                                           getattr(self.parent_window, 'redirect_cache', None))
+        )
+        dialog.set_priority_provider(
+            lambda: self._get_url_check_priorities(unique_urls, url_to_channels)
+        )
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
         
         def on_check_completed(results):
             url_results = {}
             for idx, result in results.items():
                 if idx < len(unique_urls):
                     url = unique_urls[idx]
-                    url_results[url] = result
+                    url_results[url] = dict(result, url=url)
             
             self._save_state("Проверка ссылок")
             
+            check_time = datetime.now()
+            if self.url_check_cache:
+                self.url_check_cache.put_many(list(url_results.values()), check_time)
+            else:
+                for result in url_results.values():
+                    result['score'] = URLUtils.compute_link_score(result)
+            
+            checked_channels = []
             for url, result in url_results.items():
                 if url in url_to_channels:
                     for channel, _ in url_to_channels[url]:
-                        channel.url_status = result.get('success')
-                        channel.url_check_time = datetime.now()
-                        channel.link_response_time = result.get('response_time')
-                        channel.link_quality = result.get('quality', LinkQuality.UNKNOWN)
+                        if channel.get_check_key() != url:
+                            continue
+                        self._apply_check_result(channel, result, check_time)
+                        checked_channels.append(channel)
             
-            self._apply_filter()
-            self._update_info()
+            # Фильтр (группа, поиск по названию, группе, tvg-id и URL) от статуса ссылки не зависит,
+            # поэтому достаточно обновить строки проверенных каналов
+            self._update_channel_rows(checked_channels)
             
             self.modified = True
             self._update_modified_status()
@@ -5070,12 +9237,62 @@ class PlaylistTab(QWidget):
                 self.undo_manager.can_redo()
             )
         
+        def on_dialog_finished():
+            self.url_check_dialog = None
+        
         dialog.url_check_completed.connect(on_check_completed)
-        dialog.exec()
+        dialog.finished.connect(on_dialog_finished)
+        dialog.destroyed.connect(on_dialog_finished)
+        self.url_check_dialog = dialog
+        dialog.show()
+    
+    def _get_url_check_priorities(self, urls: List[str],
+                                  url_to_channels: Dict[str, List[Tuple[ChannelData, int]]]) -> Dict[int, int]:
+        """Приоритеты проверки: видимые строки, выделенные, текущая группа, остальные"""
+        channel_priority: Dict[int, int] = {}
+        
+        for channel in self.filtered_channels:
+            channel_priority[id(channel)] = URLCheckerWorker.PRIORITY_GROUP
+        
+        for channel in self.selected_channels:
+            channel_priority[id(channel)] = URLCheckerWorker.PRIORITY_SELECTED
+        
+        first_row = self.table.rowAt(0)
+        if first_row >= 0:
+            last_row = self.table.rowAt(self.table.viewport().height() - 1)
+            if last_row < 0:
+                last_row = self.table.rowCount() - 1
+            for row in range(first_row, last_row + 1):
+                channel = self._row_channel(row)
+                if channel is not None:
+                    channel_priority[id(channel)] = URLCheckerWorker.PRIORITY_VISIBLE
+        
+        priorities = {}
+        for idx, url in enumerate(urls):
+            priority = min(
+                (channel_priority.get(id(channel), URLCheckerWorker.PRIORITY_DEFAULT)
+                 for channel, _ in url_to_channels.get(url, [])),
+                default=URLCheckerWorker.PRIORITY_DEFAULT
+            )
+            if priority != URLCheckerWorker.PRIORITY_DEFAULT:
+                priorities[idx] = priority
+        
+        return priorities
+    
+    def _schedule_url_check_reprioritize(self):
+        if self.url_check_dialog is not None:
+            self._reprioritize_timer.start()
+    
+    def _reprioritize_url_check(self):
+        if self.url_check_dialog is not None:
+            self.url_check_dialog.reprioritize()
     
     def check_selected_urls(self):
         self._check_selected_urls()
     
+    def check_changed_urls(self):
+        self.check_all_urls(incremental=True)
+    
     def delete_channels_without_urls(self):
         channels_without_urls = [ch for ch in self.all_channels if not ch.has_url or not ch.url or not ch.url.strip()]
         
@@ -5299,26 +9516,17 @@ class PlaylistTab(QWidget):
     
     def _load_file(self, filepath: str):
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-            
-            self.header_manager.parse_header(content)
-            
-            lines = content.split('\n')
-            
-            start_index = 0
-            for i, line in enumerate(lines):
-                if line.startswith('#EXTINF:'):
-                    start_index = i
-                    break
-            
-            self._parse_m3u('\n'.join(lines[start_index:]))
+            self.header_manager, channels = M3UPlaylistIO.read(filepath)
+            self.all_channels.clear()
+            self.all_channels.extend(channels)
             
             if self.blacklist_manager:
                 original_count = len(self.all_channels)
                 filtered, removed = self.blacklist_manager.filter_channels(self.all_channels)
                 self.all_channels = filtered
             
+            self._restore_cached_url_statuses()
+            
             self._apply_filter()
             self._update_info()
             
@@ -5332,109 +9540,7 @@ class PlaylistTab(QWidget):
     
     def _parse_m3u(self, content: str):
         self.all_channels.clear()
-        
-        lines = content.splitlines()
-        i = 0
-        
-        try:
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                if not line:
-                    i += 1
-                    continue
-                
-                if line.startswith('#EXTINF:'):
-                    channel = ChannelData()
-                    channel.extinf = line
-                    
-                    if ',' in line:
-                        parts = line.split(',', 1)
-                        channel.name = parts[1].strip()
-                    
-                    attrs_part = line.split(',')[0] if ',' in line else line
-                    
-                    tvg_id_match = re.search(r'tvg-id="([^"]*)"', attrs_part)
-                    if tvg_id_match:
-                        channel.tvg_id = tvg_id_match.group(1)
-                    
-                    logo_match = re.search(r'tvg-logo="([^"]*)"', attrs_part)
-                    if logo_match:
-                        channel.tvg_logo = logo_match.group(1)
-                    
-                    group_match = re.search(r'group-title="([^"]*)"', attrs_part)
-                    if group_match:
-                        channel.group = group_match.group(1)
-                    else:
-                        channel.group = "Без группы"
-                    
-                    j = i + 1
-                    has_url = False
-                    url_lines = []
-                    extvlcopt_lines = []
-                    
-                    while j < len(lines):
-                        next_line = lines[j].strip()
-                        if not next_line:
-                            j += 1
-                            continue
-                        
-                        if next_line.startswith('#EXTINF:'):
-                            break
-                        
-                        if next_line.startswith('#'):
-                            extvlcopt_lines.append(next_line)
-                        else:
-                            url_lines.append(next_line)
-                            has_url = True
-                            break
-                        
-                        j += 1
-                    
-                    if has_url:
-                        j += 1
-                        
-                        while j < len(lines):
-                            next_line = lines[j].strip()
-                            if not next_line:
-                                j += 1
-                                continue
-                            
-                            if next_line.startswith('#EXTINF:'):
-                                break
-                            
-                            if next_line.startswith('#'):
-                                extvlcopt_lines.append(next_line)
-                            else:
-                                break
-                            
-                            j += 1
-                    else:
-                        while j < len(lines) and not lines[j].strip():
-                            j += 1
-                    
-                    if url_lines:
-                        channel.url = '\n'.join(url_lines)
-                        channel.has_url = True
-                    else:
-                        channel.url = ""
-                        channel.has_url = False
-                    
-                    channel.extvlcopt_lines = extvlcopt_lines
-                    channel.parse_extvlcopt_headers()
-                    if 'User-Agent' in channel.extra_headers:
-                        channel.user_agent = channel.extra_headers['User-Agent']
-                    
-                    self.all_channels.append(channel)
-                    
-                    i = j
-                else:
-                    i += 1
-        
-        except (IndexError, ValueError) as e:
-            logger.error(f"Ошибка парсинга M3U в строке {i}: {e}")
-            if i < len(lines):
-                i += 1
+        self.all_channels.extend(M3UPlaylistIO.parse_channels(content))
     
     def _apply_filter(self):
         parent = self.parent_window
@@ -5464,6 +9570,7 @@ class PlaylistTab(QWidget):
         
         self._update_table()
         self._update_info()
+        self._schedule_url_check_reprioritize()
     
     def _update_table(self):
         selected_rows = []
@@ -5499,6 +9606,32 @@ class PlaylistTab(QWidget):
         
         self._update_info()
     
+    def _row_channel(self, row: int) -> Optional[ChannelData]:
+        """Канал строки таблицы: после сортировки номер строки не совпадает с индексом в filtered_channels"""
+        item = self.table.item(row, 0)
+        return item.data(Qt.ItemDataRole.UserRole) if item is not None else None
+    
+    def _update_channel_rows(self, channels: List[ChannelData]):
+        if not channels:
+            return
+        
+        channel_ids = set(id(ch) for ch in channels)
+        
+        self.table.setUpdatesEnabled(False)
+        sorting_enabled = self.table.isSortingEnabled()
+        self.table.setSortingEnabled(False)
+        
+        try:
+            for row in range(self.table.rowCount()):
+                channel = self._row_channel(row)
+                if channel is not None and id(channel) in channel_ids:
+                    self._update_table_row(row, channel)
+        finally:
+            self.table.setSortingEnabled(sorting_enabled)
+            self.table.setUpdatesEnabled(True)
+        
+        self._update_info()
+    
     def _update_info(self):
         total = len(self.all_channels)
         with_url = sum(1 for ch in self.all_channels if ch.has_url and ch.url and ch.url.strip())
@@ -5905,23 +10038,7 @@ class PlaylistTab(QWidget):
             return False
         
         try:
-            with open(self.filepath, 'w', encoding='utf-8') as f:
-                header_text = self.header_manager.get_header_text()
-                if header_text:
-                    f.write(header_text)
-                else:
-                    f.write('#EXTM3U\n\n')
-                
-                for channel in self.all_channels:
-                    f.write(channel.extinf + '\n')
-                    
-                    for extra_line in channel.extvlcopt_lines:
-                        f.write(extra_line + '\n')
-                    
-                    if channel.url:
-                        f.write(channel.url + '\n')
-                    else:
-                        f.write('\n')
+            M3UPlaylistIO.write(self.filepath, self.header_manager.get_header_text(), self.all_channels)
             
             self.modified = False
             self._update_modified_status()
@@ -5957,6 +10074,7 @@ class PlaylistTab(QWidget):
                 channel.url_check_time = None
                 channel.link_quality = LinkQuality.UNKNOWN
                 channel.link_response_time = None
+                channel.link_score = None
                 channel.update_extinf()
             
             self._apply_filter()
@@ -6128,6 +10246,62 @@ class PlaylistTab(QWidget):
             dialog.exec()
 
 
+class JobsPanel(QWidget):
+    
+    def __init__(self, service: ExecutionService, parent=None):
+        super().__init__(parent)
+        self.service = service
+        
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.table = QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(
+            ["Задание", "Выполняется", "В очереди", "Готово", "Задач/с", "Трафик"]
+        )
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+        
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+        self.refresh()
+    
+    def refresh(self):
+        if not self.isVisible():
+            return
+        
+        jobs = self.service.get_jobs_stats()
+        self.table.setRowCount(len(jobs))
+        
+        for row, job in enumerate(jobs):
+            values = [
+                job['name'],
+                f"{job['running']}/{job['max_workers']}",
+                str(job['queued']),
+                str(job['completed']),
+                f"{job['tasks_per_second']:.1f}",
+                f"{job['bytes_per_second'] / 1024:.0f} КБ/с"
+            ]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+        
+        running = sum(job['running'] for job in jobs)
+        limit = self.service.max_threads
+        bandwidth = self.service.max_bytes_per_second
+        text = f"Потоков занято: {running} из {limit}"
+        if bandwidth:
+            text += f", лимит трафика {bandwidth // 1024} КБ/с"
+        self.summary_label.setText(text)
+
+
 class MainWindow(QMainWindow):
     
     def __init__(self):
@@ -6144,11 +10318,19 @@ class MainWindow(QMainWindow):
         self.copied_metadata_list = None
         
         self.blacklist_manager = BlacklistManager()
-        self.link_source_manager = LinkSourceManager()
         self.link_replacement_settings = LinkReplacementSettings()
+        self.url_check_cache = URLCheckCache()
+        self.host_latency_tracker = HostLatencyTracker()
+        self.host_latency_tracker.load(self.url_check_cache)
+        self.link_source_manager = LinkSourceManager(url_check_cache=self.url_check_cache)
+        self.source_update_scheduler = LinkSourceUpdateScheduler(self.link_source_manager)
+        self.source_update_worker: Optional[SourceRefreshWorker] = None
         
         # Загружаем настройки белого и чёрного списка
         self._load_ip_filter_settings()
+        self._load_check_settings()
+        self.link_replacement_settings.apply_execution_limits()
+        self.redirect_cache = RedirectCache(self.link_replacement_settings.redirect_cache_ttl_minutes * 60)
         
         self.recent_files = []
         
@@ -6160,37 +10342,17 @@ class MainWindow(QMainWindow):
         self._load_settings()
         self._update_window_title()
         
+        # Автообновление источников проверяется раз в минуту в фоне
+        self.source_update_timer = QTimer(self)
+        self.source_update_timer.setInterval(60 * 1000)
+        self.source_update_timer.timeout.connect(self._auto_update_link_sources)
+        self.source_update_timer.start()
+        
         self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose, True)
     
     def _load_ip_filter_settings(self):
         """Загружает настройки фильтрации IP/доменов"""
-        settings = QSettings("Ksenia", "M3UEditor")
-        
-        # Загружаем чёрный список
-        blacklist_ips = settings.value("blacklist_ips", [])
-        if isinstance(blacklist_ips, list):
-            self.link_replacement_settings.blacklisted_ips = blacklist_ips
-        else:
-            self.link_replacement_settings.blacklisted_ips = []
-        
-        blacklist_domains = settings.value("blacklist_domains", [])
-        if isinstance(blacklist_domains, list):
-            self.link_replacement_settings.blacklisted_domains = blacklist_domains
-        else:
-            self.link_replacement_settings.blacklisted_domains = []
-        
-        # Загружаем белый список
-        whitelist_ips = settings.value("whitelist_ips", [])
-        if isinstance(whitelist_ips, list):
-            self.link_replacement_settings.whitelisted_ips = whitelist_ips
-        else:
-            self.link_replacement_settings.whitelisted_ips = []
-        
-        whitelist_domains = settings.value("whitelist_domains", [])
-        if isinstance(whitelist_domains, list):
-            self.link_replacement_settings.whitelisted_domains = whitelist_domains
-        else:
-            self.link_replacement_settings.whitelisted_domains = []
+        self.link_replacement_settings.load_ip_filters(QSettings("Ksenia", "M3UEditor"))
     
     def _save_ip_filter_settings(self):
         """Сохраняет настройки фильтрации IP/доменов"""
@@ -6201,6 +10363,14 @@ class MainWindow(QMainWindow):
         settings.setValue("whitelist_ips", self.link_replacement_settings.whitelisted_ips)
         settings.setValue("whitelist_domains", self.link_replacement_settings.whitelisted_domains)
     
+    def _load_check_settings(self):
+        """Загружает настройки проверки ссылок"""
+        self.link_replacement_settings.load_check_settings(QSettings("Ksenia", "M3UEditor"))
+    
+    def _save_check_settings(self):
+        """Сохраняет настройки проверки ссылок"""
+        self.link_replacement_settings.save_check_settings(QSettings("Ksenia", "M3UEditor"))
+    
     def _setup_ui(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -6227,6 +10397,12 @@ class MainWindow(QMainWindow):
         filter_layout.addWidget(self.group_combo)
         
         main_layout.addLayout(filter_layout)
+        
+        self.jobs_dock = QDockWidget("Задания", self)
+        self.jobs_dock.setObjectName("jobs_dock")
+        self.jobs_dock.setWidget(JobsPanel(ExecutionService.shared(), self.jobs_dock))
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.jobs_dock)
+        self.jobs_dock.hide()
     
     def _setup_menu(self):
         menu_bar = self.menuBar()
@@ -6381,6 +10557,18 @@ class MainWindow(QMainWindow):
         check_selected_urls_action.triggered.connect(self._check_selected_urls)
         tools_menu.addAction(check_selected_urls_action)
 
+        check_changed_urls_action = QAction("Проверить новые, изменённые и устаревшие", self)
+        check_changed_urls_action.triggered.connect(self._check_changed_urls)
+        tools_menu.addAction(check_changed_urls_action)
+
+        estimate_health_action = QAction("Оценить состояние ссылок по выборке...", self)
+        estimate_health_action.triggered.connect(self._estimate_url_health)
+        tools_menu.addAction(estimate_health_action)
+
+        estimate_file_health_action = QAction("Оценить файл плейлиста без открытия...", self)
+        estimate_file_health_action.triggered.connect(self._estimate_file_url_health)
+        tools_menu.addAction(estimate_file_health_action)
+
         tools_menu.addSeparator()
 
         merge_duplicates_action = QAction("Управление дубликатами...", self)
@@ -6454,6 +10642,10 @@ class MainWindow(QMainWindow):
         toggle_statusbar_action.triggered.connect(self._toggle_statusbar)
         view_menu.addAction(toggle_statusbar_action)
 
+        jobs_panel_action = self.jobs_dock.toggleViewAction()
+        jobs_panel_action.setText("Панель заданий")
+        view_menu.addAction(jobs_panel_action)
+
         settings_menu = menu_bar.addMenu("Настройки")
 
         blacklist_manager_action = QAction("Менеджер чёрного списка", self)
@@ -6578,6 +10770,7 @@ class MainWindow(QMainWindow):
         
         # Сохраняем настройки фильтрации
         self._save_ip_filter_settings()
+        self._save_check_settings()
     
     def _update_recent_menu(self):
         self.recent_menu.clear()
@@ -6634,7 +10827,8 @@ class MainWindow(QMainWindow):
             self.setWindowTitle("Ksenia M3U Editor")
     
     def _new_file(self):
-        tab = PlaylistTab(blacklist_manager=self.blacklist_manager)
+        tab = PlaylistTab(blacklist_manager=self.blacklist_manager,
+                          url_check_cache=self.url_check_cache)
         tab.parent_window = self
         
         index = self.tab_widget.addTab(tab, "Безымянный")
@@ -6665,7 +10859,8 @@ class MainWindow(QMainWindow):
                 return
         
         try:
-            tab = PlaylistTab(filepath, blacklist_manager=self.blacklist_manager)
+            tab = PlaylistTab(filepath, blacklist_manager=self.blacklist_manager,
+                              url_check_cache=self.url_check_cache)
             tab.parent_window = self
             
             filename = os.path.basename(filepath)
@@ -6820,6 +11015,9 @@ class MainWindow(QMainWindow):
                 elif reply == QMessageBox.StandardButton.Cancel:
                     return
             
+            if tab.url_check_dialog is not None:
+                tab.url_check_dialog.close()
+            
             tab.undo_state_changed.disconnect()
             tab.info_changed.disconnect()
             
@@ -7013,6 +11211,37 @@ class MainWindow(QMainWindow):
         if self.current_tab:
             self.current_tab._check_selected_urls()
     
+    def _estimate_url_health(self):
+        if self.current_tab:
+            self.current_tab.estimate_url_health()
+    
+    def _estimate_file_url_health(self):
+        filepath, _ = QFileDialog.getOpenFileName(
+            self, "Оценить плейлист", "",
+            "M3U файлы (*.m3u *.m3u8);;Все файлы (*.*)"
+        )
+        if not filepath:
+            return
+        
+        try:
+            _, channels = M3UPlaylistIO.read(filepath)
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось прочитать файл: {str(e)}")
+            return
+        
+        dialog = HealthSampleDialog(channels, os.path.basename(filepath), self)
+        dialog.set_worker_options(
+            **self.link_replacement_settings.get_checker_options(self.host_latency_tracker,
+                                                                 self.redirect_cache)
+        )
+        dialog.url_check_cache = self.url_check_cache
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.show()
+    
+    def _check_changed_urls(self):
+        if self.current_tab:
+            self.current_tab.check_changed_urls()
+    
     def _manage_duplicates(self):
         if not self.current_tab:
             return
@@ -7265,7 +11494,41 @@ class MainWindow(QMainWindow):
         dialog.exec()
     
     def _on_link_sources_updated(self):
-        pass
+        self.source_update_scheduler.reset()
+    
+    def _auto_update_link_sources(self):
+        if self.source_update_worker is not None:
+            return
+        
+        sources = self.source_update_scheduler.due_sources()
+        if not sources:
+            return
+        
+        worker = SourceRefreshWorker(self.link_source_manager, sources, max_workers=2,
+                                     job_name="Автообновление источников")
+        worker.source_refreshed.connect(
+            lambda name, status, ok: self.source_update_scheduler.record_result(name, ok))
+        worker.finished.connect(self._on_auto_update_finished)
+        worker.error.connect(lambda message: self._on_auto_update_finished())
+        self.source_update_worker = worker
+        worker.start()
+    
+    def _on_auto_update_finished(self):
+        worker = self.source_update_worker
+        if worker is None:
+            return
+        
+        self.source_update_worker = None
+        self.source_update_scheduler.release(worker.sources)
+        self.status_bar.showMessage(f"Источники ссылок обновлены автоматически: {len(worker.sources)}", 3000)
+    
+    def _stop_auto_update(self):
+        self.source_update_timer.stop()
+        worker = self.source_update_worker
+        if worker is not None:
+            worker.stop()
+            worker.wait()
+            self.source_update_worker = None
     
     def _manage_link_replacement_settings(self):
         dialog = LinkReplacementSettingsDialog(self.link_replacement_settings, self)
@@ -7275,6 +11538,9 @@ class MainWindow(QMainWindow):
     def _on_link_replacement_settings_changed(self, settings: LinkReplacementSettings):
         self.link_replacement_settings = settings
         self._save_ip_filter_settings()
+        self._save_check_settings()
+        settings.apply_execution_limits()
+        self.redirect_cache.ttl_seconds = settings.redirect_cache_ttl_minutes * 60
     
     def _copy_metadata_between_playlists(self):
         if len(self.tabs) < 2:
@@ -7411,14 +11677,16 @@ class MainWindow(QMainWindow):
                 return
         
         for tab in self.tabs.values():
-            if hasattr(tab, 'checker') and tab.checker:
+            if tab.url_check_dialog is not None:
                 try:
-                    tab.checker.stop()
-                    tab.checker.wait(500)
+                    tab.url_check_dialog.close()
                 except:
                     pass
         
+        self._stop_auto_update()
         self._save_settings()
+        self.host_latency_tracker.save(self.url_check_cache)
+        self.url_check_cache.close()
         
         for widget in QApplication.topLevelWidgets():
             if widget != self and isinstance(widget, QDialog):
@@ -7427,7 +11695,280 @@ class MainWindow(QMainWindow):
         event.accept()
 
 
+class PlaylistValidationDaemon:
+    
+    def __init__(self, playlists: List[str], interval_minutes: float = 60, max_workers: int = 10,
+                 max_checks: int = 0, replace_broken: bool = False, log_file: str = None,
+                 settings: LinkReplacementSettings = None, config_dir: str = None):
+        if config_dir is None:
+            config_dir = SystemThemeManager.get_config_dir()
+        
+        self.playlists = [os.path.abspath(path) for path in playlists]
+        self.interval_minutes = interval_minutes
+        self.max_workers = max_workers
+        self.max_checks = max_checks
+        self.replace_broken = replace_broken
+        self.log_file = log_file or os.path.join(config_dir, "daemon_runs.log")
+        self.settings = settings or LinkReplacementSettings()
+        
+        # Общий пул должен вмещать запрошенное число потоков фоновой проверки
+        ExecutionService.shared().configure(max(self.max_workers, self.settings.global_max_workers),
+                                            self.settings.global_bandwidth_kbps * 1024)
+        
+        self.url_check_cache = URLCheckCache(config_dir)
+        self.host_latency_tracker = HostLatencyTracker()
+        self.host_latency_tracker.load(self.url_check_cache)
+        self.redirect_cache = RedirectCache(self.settings.redirect_cache_ttl_minutes * 60)
+        self.link_source_manager = LinkSourceManager(config_dir, url_check_cache=self.url_check_cache)
+        self.source_update_scheduler = LinkSourceUpdateScheduler(self.link_source_manager)
+        
+        self._stop_event = threading.Event()
+        self._current_worker: Optional[BaseWorker] = None
+    
+    def stop(self):
+        self._stop_event.set()
+        worker = self._current_worker
+        if worker:
+            worker.stop()
+    
+    def is_stopped(self) -> bool:
+        return self._stop_event.is_set()
+    
+    def close(self):
+        self.host_latency_tracker.save(self.url_check_cache)
+        self.url_check_cache.close()
+    
+    def run_forever(self):
+        logger.info(f"Фоновая проверка запущена: плейлистов {len(self.playlists)}, "
+                    f"интервал {self.interval_minutes} мин")
+        while not self.is_stopped():
+            self.run_once()
+            self._stop_event.wait(self.interval_minutes * 60)
+        logger.info("Фоновая проверка остановлена")
+    
+    def run_once(self) -> List[Dict[str, Any]]:
+        if self.replace_broken and not self.is_stopped():
+            self._update_link_sources()
+        
+        entries = []
+        for path in self.playlists:
+            if self.is_stopped():
+                break
+            entries.append(self.validate_playlist(path))
+        return entries
+    
+    def _update_link_sources(self):
+        """Обновляет источники с автообновлением до замены, чтобы поиск шёл по свежим данным"""
+        sources = self.source_update_scheduler.due_sources()
+        if not sources:
+            return
+        
+        worker = SourceRefreshWorker(self.link_source_manager, sources, max_workers=2,
+                                     job_name="Автообновление источников")
+        worker.source_refreshed.connect(
+            lambda name, status, ok: self.source_update_scheduler.record_result(name, ok))
+        self._current_worker = worker
+        worker.run()
+        self._current_worker = None
+        self.source_update_scheduler.release(sources)
+        logger.info(f"Обновлено источников ссылок: {len(sources)}")
+    
+    def _select_urls(self, urls: List[str], cached: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Порядок проверки: недавно упавшие, непроверенные, затем самые старые результаты"""
+        ttl_hours = self.settings.check_cache_ttl_hours if self.settings.use_check_cache else 0
+        now = datetime.now()
+        candidates = []
+        
+        for url in urls:
+            result = cached.get(url)
+            if result is None:
+                candidates.append((1, 0.0, url))
+            elif result['success'] is False:
+                candidates.append((0, -result['checked_at'].timestamp(), url))
+            else:
+                age_hours = (now - result['checked_at']).total_seconds() / 3600
+                if ttl_hours and age_hours < ttl_hours:
+                    continue
+                candidates.append((2, result['checked_at'].timestamp(), url))
+        
+        candidates.sort()
+        if self.max_checks > 0:
+            candidates = candidates[:self.max_checks]
+        
+        return [url for _, _, url in candidates]
+    
+    def validate_playlist(self, path: str) -> Dict[str, Any]:
+        started = time.time()
+        entry = {
+            'playlist': path,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'checked': 0,
+            'working': 0,
+            'failed': 0,
+            'skipped': 0,
+            'replaced': 0,
+            'written': False,
+            'error': None
+        }
+        
+        try:
+            header_manager, channels = M3UPlaylistIO.read(path)
+            
+            channels_with_urls = [ch for ch in channels if ch.has_url and ch.url and ch.url.strip()]
+            urls = list(dict.fromkeys(ch.get_check_key() for ch in channels_with_urls))
+            
+            cached = self.url_check_cache.get_many(urls)
+            for channel in channels_with_urls:
+                result = cached.get(channel.get_check_key())
+                if result:
+                    channel.apply_check_result(result, result['checked_at'])
+            
+            urls_to_check = self._select_urls(urls, cached)
+            entry['skipped'] = len(urls) - len(urls_to_check)
+            
+            if urls_to_check and not self.is_stopped():
+                settings = self.settings
+                options = settings.get_checker_options(self.host_latency_tracker, self.redirect_cache)
+                options['max_workers'] = self.max_workers
+                worker = URLCheckerWorker(urls_to_check, job_name=f"Фоновая проверка: {os.path.basename(path)}",
+                                          **options)
+                self._current_worker = worker
+                worker.run()
+                self._current_worker = None
+                
+                check_time = datetime.now()
+                records = {}
+                for idx, result in worker.get_results().items():
+                    if result.get('success') is None and self.is_stopped():
+                        continue
+                    records[urls_to_check[idx]] = dict(result, url=urls_to_check[idx])
+                
+                self.url_check_cache.put_many(list(records.values()), check_time)
+                
+                for channel in channels_with_urls:
+                    result = records.get(channel.get_check_key())
+                    if result:
+                        channel.apply_check_result(result, check_time)
+                
+                entry['checked'] = len(records)
+                entry['working'] = sum(1 for r in records.values() if r.get('success') is True)
+                entry['failed'] = sum(1 for r in records.values() if r.get('success') is False)
+            
+            if self.replace_broken and not self.is_stopped():
+                entry['replaced'] = self._replace_broken(channels)
+            
+            if entry['replaced']:
+                M3UPlaylistIO.write(path, header_manager.get_header_text(), channels)
+                entry['written'] = True
+            
+        except Exception as e:
+            entry['error'] = str(e)
+            logger.error(f"Ошибка фоновой проверки {path}: {e}")
+        
+        entry['duration'] = round(time.time() - started, 1)
+        self._write_log(entry)
+        
+        logger.info(f"{path}: проверено {entry['checked']}, работают {entry['working']}, "
+                    f"не работают {entry['failed']}, пропущено {entry['skipped']}, "
+                    f"заменено {entry['replaced']} за {entry['duration']} сек")
+        return entry
+    
+    def _replace_broken(self, channels: List[ChannelData]) -> int:
+        settings = LinkReplacementSettings.from_dict(self.settings.to_dict())
+        settings.auto_replace_broken = True
+        
+        candidates = [
+            ch for ch in channels
+            if ch.url_status is False or
+            (settings.auto_replace_missing and (not ch.has_url or not ch.url or not ch.url.strip()))
+        ]
+        if not candidates or not self.link_source_manager.get_enabled_sources():
+            return 0
+        
+        replaced = []
+        worker = LinkReplacementWorker(candidates, self.link_source_manager, settings)
+        worker.channel_updated.connect(
+            lambda channel, old_url, new_url: replaced.append(channel),
+            Qt.ConnectionType.DirectConnection
+        )
+        
+        self._current_worker = worker
+        worker.run()
+        self._current_worker = None
+        
+        for channel in replaced:
+            channel.has_url = True
+            channel.url_status = True
+            channel.url_check_time = datetime.now()
+            channel.link_quality = LinkQuality.WORKING
+        
+        return len(replaced)
+    
+    def _write_log(self, entry: Dict[str, Any]):
+        try:
+            log_dir = os.path.dirname(os.path.abspath(self.log_file))
+            os.makedirs(log_dir, exist_ok=True)
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.error(f"Ошибка записи журнала фоновой проверки: {e}")
+
+
+def run_daemon(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="ksenia_m3u.py --daemon",
+        description="Периодическая перепроверка плейлистов без графического интерфейса"
+    )
+    parser.add_argument('playlists', nargs='+', help="M3U файлы для проверки")
+    parser.add_argument('--interval', type=float, default=60,
+                        help="Интервал между проверками, минут (по умолчанию 60)")
+    parser.add_argument('--workers', type=int, default=10,
+                        help="Количество параллельных проверок (по умолчанию 10)")
+    parser.add_argument('--max-checks', type=int, default=0,
+                        help="Максимум проверок на плейлист за запуск, 0 - без ограничения")
+    parser.add_argument('--replace-broken', action='store_true',
+                        help="Заменять битые ссылки из включённых источников")
+    parser.add_argument('--log', default=None,
+                        help="Журнал запусков (JSON по строке на плейлист)")
+    parser.add_argument('--once', action='store_true', help="Выполнить одну проверку и выйти")
+    args = parser.parse_args(argv)
+    
+    qsettings = QSettings("Ksenia", "M3UEditor")
+    settings = LinkReplacementSettings()
+    settings.load_check_settings(qsettings)
+    settings.load_ip_filters(qsettings)
+    
+    daemon = PlaylistValidationDaemon(
+        args.playlists,
+        interval_minutes=args.interval,
+        max_workers=args.workers,
+        max_checks=args.max_checks,
+        replace_broken=args.replace_broken,
+        log_file=args.log,
+        settings=settings
+    )
+    
+    def handle_signal(signum, frame):
+        daemon.stop()
+    
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    
+    try:
+        if args.once:
+            daemon.run_once()
+        else:
+            daemon.run_forever()
+    finally:
+        daemon.close()
+    
+    return 0
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--daemon':
+        sys.exit(run_daemon(sys.argv[2:]))
+    
     app = QApplication(sys.argv)
     
     app.setApplicationName("Ksenia M3U Editor")
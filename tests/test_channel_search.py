@@ -0,0 +1,101 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ksenia_m3u
+from ksenia_m3u import ChannelData, ChannelNameSearchIndex, LinkReplacementSettings, LinkSourceManager
+
+
+BASE_NAMES = [
+    "Первый канал", "Россия 1", "Россия 24", "НТВ", "ТНТ", "СТС", "РЕН ТВ", "Пятница",
+    "Матч ТВ", "Матч! Футбол 1", "Карусель", "Дом кино", "Discovery Channel",
+    "National Geographic", "Animal Planet", "Euronews", "BBC World News", "MTV Hits",
+    "Cartoon Network", "Nickelodeon", "Viasat History", "TV1000 Action", "Спас", "Звезда",
+]
+SUFFIXES = ["", " HD", " FHD", " +2", " +4", "4", " orig", " (Москва)", " (Europe)", " 4K", "-HD"]
+
+
+def make_names(seed: int = 7, count: int = 600):
+    rng = random.Random(seed)
+    names = [base + suffix for base in BASE_NAMES for suffix in SUFFIXES]
+    while len(names) < count:
+        words = rng.choice(BASE_NAMES).split()
+        rng.shuffle(words)
+        names.append(" ".join(words) + rng.choice(SUFFIXES))
+    names.extend(["", "ТНТ4", "тнт", "НТВ Мир"])
+    return names
+
+
+def make_channels(names):
+    channels = []
+    for i, name in enumerate(names):
+        channel = ChannelData()
+        channel.name = name
+        channel.url = f"http://example.com/{i}"
+        channels.append(channel)
+    return channels
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return LinkSourceManager(str(tmp_path))
+
+
+@pytest.fixture(params=["numpy", "python"])
+def numpy_mode(request, monkeypatch):
+    if request.param == "numpy" and ksenia_m3u.np is None:
+        pytest.skip("NumPy не установлен")
+    if request.param == "python":
+        monkeypatch.setattr(ksenia_m3u, "np", None)
+    return request.param
+
+
+def expected(manager, channels, query, search_type, threshold):
+    settings = LinkReplacementSettings()
+    settings.search_type = search_type
+    settings.min_name_similarity = threshold
+    return [channel for channel in channels if manager._is_match(query, channel.name, settings)]
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.7, 0.85, 1.0])
+def test_find_similar_matches_full_scan(manager, numpy_mode, threshold):
+    channels = make_channels(make_names())
+    index = ChannelNameSearchIndex(channels)
+    queries = ["ТНТ", "НТВ", "Первый канал HD", "Россия 1", "Discovery", "канал Первый", "MTV", "Спас +2"]
+
+    for query in queries:
+        assert index.find_similar(query, threshold) == expected(manager, channels, query, "similar", threshold)
+
+
+def test_find_similar_short_name_with_suffix(numpy_mode):
+    channels = make_channels(["ТНТ4", "ТНТ Music", "СТС"])
+    assert [channel.name for channel in ChannelNameSearchIndex(channels).find_similar("ТНТ", 0.7)] == ["ТНТ4"]
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.7, 1.0])
+def test_find_fuzzy_matches_full_scan(manager, numpy_mode, threshold):
+    channels = make_channels(make_names())
+    index = ChannelNameSearchIndex(channels)
+
+    for query in ["Первый канал HD", "Матч ТВ", "BBC World News", "News", "Россия"]:
+        assert index.find_fuzzy(query, threshold) == expected(manager, channels, query, "fuzzy", threshold)
+
+
+def test_updated_index_matches_full_scan(manager, numpy_mode):
+    channels = make_channels(make_names())
+    index = ChannelNameSearchIndex(channels)
+    index.find_similar("ТНТ", 0.7)
+
+    removed = channels[:40]
+    added = make_channels(["ТНТ HD", "ТНТ+4", "НТВ", "Новый канал"])
+    updated = index.updated(removed, added)
+    assert updated is not None
+
+    current = channels[40:] + added
+    for query in ["ТНТ", "НТВ", "Новый канал"]:
+        found = updated.find_similar(query, 0.7)
+        assert sorted(map(id, found)) == sorted(map(id, expected(manager, current, query, "similar", 0.7)))
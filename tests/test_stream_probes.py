@@ -0,0 +1,199 @@
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ksenia_m3u import CancellationToken, URLUtils
+
+
+def free_port(kind=socket.SOCK_STREAM):
+    sock = socket.socket(socket.AF_INET, kind)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@pytest.fixture
+def tcp_server():
+    servers = []
+
+    def start(handler):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        servers.append(server)
+
+        def serve():
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            with conn:
+                conn.settimeout(2)
+                try:
+                    handler(conn)
+                except OSError:
+                    pass
+
+        threading.Thread(target=serve, daemon=True).start()
+        return server.getsockname()[1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def recv_exactly(conn, size):
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def recv_request(conn):
+    data = b""
+    while b"\r\n\r\n" not in data:
+        chunk = conn.recv(1024)
+        if not chunk:
+            break
+        data += chunk
+    return data.decode("utf-8")
+
+
+@pytest.mark.parametrize("token", [None, CancellationToken()])
+def test_probe_tcp(tcp_server, token):
+    port = tcp_server(lambda conn: None)
+    ok, response_time, message = URLUtils.probe_tcp("127.0.0.1", port, 2, token)
+    assert ok and response_time is not None
+
+    ok, _, message = URLUtils.probe_tcp("127.0.0.1", free_port(), 2, token)
+    assert not ok and message == "Ошибка соединения"
+
+
+def test_probe_rtmp_handshake(tcp_server):
+    received = []
+
+    def handler(conn):
+        received.append(recv_exactly(conn, 1537))
+        conn.sendall(b"\x03" + b"\x00" * 1536)
+
+    port = tcp_server(handler)
+    ok, _, message = URLUtils.probe_rtmp("127.0.0.1", port, 2)
+    assert ok, message
+    assert received[0][0] == 3 and len(received[0]) == 1537
+
+
+def test_probe_rtmp_rejects_wrong_version(tcp_server):
+    port = tcp_server(lambda conn: (recv_exactly(conn, 1537), conn.sendall(b"\x06")))
+    ok, _, message = URLUtils.probe_rtmp("127.0.0.1", port, 2)
+    assert not ok and "версия 6" in message
+
+
+def test_probe_rtmp_closed_connection(tcp_server):
+    port = tcp_server(lambda conn: recv_exactly(conn, 1537))
+    ok, _, message = URLUtils.probe_rtmp("127.0.0.1", port, 2)
+    assert not ok and message == "RTMP: соединение закрыто"
+
+
+@pytest.mark.parametrize("status, expected", [(200, True), (401, True), (404, False)])
+def test_probe_rtsp_status(tcp_server, status, expected):
+    requests_seen = []
+
+    def handler(conn):
+        requests_seen.append(recv_request(conn))
+        conn.sendall(f"RTSP/1.0 {status} Status\r\nCSeq: 1\r\n\r\n".encode("ascii"))
+
+    port = tcp_server(handler)
+    url = f"rtsp://127.0.0.1:{port}/live"
+    ok, _, message = URLUtils.probe_rtsp(url, "127.0.0.1", port, 2,
+                                         headers={"User-Agent": "Player", "Referer": "http://example.com"})
+    assert ok is expected, message
+    assert requests_seen[0].startswith(f"OPTIONS {url} RTSP/1.0\r\n")
+    assert "User-Agent: Player\r\n" in requests_seen[0]
+    assert "Referer: http://example.com\r\n" in requests_seen[0]
+
+
+def test_probe_rtsp_invalid_response(tcp_server):
+    port = tcp_server(lambda conn: (recv_request(conn), conn.sendall(b"HTTP/1.1 200 OK\r\n\r\n")))
+    ok, _, message = URLUtils.probe_rtsp("rtsp://127.0.0.1/", "127.0.0.1", port, 2)
+    assert not ok and message == "RTSP: некорректный ответ"
+
+
+def send_datagrams(port, stop):
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    while not stop.is_set():
+        sender.sendto(b"\x47" * 188, ("127.0.0.1", port))
+        time.sleep(0.05)
+    sender.close()
+
+
+@pytest.mark.parametrize("host", ["", "127.0.0.1"])
+@pytest.mark.parametrize("token", [None, CancellationToken()])
+def test_probe_udp_local_port_receives(host, token):
+    port = free_port(socket.SOCK_DGRAM)
+    stop = threading.Event()
+    threading.Thread(target=send_datagrams, args=(port, stop), daemon=True).start()
+    try:
+        ok, _, message = URLUtils.probe_udp(host, port, 2, token)
+    finally:
+        stop.set()
+    assert ok, message
+
+
+def test_probe_udp_local_port_without_packets():
+    ok, response_time, message = URLUtils.probe_udp("127.0.0.1", free_port(socket.SOCK_DGRAM), 0.3)
+    assert not ok and message == "Нет UDP пакетов" and response_time == 0.3
+
+
+def test_probe_udp_cancelled():
+    token = CancellationToken()
+    threading.Timer(0.2, token.cancel).start()
+    ok, _, message = URLUtils.probe_udp("127.0.0.1", free_port(socket.SOCK_DGRAM), 5, token)
+    assert not ok and message == "Проверка отменена"
+
+
+@pytest.fixture
+def remote_host(monkeypatch):
+    monkeypatch.setattr(URLUtils, "_is_local_address", staticmethod(lambda host: False))
+    return "127.0.0.1"
+
+
+def test_probe_udp_remote_sends_to_source(remote_host):
+    # Источник сам держит порт: проба не должна пытаться занять его локально
+    source = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    source.bind(("127.0.0.1", 0))
+    source.settimeout(2)
+
+    def reply():
+        try:
+            _, address = source.recvfrom(2048)
+            source.sendto(b"\x47" * 188, address)
+        except OSError:
+            pass
+
+    thread = threading.Thread(target=reply, daemon=True)
+    thread.start()
+    try:
+        ok, _, message = URLUtils.probe_udp(remote_host, source.getsockname()[1], 2)
+    finally:
+        thread.join(2)
+        source.close()
+    assert ok, message
+
+
+def test_probe_udp_remote_closed_port(remote_host):
+    ok, _, message = URLUtils.probe_udp(remote_host, free_port(socket.SOCK_DGRAM), 2)
+    assert not ok and message == "UDP порт закрыт"
+
+
+def test_probe_udp_requires_port():
+    assert URLUtils.probe_udp("127.0.0.1", None) == (False, None, "Не указан порт")